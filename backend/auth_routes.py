@@ -2,7 +2,7 @@
 import uuid
 import os
 from urllib.parse import urlencode
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import RedirectResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
@@ -10,6 +10,8 @@ import httpx
 
 from postgres_client import SessionLocal
 from postgres_models import UserProfile
+from profile_cache import profile_cache, profile_to_dict
+from session_tokens import get_current_user, issue_token
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -23,6 +25,9 @@ FRONTEND_URL = os.getenv("FRONTEND_URL", "https://nexpath.vercel.app")
 # ✅ Production redirect URI (must match Google Console)
 REDIRECT_URI = f"{BACKEND_BASE_URL}/auth/google/callback"
 
+# One client (and connection pool) for every OAuth exchange; closed on app shutdown
+oauth_client = httpx.AsyncClient(timeout=10)
+
 class SignupRequest(BaseModel):
     name: str
     email: str
@@ -34,7 +39,7 @@ class LoginRequest(BaseModel):
 def signup_user(data: SignupRequest):
     db: Session = SessionLocal()
     try:
-        existing_user = db.query(UserProfile).filter(UserProfile.email == data.email).first()
+        existing_user = profile_cache.get_by_email(db, data.email)
         if existing_user:
             raise HTTPException(status_code=400, detail="Email already exists")
 
@@ -49,7 +54,10 @@ def signup_user(data: SignupRequest):
         db.add(new_user)
         db.commit()
         db.refresh(new_user)
+        profile = profile_to_dict(new_user)
+        profile_cache.put(profile)
 
+        # No token: nothing here proves the caller owns the email address
         return {"user_id": new_user.user_id, "name": new_user.name, "email": new_user.email}
     finally:
         db.close()
@@ -58,11 +66,12 @@ def signup_user(data: SignupRequest):
 def login_user(data: LoginRequest):
     db: Session = SessionLocal()
     try:
-        user = db.query(UserProfile).filter(UserProfile.email == data.email).first()
+        user = profile_cache.get_by_email(db, data.email)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
 
-        return {"user_id": user.user_id, "name": user.name, "email": user.email}
+        # No token: the request carries no password or other proof of identity
+        return {"user_id": user["user_id"], "name": user["name"], "email": user["email"]}
     finally:
         db.close()
 
@@ -87,29 +96,27 @@ async def google_callback(request: Request):
     if not code:
         raise HTTPException(status_code=400, detail="Missing code parameter")
 
-    async with httpx.AsyncClient() as client:
-        token_response = await client.post(
-            "https://oauth2.googleapis.com/token",
-            data={
-                "code": code,
-                "client_id": GOOGLE_CLIENT_ID,
-                "client_secret": GOOGLE_CLIENT_SECRET,
-                "redirect_uri": REDIRECT_URI,
-                "grant_type": "authorization_code",
-            },
-        )
-        token_json = token_response.json()
+    token_response = await oauth_client.post(
+        "https://oauth2.googleapis.com/token",
+        data={
+            "code": code,
+            "client_id": GOOGLE_CLIENT_ID,
+            "client_secret": GOOGLE_CLIENT_SECRET,
+            "redirect_uri": REDIRECT_URI,
+            "grant_type": "authorization_code",
+        },
+    )
+    token_json = token_response.json()
 
     access_token = token_json.get("access_token")
     if not access_token:
         raise HTTPException(status_code=400, detail=f"Failed to obtain access token: {token_json}")
 
-    async with httpx.AsyncClient() as client:
-        userinfo_response = await client.get(
-            "https://www.googleapis.com/oauth2/v2/userinfo",
-            headers={"Authorization": f"Bearer {access_token}"},
-        )
-        user_info = userinfo_response.json()
+    userinfo_response = await oauth_client.get(
+        "https://www.googleapis.com/oauth2/v2/userinfo",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    user_info = userinfo_response.json()
 
     email = user_info.get("email")
     name = user_info.get("name") or "Google User"
@@ -118,22 +125,33 @@ async def google_callback(request: Request):
 
     db: Session = SessionLocal()
     try:
-        user = db.query(UserProfile).filter(UserProfile.email == email).first()
+        user = profile_cache.get_by_email(db, email)
         if not user:
-            user = UserProfile(
+            new_user = UserProfile(
                 user_id=str(uuid.uuid4()),
                 name=name,
                 email=email,
                 contact="",
             )
-            db.add(user)
+            db.add(new_user)
             db.commit()
-            db.refresh(user)
+            db.refresh(new_user)
+            user = profile_to_dict(new_user)
+            profile_cache.put(user)
     finally:
         db.close()
 
     # ✅ Redirect back to your frontend (not localhost)
-    qs = urlencode({"user_id": user.user_id, "name": user.name, "email": user.email})
-    return RedirectResponse(url=f"{FRONTEND_URL}/chat?{qs}")
+    qs = urlencode({"user_id": user["user_id"], "name": user["name"], "email": user["email"]})
+    # The token goes in the fragment, which browsers never send to a server
+    # (so it stays out of access logs and Referer headers)
+    fragment = urlencode({"token": issue_token(user)["access_token"]})
+    return RedirectResponse(url=f"{FRONTEND_URL}/chat?{qs}#{fragment}")
+
+
+@router.get("/me")
+def get_me(claims: dict = Depends(get_current_user)):
+    """The signed-in user, straight from the token (no database lookup)."""
+    return {"user_id": claims["sub"], "name": claims.get("name"), "email": claims.get("email"), "expires_at": claims["exp"]}
 
 
@@ -0,0 +1,98 @@
+# benchmarks/bench_chat_admission.py
+"""
+Latency /chat/ admission control adds to a message: `admit` (one EVALSHA
+checking the global, IP, user and intent budgets and the upstream queue)
+plus `release` (one ZREM) for job search and Gemini messages.
+
+Budgets and queue depths are raised out of reach, so every message takes the
+slowest path: all counters incremented and an in-flight entry added.
+
+Runs against REDIS_URL (default redis://localhost:6379/0) under a scratch key
+prefix that is deleted afterwards. A PING round trip is timed alongside as
+the floor any Redis-backed check pays on that connection.
+
+    python benchmarks/bench_chat_admission.py --requests 20000 --users 500 --concurrency 1,32
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import redis.asyncio as aioredis
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+for name in ("CHAT_LIMIT_PER_USER", "CHAT_LIMIT_PER_IP", "CHAT_LIMIT_GLOBAL", "CHAT_LIMIT_JOB_SEARCH",
+             "CHAT_LIMIT_GEMINI", "CHAT_LIMIT_MENTORSHIP", "CHAT_SHED_JOB_SEARCH_DEPTH", "CHAT_SHED_GEMINI_DEPTH"):
+    os.environ[name] = str(10 ** 9)
+
+import chat_admission  # noqa: E402
+from chat_admission import ChatAdmission  # noqa: E402
+
+INTENTS = ["job_search", "career_advice", "mentorship", "general", "interview_booking"]
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run(admission, redis_conn, requests, users, concurrency, seed=5):
+    rng = random.Random(seed)
+    callers = [(f"bench-user-{i}", f"10.0.{i // 250}.{i % 250}") for i in range(users)]
+    admit_latencies, ping_latencies, rejected = [], [], 0
+    queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait((*rng.choice(callers), rng.choice(INTENTS)))
+
+    async def client():
+        nonlocal rejected
+        while not queue.empty():
+            user_id, ip, intent = queue.get_nowait()
+            started = time.perf_counter()
+            result = await admission.admit(user_id, ip, intent)
+            await admission.release(result)
+            admit_latencies.append(time.perf_counter() - started)
+            rejected += not result.allowed
+            started = time.perf_counter()
+            await redis_conn.ping()
+            ping_latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return admit_latencies, ping_latencies, rejected, elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--concurrency", default="1,32", help="comma-separated concurrent clients")
+    args = parser.parse_args()
+
+    chat_admission.KEY_PREFIX = f"bench:{os.getpid()}:chat:admission"
+    redis_conn = aioredis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"), decode_responses=True)
+    admission = ChatAdmission(redis_conn)
+    try:
+        await admission.admit("warmup", "127.0.0.1", "general")  # loads the script
+        print(f"{'clients':>8}{'admit+release p50 ms':>22}{'p99 ms':>9}{'mean ms':>9}"
+              f"{'PING p50 ms':>13}{'msgs/s':>9}{'rejected':>10}")
+        for concurrency in (int(value) for value in args.concurrency.split(",")):
+            latencies, pings, rejected, elapsed = await run(admission, redis_conn, args.requests, args.users, concurrency)
+            print(f"{concurrency:>8}{percentile(latencies, 0.5) * 1e3:>22.3f}{percentile(latencies, 0.99) * 1e3:>9.3f}"
+                  f"{statistics.mean(latencies) * 1e3:>9.3f}{percentile(pings, 0.5) * 1e3:>13.3f}"
+                  f"{len(latencies) / elapsed:>9.0f}{rejected:>10}")
+    finally:
+        keys = [key async for key in redis_conn.scan_iter(match=f"{chat_admission.KEY_PREFIX}:*", count=1000)]
+        if keys:
+            await redis_conn.delete(*keys)
+        await redis_conn.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
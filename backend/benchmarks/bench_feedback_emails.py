@@ -0,0 +1,66 @@
+# benchmarks/bench_feedback_emails.py
+"""
+Throughput of feedback email delivery: one request per email (the old
+send_feedback_email behaviour) versus batched personalizations, measured
+against notifications.LocalSink with a simulated per-request latency.
+
+    python benchmarks/bench_feedback_emails.py --emails 500 --latency 0.05
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from notifications import (  # noqa: E402
+    FeedbackEmailDispatcher,
+    LocalSink,
+    build_request,
+    render_feedback_email,
+)
+
+FEEDBACK = (
+    "Overall Feedback:\nYou gave clear answers and kept a professional tone.\n"
+    "Strengths:\n- Good use of STAR in the teamwork question.\n- Concise self-introduction.\n"
+    "Areas for improvement:\n- Quantify results.\n- Slow down when describing technical work.\n"
+) * 4
+
+
+def make_emails(count):
+    return [
+        render_feedback_email(f"user{i}@example.com", f"https://api.twilio.com/recordings/RE{i:032d}", FEEDBACK)
+        for i in range(count)
+    ]
+
+
+def one_by_one(emails, sink):
+    for email in emails:
+        sink.send(build_request([email]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--emails", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated seconds per API request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 429/503")
+    args = parser.parse_args()
+
+    emails = make_emails(args.emails)
+
+    sink = LocalSink(latency=args.latency)
+    started = time.perf_counter()
+    one_by_one(emails, sink)
+    sequential = time.perf_counter() - started
+    print(f"one-by-one: {len(sink.requests)} requests, {sequential:.2f}s, {args.emails / sequential:.0f} emails/s")
+
+    sink = LocalSink(latency=args.latency, error_rate=args.error_rate, seed=1)
+    dispatcher = FeedbackEmailDispatcher(sink, base_delay=args.latency)
+    started = time.perf_counter()
+    delivered = dispatcher.send(emails)
+    batched = time.perf_counter() - started
+    print(f"batched:    {len(sink.requests)} requests, {batched:.2f}s, {delivered / batched:.0f} emails/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# benchmarks/bench_interview_scheduler.py
+"""
+Load test for the interview dispatcher against a real Postgres database.
+
+Books N interviews spread over a time window, then replays the scheduler's
+polling loop on a simulated clock with several concurrent dispatchers. It
+checks that every interview is claimed exactly once and reports per-poll
+latency and claim throughput.
+
+    DATABASE_URL=postgresql://localhost/nexpath_bench \\
+        python benchmarks/bench_interview_scheduler.py --interviews 10000 --dispatchers 4
+"""
+import argparse
+import statistics
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import delete, insert  # noqa: E402
+
+import interview_scheduler  # noqa: E402
+from postgres_client import SessionLocal  # noqa: E402
+from postgres_models import Interview  # noqa: E402
+
+BENCH_USER = "bench-scheduler"
+
+
+def book_interviews(count, window_seconds, start):
+    rows = [
+        {
+            "user_id": BENCH_USER,
+            "phone_number": f"+9198{i:08d}",
+            "scheduled_time": start + timedelta(seconds=window_seconds * i / count),
+            "status": "scheduled",
+        }
+        for i in range(count)
+    ]
+    db = SessionLocal()
+    try:
+        db.execute(delete(Interview).where(Interview.user_id == BENCH_USER))
+        db.execute(insert(Interview), rows)
+        db.commit()
+    finally:
+        db.close()
+
+
+def run_dispatcher(clock, claimed, poll_times, lock, stop):
+    def enqueue(interview_id, phone_number, countdown):
+        with lock:
+            claimed.append((interview_id, countdown))
+
+    db = SessionLocal()
+    try:
+        while True:
+            clock["go"].wait()
+            if stop.is_set():
+                break
+            started = time.perf_counter()
+            interview_scheduler.dispatch_due_interviews(db, enqueue, now=clock["now"])
+            with lock:
+                poll_times.append((time.perf_counter() - started) * 1000)
+            clock["done"].wait()
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--interviews", type=int, default=10000)
+    parser.add_argument("--window", type=int, default=3600, help="seconds over which bookings are spread")
+    parser.add_argument("--dispatchers", type=int, default=4)
+    args = parser.parse_args()
+
+    start = datetime.now().replace(microsecond=0)
+    book_interviews(args.interviews, args.window, start)
+
+    interval = interview_scheduler.DISPATCH_INTERVAL_SECONDS
+    claimed, poll_times, lock, stop = [], [], threading.Lock(), threading.Event()
+    clock = {"now": start, "go": threading.Barrier(args.dispatchers + 1), "done": threading.Barrier(args.dispatchers + 1)}
+    threads = [
+        threading.Thread(target=run_dispatcher, args=(clock, claimed, poll_times, lock, stop), daemon=True)
+        for _ in range(args.dispatchers)
+    ]
+
+    wall_started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    polls = args.window // interval + 2
+    for tick in range(polls):
+        clock["now"] = start + timedelta(seconds=interval * tick)
+        clock["go"].wait()
+        clock["done"].wait()
+    stop.set()
+    clock["go"].wait()
+    for thread in threads:
+        thread.join(timeout=10)
+    wall = time.perf_counter() - wall_started
+
+    counts = Counter(interview_id for interview_id, _ in claimed)
+    duplicates = sum(1 for c in counts.values() if c > 1)
+    countdowns = [countdown for _, countdown in claimed]
+    ordered = sorted(poll_times)
+
+    print(f"booked:       {args.interviews} over {args.window}s, {polls} polls x {args.dispatchers} dispatchers")
+    print(f"claimed:      {len(counts)} unique, {duplicates} claimed more than once")
+    print(f"poll latency: p50 {ordered[len(ordered) // 2]:.1f} ms, p99 {ordered[int(len(ordered) * 0.99)]:.1f} ms")
+    print(f"countdown:    max {max(countdowns, default=0):.0f}s (bounded by the {interview_scheduler.DISPATCH_LOOKAHEAD_SECONDS}s lookahead), "
+          f"mean {statistics.mean(countdowns) if countdowns else 0:.0f}s")
+    print(f"wall time:    {wall:.2f}s, {len(claimed) / wall:.0f} claims/s")
+
+    db = SessionLocal()
+    try:
+        db.execute(delete(Interview).where(Interview.user_id == BENCH_USER))
+        db.commit()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# benchmarks/bench_job_ranking.py
+"""
+Ranking and near-duplicate removal over large synthetic JSearch result sets:
+job_ranking.rank_jobs (two vectorized cdist calls) versus a per-pair Python
+loop calling the same rapidfuzz scorers.
+
+    python benchmarks/bench_job_ranking.py --sizes 100 1000 5000 --naive-max 1000
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from rapidfuzz import fuzz, utils  # noqa: E402
+
+from job_ranking import DEDUP_THRESHOLD, rank_jobs  # noqa: E402
+
+SENIORITY = ["", "Junior", "Senior", "Sr.", "Lead", "Principal", "Associate"]
+ROLES = ["Python Developer", "Data Scientist", "Backend Engineer", "Product Manager", "UX Designer",
+         "Software Engineer", "Marketing Analyst", "DevOps Engineer", "ML Engineer", "QA Engineer"]
+SUFFIXES = ["", "- Remote", "(Hybrid)", "II", "- Bangalore", "- Contract"]
+EMPLOYERS = [f"Company {i}" for i in range(300)]
+CITIES = ["Pune", "Bangalore", "Hyderabad", "Chennai"]
+
+
+def make_jobs(count, duplicate_share=0.2, seed=7):
+    rng = random.Random(seed)
+    jobs = []
+    for i in range(count):
+        if jobs and rng.random() < duplicate_share:
+            # Re-post of an earlier job with a cosmetic difference
+            original = rng.choice(jobs)
+            title = original["job_title"] + rng.choice([" ", " - Remote", "!"])
+            employer = original["employer_name"] + rng.choice(["", " Pvt Ltd", " Inc"])
+            # Mostly the same posting again; sometimes the same role in another city, which is kept
+            city = original["job_city"] if rng.random() < 0.8 else rng.choice(CITIES)
+        else:
+            title = " ".join(filter(None, [rng.choice(SENIORITY), rng.choice(ROLES), rng.choice(SUFFIXES)]))
+            employer = rng.choice(EMPLOYERS)
+            city = rng.choice(CITIES)
+        jobs.append({"job_id": f"job-{i}", "job_title": title, "employer_name": employer, "job_city": city,
+                     "job_country": "IN"})
+    return jobs
+
+
+def naive_rank(jobs, job_title, dedup_threshold=DEDUP_THRESHOLD):
+    scored = sorted(
+        ((fuzz.token_set_ratio(job_title, job["job_title"], processor=utils.default_process), job) for job in jobs),
+        key=lambda pair: -pair[0],
+    )
+    kept = []
+    for score, job in scored:
+        key = f"{job['job_title']} {job['employer_name']}"
+        if any(
+            fuzz.token_sort_ratio(key, f"{other['job_title']} {other['employer_name']}",
+                                  processor=utils.default_process) >= dedup_threshold
+            for other in kept if other["job_city"] == job["job_city"]
+        ):
+            continue
+        kept.append(job)
+    return kept
+
+
+def timed(fn, *args, repeat=3):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--naive-max", type=int, default=1000, help="skip the Python loop above this size")
+    parser.add_argument("--query", default="Senior Python Developer")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        jobs = make_jobs(size)
+        vectorized, ranked = timed(lambda: rank_jobs([dict(job) for job in jobs], args.query))
+        line = f"{size:>6} jobs: cdist {vectorized * 1000:8.1f} ms, kept {len(ranked)}"
+        if size <= args.naive_max:
+            naive, kept = timed(naive_rank, jobs, args.query, repeat=1)
+            line += f" | loop {naive * 1000:9.1f} ms, kept {len(kept)} | {naive / vectorized:5.1f}x"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
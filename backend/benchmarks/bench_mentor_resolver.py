@@ -0,0 +1,96 @@
+# benchmarks/bench_mentor_resolver.py
+"""
+Match rate and lookup latency of mentor_resolver versus the old exact lookup
+(`MENTOR_PLATFORM_LINKS.get(field.lower(), default)`).
+
+The labeled corpus in mentorship_phrasings.tsv gives accuracy as well as match
+rate. With --mongo, interest phrases are also extracted from the logged user
+messages with intent "mentorship" (no labels, so match rate only).
+
+    python benchmarks/bench_mentor_resolver.py --repeat 1000
+    python benchmarks/bench_mentor_resolver.py --mongo --limit 5000
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mentor_resolver import DEFAULT_FIELD, MENTOR_LINKS_PATH, MentorFieldResolver  # noqa: E402
+
+CORPUS_PATH = Path(__file__).parent / "mentorship_phrasings.tsv"
+
+
+def load_corpus(path=CORPUS_PATH):
+    rows = []
+    for line in path.read_text().splitlines():
+        if line.strip() and not line.startswith("#"):
+            expected, phrase = line.split("\t", 1)
+            rows.append((expected, phrase))
+    return rows
+
+
+def load_mongo_phrases(limit):
+    # Imported lazily: only this mode needs MONGO_URI and main's extractor
+    from main import extract_interest_field
+    from mongodb_client import chat_collection
+
+    cursor = chat_collection.find({"role": "user", "intent": "mentorship"}, {"message": 1}).limit(limit)
+    return [extract_interest_field(doc["message"]) for doc in cursor if doc.get("message")]
+
+
+def report(name, phrases, resolve, expected=None, repeat=1):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fields = [resolve(phrase) for phrase in phrases]
+    per_lookup_us = (time.perf_counter() - started) / (repeat * len(phrases)) * 1e6
+    matched = sum(field != DEFAULT_FIELD for field in fields)
+    line = f"{name:<22} match rate {matched / len(phrases):6.1%}  {per_lookup_us:8.2f} us/lookup"
+    if expected:
+        correct = sum(field == want for field, want in zip(fields, expected))
+        line += f"  accuracy {correct / len(phrases):6.1%}"
+    print(line)
+    return fields
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200, help="passes over the corpus for the warm timings")
+    parser.add_argument("--mongo", action="store_true", help="also measure logged mentorship messages")
+    parser.add_argument("--limit", type=int, default=5000)
+    parser.add_argument("--show-misses", action="store_true")
+    args = parser.parse_args()
+
+    links = json.loads(MENTOR_LINKS_PATH.read_text())
+
+    def exact(phrase):
+        return phrase.lower() if phrase.lower() in links else DEFAULT_FIELD
+
+    corpus = load_corpus()
+    expected = [want for want, _ in corpus]
+    phrases = [phrase for _, phrase in corpus]
+    print(f"labeled corpus: {len(phrases)} phrases")
+    report("exact lookup", phrases, exact, expected, repeat=args.repeat)
+
+    resolver = MentorFieldResolver(cache_size=0)
+    fields = report("resolver (uncached)", phrases, resolver.resolve, expected, repeat=args.repeat)
+    resolver = MentorFieldResolver()
+    report("resolver (cached)", phrases, resolver.resolve, expected, repeat=args.repeat)
+
+    if args.show_misses:
+        for phrase, field, want in zip(phrases, fields, expected):
+            if field != want:
+                print(f"  miss: {phrase!r} -> {field} (expected {want})")
+
+    if args.mongo:
+        logged = load_mongo_phrases(args.limit)
+        print(f"\nlogged mentorship messages: {len(logged)}")
+        if logged:
+            report("exact lookup", logged, exact)
+            report("resolver (uncached)", logged, MentorFieldResolver(cache_size=0).resolve)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+# benchmarks/bench_resume_search.py
+"""
+Latency of resume_search.search_resumes on a synthetic table of resumes,
+compared with the alternative of loading resume_data and filtering in Python.
+
+Needs a Postgres DATABASE_URL. Everything is created in a scratch schema
+(dropped afterwards unless --keep), so the application's tables are not
+touched:
+
+    python benchmarks/bench_resume_search.py --rows 1000000 --repeat 50
+    python benchmarks/bench_resume_search.py --rows 1000000 --keep --explain
+
+Rows are generated inside Postgres (generate_series), ~1-2 minutes per
+million including the GIN indexes. Skills are drawn with a skew so that a few
+are very common and most are rare, and are written with inconsistent casing
+and spacing to exercise normalization.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dotenv import load_dotenv  # noqa: E402
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from postgres_models import Resume  # noqa: E402
+from resume_search import location_terms, migrate_search_schema, normalize_term, search_resumes  # noqa: E402
+
+SCHEMA = "bench_resume_search"
+SKILLS = [
+    "Python", "SQL", "JavaScript", "Java", "Excel", "Communication", "AWS", "React", "Machine Learning",
+    " python ", "Docker", "Node.js", "Data Analysis", "Kubernetes", "TypeScript", "Power BI", "Figma",
+    "Go", "C++", "Tableau", "Project Management", "DATA  ANALYSIS", "Rust", "Scala", "Terraform",
+    "Spark", "Flutter", "Kotlin", "Swift", "Elixir",
+]
+CITIES = ["Bangalore", "Mumbai", "Delhi", "Hyderabad", "Pune", "Chennai", "Kolkata", "Remote", "Ahmedabad", "Jaipur"]
+
+QUERIES = {
+    "python AND aws in bangalore": dict(skills=["Python", "AWS"], location="Bangalore"),
+    "sql, graduated 2019": dict(skills=["sql"], graduation_year=2019),
+    "rust OR elixir": dict(skills=["rust", "elixir"], match_all=False),
+    "kubernetes AND terraform in pune": dict(skills=["kubernetes", "terraform"], location="Pune"),
+    "location only (jaipur)": dict(location="Jaipur"),
+}
+
+POPULATE_SQL = """
+INSERT INTO resumes (user_id, resume_data, created_at, file_name, template_used)
+SELECT
+    'bench-' || (g % 50000),
+    jsonb_build_object(
+        'personal_info', jsonb_build_object(
+            'name', 'Candidate ' || g, 'email', 'c' || g || '@example.com', 'phone', '9876543210',
+            'address', (g % 97) || ' Main Road, ' || (:cities)[1 + g % cardinality(:cities)] || ', India'),
+        'skills', (
+            SELECT jsonb_agg((:skills)[1 + floor(power(random(), 2) * cardinality(:skills))::int])
+            FROM generate_series(1, 3 + g % 8) k),
+        'education', jsonb_build_array(jsonb_build_object(
+            'degree', 'B.Tech', 'institution', 'Institute ' || (g % 300),
+            'graduation_year', (2005 + g % 20)::text)),
+        'work_experience', jsonb_build_array(jsonb_build_object(
+            'job_title', 'Engineer', 'company', 'Company ' || (g % 1000),
+            'location', (:cities)[1 + (g / 7) % cardinality(:cities)],
+            'start_date', '2020', 'end_date', '2023', 'responsibilities', jsonb_build_array('Built services')))
+    ),
+    now() - make_interval(mins => g),
+    'Resume_' || g || '.pdf',
+    'professional'
+FROM generate_series(:start, :stop) g
+"""
+
+
+def database_url() -> str:
+    load_dotenv()
+    url = os.getenv("DATABASE_URL") or os.getenv("POSTGRES_URL")
+    if not url:
+        sys.exit("DATABASE_URL is not set")
+    if url.startswith("postgres://"):
+        url = url.replace("postgres://", "postgresql+psycopg://", 1)
+    elif url.startswith("postgresql://"):
+        url = url.replace("postgresql://", "postgresql+psycopg://", 1)
+    return url
+
+
+def populate(engine, rows: int, batch: int):
+    Resume.__table__.create(engine, checkfirst=True)
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(text("SELECT setseed(0.42)"))
+        for start in range(1, rows + 1, batch):
+            stop = min(start + batch - 1, rows)
+            conn.execute(text(POPULATE_SQL), {"skills": SKILLS, "cities": CITIES, "start": start, "stop": stop})
+            print(f"  inserted {stop:,} rows", end="\r", flush=True)
+    print(f"  inserted {rows:,} rows in {time.perf_counter() - started:.1f}s")
+    started = time.perf_counter()
+    migrate_search_schema(engine)
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE resumes"))
+    print(f"  generated columns + GIN indexes in {time.perf_counter() - started:.1f}s")
+
+
+def python_filter(rows, skills=(), location=None, graduation_year=None, match_all=True):
+    # What a search costs without indexes: every resume_data blob, filtered in the app
+    wanted = {normalize_term(skill) for skill in skills}
+    places = set(location_terms(location)) if location else set()
+    matches = []
+    for resume_id, data in rows:
+        have = {normalize_term(skill) for skill in data.get("skills", [])}
+        if wanted and not (wanted <= have if match_all else wanted & have):
+            continue
+        if places:
+            found = set(location_terms(data.get("personal_info", {}).get("address") or ""))
+            for item in data.get("work_experience", []) + data.get("education", []):
+                found.update(location_terms(item.get("location") or ""))
+            if not places <= found:
+                continue
+        if graduation_year and not any(e.get("graduation_year") == str(graduation_year) for e in data.get("education", [])):
+            continue
+        matches.append(resume_id)
+    return matches
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[max(0, int(round(pct / 100 * len(ordered))) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--baseline-rows", type=int, default=50_000,
+                        help="rows loaded for the Python-filter baseline; extrapolated to --rows")
+    parser.add_argument("--keep", action="store_true", help="keep (and reuse) the scratch schema")
+    parser.add_argument("--explain", action="store_true", help="print EXPLAIN ANALYZE for each query")
+    args = parser.parse_args()
+
+    url = database_url()
+    admin = create_engine(url)
+    with admin.begin() as conn:
+        conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {SCHEMA}"))
+    engine = create_engine(url, connect_args={"options": f"-c search_path={SCHEMA}"})
+    Session = sessionmaker(bind=engine)
+
+    try:
+        with engine.connect() as conn:
+            existing = conn.execute(text("SELECT count(*) FROM pg_tables WHERE schemaname = :s AND tablename = 'resumes'"),
+                                    {"s": SCHEMA}).scalar()
+            count = conn.execute(text("SELECT count(*) FROM resumes")).scalar() if existing else 0
+        if count < args.rows:
+            print(f"Populating {SCHEMA}.resumes with {args.rows:,} synthetic resumes...")
+            if count:
+                with engine.begin() as conn:
+                    conn.execute(text("DROP TABLE resumes"))
+            populate(engine, args.rows, args.batch)
+        else:
+            print(f"Reusing {count:,} rows in {SCHEMA}.resumes")
+
+        with engine.connect() as conn:
+            sample = conn.execute(
+                text("SELECT id, resume_data FROM resumes ORDER BY id DESC LIMIT :n"), {"n": args.baseline_rows}
+            ).all()
+
+        print(f"\n{'query':<36}{'hits':>6}{'p50 ms':>9}{'p95 ms':>9}{'python scan (extrapolated) ms':>32}")
+        db = Session()
+        for name, params in QUERIES.items():
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                items, _ = search_resumes(db, limit=args.limit, **params)
+                timings.append((time.perf_counter() - started) * 1000)
+            started = time.perf_counter()
+            python_filter(sample, **params)
+            scan_ms = (time.perf_counter() - started) * 1000 * args.rows / max(len(sample), 1)
+            print(f"{name:<36}{len(items):>6}{statistics.median(timings):>9.2f}{percentile(timings, 95):>9.2f}"
+                  f"{scan_ms:>32.0f}")
+        db.close()
+
+        if args.explain:
+            print("\nEXPLAIN ANALYZE (python AND aws in bangalore):")
+            with engine.connect() as conn:
+                plan = conn.execute(text(
+                    "EXPLAIN (ANALYZE, BUFFERS) SELECT id FROM resumes "
+                    "WHERE skills_normalized @> ARRAY['aws', 'python'] AND location_terms @> ARRAY['bangalore'] "
+                    "ORDER BY id DESC LIMIT :limit"
+                ), {"limit": args.limit + 1}).scalars().all()
+            print("\n".join(plan))
+    finally:
+        if not args.keep:
+            with admin.begin() as conn:
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
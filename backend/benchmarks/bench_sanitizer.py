@@ -0,0 +1,142 @@
+# benchmarks/bench_sanitizer.py
+"""
+utils.remove_invalid_characters / sanitize_records versus the original
+per-character `unicodedata.category` join, on single strings and on the job
+pipeline of one /chat/ job search:
+
+  before  3 fields sanitized in clean_jobs, then 4 again (the whole
+          multi-kilobyte description) while building the job cards
+  after   sanitize_records once in clean_jobs, description cut to 300 first
+
+Also checks that both sanitizers agree on random text with control, format
+and unassigned characters mixed in.
+
+    python benchmarks/bench_sanitizer.py --jobs 10 --repeat 2000
+"""
+import argparse
+import random
+import sys
+import time
+import unicodedata
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from job_cache import DESCRIPTION_PREVIEW_CHARS, JOB_TEXT_FIELDS  # noqa: E402
+from utils import remove_invalid_characters, sanitize_records  # noqa: E402
+
+NOISE = ["\x00", "\t", "\n", "\r", "\u200b", "\u200e", "\ufeff", "\x7f", "\u0378", "\ue000", "\xa0", "\u2028"]
+
+
+def legacy_remove_invalid_characters(text: str) -> str:
+    if not isinstance(text, str):
+        return ""
+    return ''.join(c for c in text if unicodedata.category(c)[0] != 'C')
+
+
+def make_jobs(count: int, dirty: bool, seed: int = 3) -> list:
+    rng = random.Random(seed)
+    description = ("We are hiring a backend engineer to build APIs with FastAPI and Postgres. "
+                   "You will work with a distributed team across Bangalore and Pune — café culture, "
+                   "flexible hours, health cover. ") * 16
+    jobs = []
+    for index in range(count):
+        job = {
+            "job_title": f"Senior Python Developer {index}",
+            "employer_name": "Nimbus Labs Pvt. Ltd.",
+            "job_city": "Bengaluru",
+            "job_description": description,
+            "job_apply_link": f"https://jobs.example.com/{index}",
+        }
+        if dirty:
+            for field in JOB_TEXT_FIELDS:
+                text = list(job[field])
+                for _ in range(max(1, len(text) // 200)):
+                    text.insert(rng.randrange(len(text) + 1), rng.choice(NOISE))
+                job[field] = "".join(text)
+        jobs.append(job)
+    return jobs
+
+
+def before_pipeline(jobs):
+    for job in jobs:
+        job["job_title"] = legacy_remove_invalid_characters(job.get("job_title", ""))
+        job["employer_name"] = legacy_remove_invalid_characters(job.get("employer_name", ""))
+        job["job_city"] = legacy_remove_invalid_characters(job.get("job_city", ""))
+    return [
+        {
+            "title": legacy_remove_invalid_characters(job.get("job_title", "")),
+            "company": legacy_remove_invalid_characters(job.get("employer_name", "")),
+            "city": legacy_remove_invalid_characters(job.get("job_city", "")),
+            "description": legacy_remove_invalid_characters(job.get("job_description", ""))[:300] + "...",
+        }
+        for job in jobs
+    ]
+
+
+def after_pipeline(jobs):
+    sanitize_records(jobs, JOB_TEXT_FIELDS, {"job_description": DESCRIPTION_PREVIEW_CHARS})
+    return [
+        {
+            "title": job.get("job_title", ""),
+            "company": job.get("employer_name", ""),
+            "city": job.get("job_city", ""),
+            "description": job.get("job_description", "")[:DESCRIPTION_PREVIEW_CHARS] + "...",
+        }
+        for job in jobs
+    ]
+
+
+def per_call_us(fn, make_input, repeat):
+    total = 0.0
+    for _ in range(repeat):
+        value = make_input()
+        started = time.perf_counter()
+        fn(value)
+        total += time.perf_counter() - started
+    return total / repeat * 1e6
+
+
+def check_equivalence(samples=20_000, seed=11):
+    rng = random.Random(seed)
+    for _ in range(samples):
+        text = "".join(chr(rng.randrange(0x110000)) if rng.random() < 0.2 else rng.choice("abc é—") for _ in range(20))
+        text += "".join(rng.choice(NOISE) for _ in range(rng.randrange(3)))
+        assert remove_invalid_characters(text) == legacy_remove_invalid_characters(text), repr(text)
+    print(f"equivalent on {samples:,} random strings")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    remove_invalid_characters("\x00")
+    print(f"character classes built in {(time.perf_counter() - started) * 1000:.0f} ms (once per process)")
+    check_equivalence()
+
+    description = make_jobs(1, dirty=False)[0]["job_description"]
+    dirty_description = make_jobs(1, dirty=True)[0]["job_description"]
+    print(f"\n{'case':<40}{'legacy us':>11}{'new us':>10}{'speedup':>9}")
+    cases = [
+        ("title, clean", "Senior Python Developer", None),
+        (f"description ({len(description)} chars), clean", description, None),
+        (f"description ({len(dirty_description)} chars), dirty", dirty_description, None),
+        ("description, dirty, cut to 300 first", dirty_description, DESCRIPTION_PREVIEW_CHARS),
+    ]
+    for label, text, max_length in cases:
+        legacy = per_call_us(lambda t: legacy_remove_invalid_characters(t)[:max_length], lambda: text, args.repeat)
+        new = per_call_us(lambda t: remove_invalid_characters(t, max_length), lambda: text, args.repeat)
+        print(f"{label:<40}{legacy:>11.1f}{new:>10.2f}{legacy / new:>8.0f}x")
+
+    for dirty in (False, True):
+        label = f"job pipeline, {args.jobs} jobs, {'dirty' if dirty else 'clean'}"
+        legacy = per_call_us(before_pipeline, lambda: make_jobs(args.jobs, dirty), args.repeat // 10 or 1)
+        new = per_call_us(after_pipeline, lambda: make_jobs(args.jobs, dirty), args.repeat // 10 or 1)
+        print(f"{label:<40}{legacy:>11.1f}{new:>10.2f}{legacy / new:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
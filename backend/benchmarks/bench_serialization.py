@@ -0,0 +1,130 @@
+# benchmarks/bench_serialization.py
+"""
+Serialization CPU and bytes on the wire for the heaviest JSON responses: the
+/chat/ job results, /chat/session/{id} history and the dashboard.
+
+Compares the old path (`jsonable_encoder` + stdlib-backed JSONResponse) with
+serialization.FastJSONResponse, and reports the body size with and without
+the gzip compression GZipMiddleware applies above GZIP_MINIMUM_SIZE.
+
+    python benchmarks/bench_serialization.py --repeat 2000
+"""
+import argparse
+import gzip
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bson import ObjectId  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from serialization import GZIP_COMPRESS_LEVEL, GZIP_MINIMUM_SIZE, FastJSONResponse  # noqa: E402
+
+NOW = datetime(2025, 1, 15, 10, 30)
+
+
+def job_results(count=10):
+    return {
+        "response": "🌟 Here are some jobs for 'python developer' in 'Bangalore':",
+        "job_results": [
+            {
+                "title": f"Senior Python Developer {i}",
+                "company": "Nimbus Labs",
+                "city": "Bangalore",
+                "description": ("We are hiring a backend engineer to build APIs with FastAPI and Postgres. " * 5)[:300] + "...",
+                "apply_link": f"https://jobs.example.com/{i:016x}",
+                "employer_website": "https://www.nimbuslabs.com",
+                "employer_logo": "https://logo.example.com/nimbus.png",
+                "employment_type": "FULLTIME",
+                "posted_at": "2025-01-12T09:00:00.000Z",
+            }
+            for i in range(count)
+        ],
+        "session_id": "6f1c2b1e-8d1a-4a57-9d55-2f3c8a1b7e10",
+    }
+
+
+def session_history(count=200):
+    # Raw Mongo documents, as get_session_messages reads them
+    return {
+        "messages": [
+            {
+                "_id": ObjectId(),
+                "session_id": "6f1c2b1e-8d1a-4a57-9d55-2f3c8a1b7e10",
+                "user_id": "user-42",
+                "role": "bot" if i % 2 else "user",
+                "message": "Here are a few practical next steps: update your resume with measurable results. " * 3,
+                "timestamp": NOW + timedelta(seconds=i),
+                "intent": "career_advice",
+                "entities": {},
+                "sender": "bot" if i % 2 else "user",
+            }
+            for i in range(count)
+        ]
+    }
+
+
+def dashboard(count=20):
+    return {
+        "saved_jobs": [
+            {"id": i, "job_title": "Data Scientist", "company_name": "Quantify", "apply_link": None,
+             "saved_at": NOW - timedelta(days=i)}
+            for i in range(count)
+        ],
+        "documents": [
+            {"id": i, "file_name": f"Resume_{i}.pdf", "download_url": f"https://example.com/static/resumes/{i}.pdf",
+             "created_at": NOW, "personal_info": {"name": "Asha", "email": "asha@example.com", "phone": "9876543210"}}
+            for i in range(count)
+        ],
+        "upcoming_events": [{"id": i, "title": "Hackathon", "event_date": NOW, "join_link": None} for i in range(5)],
+        "career_tip": {"tip_text": "Quantify your impact on every resume bullet."},
+        "metadata": {"total_resumes_count": count},
+    }
+
+
+def stdlib_render(content) -> bytes:
+    return JSONResponse(content=jsonable_encoder(content)).body
+
+
+def fast_render(content) -> bytes:
+    return FastJSONResponse(content=content).body
+
+
+def per_call_us(fn, content, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(content)
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=1000)
+    args = parser.parse_args()
+
+    payloads = {
+        "job results (10)": job_results(10),
+        "job results (100)": job_results(100),
+        "session history (200)": session_history(200),
+        "dashboard (20)": dashboard(20),
+    }
+    print(f"{'payload':<24}{'stdlib us':>11}{'orjson us':>11}{'speedup':>9}{'bytes':>9}{'gzip bytes':>12}{'gzip us':>9}")
+    for name, content in payloads.items():
+        # ObjectIds are not stdlib-serializable; the old handler str()-ed them first
+        old_content = jsonable_encoder(content, custom_encoder={ObjectId: str})
+        stdlib_us = per_call_us(stdlib_render, old_content, args.repeat)
+        fast_us = per_call_us(fast_render, content, args.repeat)
+        body = fast_render(content)
+        started = time.perf_counter()
+        compressed = gzip.compress(body, compresslevel=GZIP_COMPRESS_LEVEL)
+        gzip_us = (time.perf_counter() - started) * 1e6
+        wire = len(compressed) if len(body) >= GZIP_MINIMUM_SIZE else len(body)
+        print(f"{name:<24}{stdlib_us:>11.1f}{fast_us:>11.1f}{stdlib_us / fast_us:>8.1f}x{len(body):>9}{wire:>12}{gzip_us:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
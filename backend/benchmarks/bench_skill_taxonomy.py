@@ -0,0 +1,133 @@
+# benchmarks/bench_skill_taxonomy.py
+"""
+Build cost, memory and per-lookup latency of skill_taxonomy.SkillTaxonomy on a
+taxonomy of tens of thousands of skills: the shipped skill_taxonomy.json plus
+generated ones (with aliases and skewed popularity).
+
+Compares autocomplete with a linear `startswith` scan over every key, and
+resume categorization with the hardcoded lists generate_professional_template
+used before.
+
+    python benchmarks/bench_skill_taxonomy.py --skills 50000 --repeat 20000
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from skill_taxonomy import SKILL_TAXONOMY_PATH, SkillTaxonomy, skill_key  # noqa: E402
+
+SYLLABLES = ["ka", "ro", "zen", "ti", "lux", "mar", "quo", "ve", "nix", "dra", "sol", "pi", "gra", "fen", "tor",
+             "ly", "ban", "cy", "mo", "rex", "ul", "ja", "sto", "wi"]
+SUFFIXES = ["", "", "", "JS", " DB", " Cloud", " Studio", " Analytics", " Framework", " Testing", " Ops"]
+
+
+def synthetic_taxonomy(count: int, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    taxonomy = json.loads(Path(SKILL_TAXONOMY_PATH).read_text())
+    categories = list(taxonomy)
+    names = {skill_key(item if isinstance(item, str) else item["name"]) for items in taxonomy.values() for item in items}
+    while sum(len(items) for items in taxonomy.values()) < count:
+        base = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+        name = base + rng.choice(SUFFIXES)
+        if skill_key(name) in names:
+            continue
+        names.add(skill_key(name))
+        aliases = [base.lower() + " " + suffix.strip().lower() for suffix in [rng.choice(SUFFIXES)] if suffix.strip()]
+        taxonomy[rng.choice(categories)].append(
+            {"name": name, "aliases": aliases, "popularity": int(rng.paretovariate(1.2))}
+        )
+    return taxonomy
+
+
+def legacy_categorize(skills):
+    # The loop generate_professional_template ran before the taxonomy existed
+    skill_categories = {"Languages": [], "Frameworks": [], "Tools": [], "Platforms": [], "Other": []}
+    for skill in skills:
+        skill_lower = skill.lower()
+        if skill_lower in ['python', 'java', 'javascript', 'c++', 'c#', 'sql', 'r', 'ruby', 'php', 'go']:
+            skill_categories["Languages"].append(skill)
+        elif skill_lower in ['react', 'angular', 'vue', 'django', 'flask', 'spring', 'node.js', 'express', '.net']:
+            skill_categories["Frameworks"].append(skill)
+        elif skill_lower in ['git', 'docker', 'kubernetes', 'jenkins', 'jira', 'postman', 'vscode']:
+            skill_categories["Tools"].append(skill)
+        elif skill_lower in ['aws', 'azure', 'gcp', 'linux', 'windows', 'macos', 'ios', 'android']:
+            skill_categories["Platforms"].append(skill)
+        else:
+            skill_categories["Other"].append(skill)
+    return skill_categories
+
+
+def linear_autocomplete(keys, prefix, limit=10):
+    wanted = skill_key(prefix)
+    matches = [skill for key, skill in keys if key.startswith(wanted)]
+    matches.sort(key=lambda skill: -skill.popularity)
+    return matches[:limit]
+
+
+def per_call(fn, inputs, repeat):
+    samples = []
+    for index in range(repeat):
+        value = inputs[index % len(inputs)]
+        started = time.perf_counter()
+        fn(value)
+        samples.append((time.perf_counter() - started) * 1e6)
+    samples.sort()
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--skills", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=20_000)
+    args = parser.parse_args()
+
+    raw = synthetic_taxonomy(args.skills)
+    tracemalloc.start()
+    started = time.perf_counter()
+    taxonomy = SkillTaxonomy(raw)
+    build_s = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{len(taxonomy.skills):,} skills, {len(taxonomy._by_key):,} keys: "
+          f"built in {build_s:.2f}s, peak {peak / 2**20:.0f} MiB traced")
+
+    rng = random.Random(1)
+    names = [skill.name for skill in rng.sample(taxonomy.skills, 1000)]
+    aliases = ["ReactJS", "react.js", "golang", "k8s", "Postgres", "node js", "sklearn", "MS Excel"]
+    misses = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(9)) for _ in range(1000)]
+    prefixes = {length: [name[:length] for name in names] for length in (1, 2, 3, 5, 10)}
+    resume_skills = ["Python", "ReactJS", "react.js", "AWS", "Docker", "k8s", "Postgres", "Figma", "Leadership",
+                     "Excel", "Node.js", "TypeScript", "GraphQL", "Jira", "Some Niche Tool", "pandas", "sklearn",
+                     "Git", "Linux", "Communication"]
+
+    print(f"\n{'lookup':<34}{'p50 us':>9}{'p99 us':>9}")
+    rows = [
+        ("canonical: exact name", taxonomy.canonical, names),
+        ("canonical: alias", taxonomy.canonical, aliases),
+        ("canonical: miss", taxonomy.canonical, misses),
+        *[(f"autocomplete: {n}-char prefix", taxonomy.autocomplete, prefixes[n]) for n in prefixes],
+        ("categorize: 20-skill resume", taxonomy.categorize, [resume_skills]),
+        ("legacy if-chain: 20-skill resume", legacy_categorize, [resume_skills]),
+    ]
+    for label, fn, inputs in rows:
+        p50, p99 = per_call(fn, inputs, args.repeat)
+        print(f"{label:<34}{p50:>9.2f}{p99:>9.2f}")
+
+    keys = list(taxonomy._by_key.items())
+    p50, p99 = per_call(lambda prefix: linear_autocomplete(keys, prefix), prefixes[2], min(args.repeat, 200))
+    print(f"{'linear scan: 2-char prefix':<34}{p50:>9.2f}{p99:>9.2f}")
+
+    legacy_other = legacy_categorize(resume_skills)["Other"]
+    taxonomy_other = taxonomy.categorize(resume_skills).get("Other", [])
+    print(f"\n'Other' on the sample resume: legacy {len(legacy_other)} of {len(resume_skills)}, "
+          f"taxonomy {len(taxonomy_other)} ({', '.join(taxonomy_other)})")
+
+
+if __name__ == "__main__":
+    main()
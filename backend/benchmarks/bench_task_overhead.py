@@ -0,0 +1,85 @@
+# benchmarks/bench_task_overhead.py
+"""
+Per-task overhead of building clients inside task bodies versus reusing
+per-process clients, measured through a local Redis broker.
+
+Three tasks are run N times each on an in-process worker:
+  noop  - broker round trip only (baseline)
+  cold  - builds a Redis pool, HTTP session and Twilio client per task, like
+          the old get_interview_state / module-level setup did
+  warm  - reuses clients created once per worker process, like worker_resources
+
+    redis-server --port 6379 &
+    python benchmarks/bench_task_overhead.py --tasks 500
+"""
+import argparse
+import os
+import time
+
+import redis
+import requests
+from celery import Celery, group
+from celery.contrib.testing.worker import start_worker
+from twilio.rest import Client
+
+BROKER_URL = os.getenv("BENCH_BROKER_URL", "redis://localhost:6379/15")
+
+app = Celery("bench_task_overhead", broker=BROKER_URL, backend=BROKER_URL)
+app.conf.update(worker_prefetch_multiplier=1, task_acks_late=True)
+
+_warm = {}
+
+
+def _build_clients():
+    client = redis.Redis.from_url(BROKER_URL, decode_responses=True)
+    session = requests.Session()
+    twilio = Client("AC" + "0" * 32, "token")
+    return client, session, twilio
+
+
+@app.task
+def noop():
+    return 1
+
+
+@app.task
+def cold():
+    client, session, _ = _build_clients()
+    client.ping()
+    client.close()
+    session.close()
+    return 1
+
+
+@app.task
+def warm():
+    if not _warm:
+        _warm["redis"], _warm["http"], _warm["twilio"] = _build_clients()
+    _warm["redis"].ping()
+    return 1
+
+
+def run(task, count):
+    started = time.perf_counter()
+    group(task.s() for _ in range(count)).apply_async().get(timeout=300)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=500)
+    args = parser.parse_args()
+
+    with start_worker(app, pool="solo", perform_ping_check=False, loglevel="WARNING"):
+        run(noop, 10)  # warm up the broker connection
+        baseline = run(noop, args.tasks)
+        results = {"noop": baseline, "cold": run(cold, args.tasks), "warm": run(warm, args.tasks)}
+
+    for name, elapsed in results.items():
+        per_task = elapsed / args.tasks * 1000
+        overhead = (elapsed - baseline) / args.tasks * 1000
+        print(f"{name:5s}: {args.tasks / elapsed:8.0f} tasks/s  {per_task:6.2f} ms/task  +{overhead:5.2f} ms over noop")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+# benchmarks/load_test.py
+"""
+Offline load test of the FastAPI app.
+
+Starts mock_herkey_api (the Gemini and JSearch emulator, with configurable
+latency) and the backend under uvicorn, points the backend at the stand-ins,
+drives a weighted mix of /chat/, /users/{id}/dashboard and /resumes/ traffic
+from `--concurrency` clients for `--duration` seconds, and reports RPS and
+p50/p95/p99 latency per scenario. Results are written as JSON to
+benchmarks/results/ so runs can be compared with --compare.
+
+All traffic is anonymous and comes from 127.0.0.1, so the backend's /chat/
+budgets (CHAT_LIMIT_*, see chat_admission.py) are raised out of reach unless
+--chat-limits is passed; upstream load shedding stays on.
+
+Redis and MongoDB are expected locally (Redis is optional: the API falls back
+to its in-process cache). Postgres defaults to a throwaway SQLite file; pass
+--database-url to measure against a local Postgres instead.
+
+    docker run -d -p 6379:6379 redis:7 && docker run -d -p 27017:27017 mongo:7
+    python benchmarks/load_test.py --duration 60 --concurrency 32
+    python benchmarks/load_test.py --mix chat_jobs=1 --compare benchmarks/results/<previous>.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import secrets
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+CHAT_LIMIT_VARIABLES = ("CHAT_LIMIT_PER_USER", "CHAT_LIMIT_PER_IP", "CHAT_LIMIT_GLOBAL", "CHAT_LIMIT_JOB_SEARCH",
+                        "CHAT_LIMIT_GEMINI", "CHAT_LIMIT_MENTORSHIP")
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+DEFAULT_MIX = {
+    "chat_jobs": 35,
+    "chat_gemini": 20,
+    "chat_mentorship": 10,
+    "dashboard": 20,
+    "resume_get": 10,
+    "resume_create": 5,
+}
+
+JOB_TITLES = ["python developer", "data scientist", "product manager", "ux designer", "devops engineer",
+              "marketing analyst", "java developer", "hr executive"]
+CITIES = ["Bangalore", "Mumbai", "Pune", "Hyderabad"]
+ADVICE_QUERIES = ["How do I prepare for a product manager interview?", "What should I learn to become a data analyst?",
+                  "How can I restart my career after a break?", "Tips for negotiating salary"]
+MENTOR_QUERIES = ["I want a mentor in data science", "connect me with a mentor for public speaking",
+                  "mentorship for starting my own business please", "guide me in ui/ux"]
+
+
+def resume_payload(user_id: str) -> dict:
+    return {
+        "user_id": user_id,
+        "personal_info": {"name": "Load Test", "email": f"{user_id}@example.com", "phone": "9876543210"},
+        "professional_summary": "Backend engineer with five years of experience building APIs.",
+        "skills": ["Python", "FastAPI", "PostgreSQL", "Redis"],
+        "work_experience": [{"job_title": "Software Engineer", "company": "TechCorp", "start_date": "2020",
+                             "end_date": "Present", "responsibilities": ["Built services", "Cut p95 by 40%"]}],
+        "education": [{"degree": "B.Tech", "institution": "IIT", "graduation_year": "2019"}],
+        "template": "professional",
+    }
+
+
+class LoadClient:
+    def __init__(self, client: httpx.AsyncClient, users: int, rng: random.Random):
+        self.client = client
+        self.users = users
+        self.rng = rng
+        self.resume_ids = []
+
+    def user_id(self) -> str:
+        return f"loadtest-user-{self.rng.randrange(self.users)}"
+
+    async def chat_jobs(self):
+        query = f"{self.rng.choice(JOB_TITLES)} jobs in {self.rng.choice(CITIES)}"
+        return await self.client.post("/chat/", json={"query": query, "user_id": self.user_id()})
+
+    async def chat_gemini(self):
+        return await self.client.post("/chat/", json={"query": self.rng.choice(ADVICE_QUERIES), "user_id": self.user_id()})
+
+    async def chat_mentorship(self):
+        return await self.client.post("/chat/", json={"query": self.rng.choice(MENTOR_QUERIES), "user_id": self.user_id()})
+
+    async def dashboard(self):
+        return await self.client.get(f"/users/{self.user_id()}/dashboard")
+
+    async def resume_create(self):
+        response = await self.client.post("/resumes/", json=resume_payload(self.user_id()))
+        if response.status_code == 200:
+            self.resume_ids.append(response.json()["resume_id"])
+        return response
+
+    async def resume_get(self):
+        if not self.resume_ids:
+            return await self.resume_create()
+        return await self.client.get(f"/resumes/{self.rng.choice(self.resume_ids)}")
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank percentile
+    return sorted_values[max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)]
+
+
+def summarize(samples: list, elapsed: float) -> dict:
+    """samples: (scenario, seconds, status) tuples."""
+    by_scenario = {}
+    for scenario, seconds, status in samples:
+        by_scenario.setdefault(scenario, []).append((seconds, status))
+    by_scenario["all"] = [(seconds, status) for _, seconds, status in samples]
+
+    report = {}
+    for scenario, rows in by_scenario.items():
+        latencies = sorted(seconds * 1000 for seconds, _ in rows)
+        report[scenario] = {
+            "requests": len(rows),
+            "errors": sum(1 for _, status in rows if status >= 500 or status == 0),
+            "rps": round(len(rows) / elapsed, 2),
+            "mean_ms": round(statistics.fmean(latencies), 2) if latencies else 0.0,
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+            "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+        }
+    return report
+
+
+async def run_load(base_url: str, mix: dict, concurrency: int, duration: float, users: int, seed: int):
+    scenarios, weights = zip(*mix.items())
+    samples = []
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        async def worker(worker_id: int):
+            load = LoadClient(client, users, random.Random(seed + worker_id))
+            while time.perf_counter() < deadline:
+                scenario = load.rng.choices(scenarios, weights)[0]
+                started = time.perf_counter()
+                try:
+                    status = (await getattr(load, scenario)()).status_code
+                except httpx.HTTPError:
+                    status = 0
+                samples.append((scenario, time.perf_counter() - started, status))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return summarize(samples, elapsed), elapsed
+
+
+def wait_until_ready(url: str, process: subprocess.Popen, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {process.returncode}")
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"{url} not ready after {timeout}s")
+
+
+def start_services(args, workdir: Path) -> list:
+    mock_env = {
+        **os.environ,
+        "MOCK_JSEARCH_LATENCY": str(args.jsearch_latency),
+        "MOCK_GEMINI_LATENCY": str(args.gemini_latency),
+        "MOCK_JSEARCH_ERROR_RATE": str(args.upstream_error_rate),
+        "MOCK_GEMINI_ERROR_RATE": str(args.upstream_error_rate),
+        "MOCK_JSEARCH_429_RATE": str(args.upstream_429_rate),
+        "MOCK_GEMINI_429_RATE": str(args.upstream_429_rate),
+    }
+    mock = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "mock_herkey_api:app", "--port", str(args.mock_port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=mock_env,
+    )
+    mock_url = f"http://127.0.0.1:{args.mock_port}"
+
+    # The backend runs in a scratch directory so generated PDFs stay out of the tree
+    (workdir / "static").mkdir(exist_ok=True)
+    backend_env = {
+        **os.environ,
+        "PYTHONPATH": str(BACKEND_DIR),
+        "JSEARCH_BASE_URL": mock_url,
+        "GEMINI_BASE_URL": mock_url,
+        "GEMINI_API_KEY": "load-test",
+        "RAPIDAPI_KEY": "load-test",
+        "DATABASE_URL": args.database_url or f"sqlite:///{workdir / 'load_test.db'}",
+        "REDIS_URL": args.redis_url,
+        "MONGO_URI": args.mongo_uri,
+        # session_tokens refuses to start without it; one value shared by all workers
+        "SESSION_SECRET": os.environ.get("SESSION_SECRET") or secrets.token_urlsafe(32),
+    }
+    if not args.chat_limits:
+        backend_env.update({name: str(10 ** 9) for name in CHAT_LIMIT_VARIABLES})
+    backend = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port), "--workers", str(args.workers),
+         "--log-level", "warning"],
+        cwd=workdir, env=backend_env,
+    )
+    processes = [mock, backend]
+    try:
+        wait_until_ready(f"{mock_url}/jobs", mock)
+        wait_until_ready(f"http://127.0.0.1:{args.port}/metrics", backend)
+    except Exception:
+        stop_services(processes)
+        raise
+    return processes
+
+
+def stop_services(processes: list):
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_report(report: dict, previous: dict = None):
+    print(f"{'scenario':<16}{'requests':>9}{'errors':>8}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for scenario, row in report.items():
+        line = (f"{scenario:<16}{row['requests']:>9}{row['errors']:>8}{row['rps']:>9.1f}"
+                f"{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}")
+        before = (previous or {}).get(scenario)
+        if before and before["p95_ms"]:
+            line += f"   p95 {100 * (row['p95_ms'] / before['p95_ms'] - 1):+.0f}%, rps {row['rps'] - before['rps']:+.1f}"
+        print(line)
+
+
+def parse_mix(text: str) -> dict:
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown scenario {name!r}; choose from {', '.join(DEFAULT_MIX)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--users", type=int, default=200, help="distinct user ids in the traffic")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="e.g. chat_jobs=3,dashboard=1")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the backend")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--mock-port", type=int, default=8101)
+    parser.add_argument("--jsearch-latency", type=float, default=0.3)
+    parser.add_argument("--gemini-latency", type=float, default=0.8)
+    parser.add_argument("--upstream-error-rate", type=float, default=0.0, help="share of upstream calls failing with 503")
+    parser.add_argument("--upstream-429-rate", type=float, default=0.0, help="share of upstream calls answered with 429")
+    parser.add_argument("--redis-url", default="redis://localhost:6379/14")
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017/")
+    parser.add_argument("--database-url", default=None, help="defaults to a scratch SQLite database")
+    parser.add_argument("--chat-limits", action="store_true",
+                        help="keep the backend's /chat/ budgets (they are raised out of reach by default)")
+    parser.add_argument("--target", default=None, help="load an already running backend instead of starting one")
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--compare", type=Path, default=None, help="earlier results JSON to diff against")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="load_test_") as workdir:
+        processes = [] if args.target else start_services(args, Path(workdir))
+        base_url = args.target or f"http://127.0.0.1:{args.port}"
+        try:
+            report, elapsed = asyncio.run(
+                run_load(base_url, args.mix, args.concurrency, args.duration, args.users, args.seed)
+            )
+        finally:
+            stop_services(processes)
+
+    previous = json.loads(args.compare.read_text())["results"] if args.compare else None
+    print_report(report, previous)
+
+    result = {
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "config": {
+            "duration": round(elapsed, 2), "concurrency": args.concurrency, "users": args.users, "mix": args.mix,
+            "workers": args.workers, "jsearch_latency": args.jsearch_latency, "gemini_latency": args.gemini_latency,
+            "upstream_error_rate": args.upstream_error_rate, "upstream_429_rate": args.upstream_429_rate,
+            "database": "external" if args.target else ("postgres" if args.database_url else "sqlite"),
+            "chat_limits": args.chat_limits,
+        },
+        "results": report,
+    }
+    output = args.output or RESULTS_DIR / f"load-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2))
+    print(f"\nresults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+# benchmarks/standin_app.py
+"""
+An ASGI app with main.py's import footprint (libraries and reference data)
+but no Postgres/MongoDB/Redis connections, for measuring worker memory where
+those services are not running:
+
+    python benchmarks/worker_memory.py --app standin_app:app
+"""
+import importlib
+import runpy
+from pathlib import Path
+
+from fastapi import FastAPI
+
+CONFIG = runpy.run_path(str(Path(__file__).resolve().parent.parent / "gunicorn.conf.py"))
+for name in CONFIG["PRELOAD_MODULES"]:
+    importlib.import_module(name)
+
+from mentor_resolver import mentor_resolver  # noqa: E402
+from skill_taxonomy import skill_taxonomy  # noqa: E402
+from utils import remove_invalid_characters  # noqa: E402
+
+remove_invalid_characters("\x00")
+
+app = FastAPI()
+
+
+@app.get("/")
+def index():
+    return {"skills": len(skill_taxonomy.skills), "mentor_field": mentor_resolver.resolve("data science")}
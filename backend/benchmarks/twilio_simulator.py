@@ -0,0 +1,104 @@
+# benchmarks/twilio_simulator.py
+"""
+Twilio-style load simulator for the phone interview webhooks.
+
+Plays N concurrent callers against a locally running backend: each call hits
+/interview/start/{id}, then answers every question by POSTing the same
+form-encoded payload Twilio sends to /interview/continue/{id}, pausing for a
+"speaking" think time in between. Reports p50/p99 webhook latency.
+
+    uvicorn main:app --port 8000
+    python benchmarks/twilio_simulator.py --calls 20 --turns 6 --think-time 2
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+import uuid
+
+import httpx
+
+SAMPLE_ANSWERS = [
+    "I recently finished a project where I built a dashboard for tracking student attendance.",
+    "I think my biggest strength is staying calm under pressure and communicating clearly.",
+    "In my last internship I worked with a team of four to redesign an onboarding flow.",
+    "I would start by understanding the problem and then break it down into smaller tasks.",
+    "Honestly I'm still learning that, but I practice by reading code reviews every week.",
+]
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def twilio_form(call_sid: str, speech: str) -> dict:
+    return {
+        "CallSid": call_sid,
+        "AccountSid": "AC" + "0" * 32,
+        "From": "+919876543210",
+        "To": "+15005550006",
+        "CallStatus": "in-progress",
+        "SpeechResult": speech,
+        "Confidence": f"{random.uniform(0.7, 0.99):.2f}",
+    }
+
+
+async def simulate_call(client, interview_id, role, turns, think_time, latencies):
+    call_sid = "CA" + uuid.uuid4().hex
+    await client.post(f"/interview/start/{interview_id}", params={"role": role})
+    for _ in range(turns):
+        await asyncio.sleep(random.uniform(0.5, 1.5) * think_time)
+        started = time.perf_counter()
+        response = await client.post(
+            f"/interview/continue/{interview_id}",
+            params={"role": role},
+            data=twilio_form(call_sid, random.choice(SAMPLE_ANSWERS)),
+        )
+        latencies.append((time.perf_counter() - started) * 1000)
+        if response.status_code != 200 or "<Hangup" in response.text:
+            break
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--calls", type=int, default=10)
+    parser.add_argument("--turns", type=int, default=6)
+    parser.add_argument("--think-time", type=float, default=2.0, help="mean seconds the caller speaks")
+    parser.add_argument("--role", default="software engineer")
+    parser.add_argument("--first-id", type=int, default=900000)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    latencies = []
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=15) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            simulate_call(client, args.first_id + i, args.role, args.turns, args.think_time, latencies)
+            for i in range(args.calls)
+        ])
+        elapsed = time.perf_counter() - started
+
+    results = {
+        "calls": args.calls,
+        "webhooks": len(latencies),
+        "elapsed_s": round(elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+        "mean_ms": round(statistics.mean(latencies), 1) if latencies else 0.0,
+        "max_ms": round(max(latencies), 1) if latencies else 0.0,
+    }
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
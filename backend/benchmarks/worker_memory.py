@@ -0,0 +1,116 @@
+# benchmarks/worker_memory.py
+"""
+Memory per gunicorn process with the old start command versus gunicorn.conf.py.
+
+  before  gunicorn -w N -k uvicorn.workers.UvicornWorker APP   (render.yaml until now)
+  after   gunicorn -c gunicorn.conf.py APP                     (WEB_CONCURRENCY=N)
+
+For the master and each worker it reads /proc/<pid>/smaps_rollup:
+RSS (what `ps` shows, shared pages counted in every process), PSS (shared
+pages split between the processes sharing them; sums to real usage) and
+private memory (what the process would free on exit).
+
+    python benchmarks/worker_memory.py --workers 4                  # main:app, needs the real services
+    python benchmarks/worker_memory.py --workers 4 --app standin_app:app
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def smaps_rollup(pid: int) -> dict:
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                values[parts[0].rstrip(":")] = int(parts[1]) / 1024  # MiB
+    return {
+        "rss": values.get("Rss", 0),
+        "pss": values.get("Pss", 0),
+        "private": values.get("Private_Clean", 0) + values.get("Private_Dirty", 0),
+    }
+
+
+def children(pid: int) -> list:
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(child) for child in f.read().split()]
+
+
+def measure(label: str, command: list, env: dict, port: int, workers: int, settle: float, cwd=BACKEND_DIR) -> list:
+    process = subprocess.Popen(command, cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    try:
+        deadline = time.monotonic() + 120
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                sys.exit(f"{label}: gunicorn exited\n{process.stderr.read().decode()[-2000:]}")
+            if len(children(process.pid)) >= workers:
+                try:
+                    # One request per worker would be ideal; a few warm up whichever answer
+                    for _ in range(workers * 3):
+                        httpx.get(f"http://127.0.0.1:{port}/", timeout=10)
+                    break
+                except httpx.HTTPError:
+                    pass
+            time.sleep(0.5)
+        else:
+            sys.exit(f"{label}: workers did not come up")
+        time.sleep(settle)
+        rows = [("master", smaps_rollup(process.pid))]
+        rows += [(f"worker {pid}", smaps_rollup(pid)) for pid in children(process.pid)]
+        return rows
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def report(label: str, rows: list):
+    print(f"\n{label}")
+    print(f"{'process':<16}{'RSS MiB':>10}{'PSS MiB':>10}{'private MiB':>13}")
+    for name, usage in rows:
+        print(f"{name:<16}{usage['rss']:>10.1f}{usage['pss']:>10.1f}{usage['private']:>13.1f}")
+    totals = {key: sum(usage[key] for _, usage in rows) for key in ("rss", "pss", "private")}
+    print(f"{'total':<16}{totals['rss']:>10.1f}{totals['pss']:>10.1f}{totals['private']:>13.1f}")
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--app", default="main:app")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--settle", type=float, default=2.0, help="seconds to wait before sampling")
+    args = parser.parse_args()
+
+    env = {**os.environ, "PORT": str(args.port), "WEB_CONCURRENCY": str(args.workers),
+           "PYTHONPATH": os.pathsep.join([str(BACKEND_DIR), str(BACKEND_DIR / "benchmarks")])}
+    # Started from another directory: gunicorn reads ./gunicorn.conf.py by default
+    before = measure("before", [
+        sys.executable, "-m", "gunicorn", "-w", str(args.workers), "-k", "uvicorn.workers.UvicornWorker",
+        "--chdir", str(BACKEND_DIR), "-b", f"127.0.0.1:{args.port}", args.app,
+    ], env, args.port, args.workers, args.settle, cwd=tempfile.gettempdir())
+    after = measure("after", [
+        sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "-b", f"127.0.0.1:{args.port}", args.app,
+    ], env, args.port, args.workers, args.settle)
+
+    before_totals = report(f"before: -w {args.workers} (no preload)", before)
+    after_totals = report(f"after: gunicorn.conf.py, {args.workers} workers", after)
+    saved = before_totals["pss"] - after_totals["pss"]
+    print(f"\nPSS total {before_totals['pss']:.0f} -> {after_totals['pss']:.0f} MiB "
+          f"({saved:.0f} MiB, {saved / before_totals['pss']:.0%} less)")
+
+
+if __name__ == "__main__":
+    main()
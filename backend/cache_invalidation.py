@@ -0,0 +1,91 @@
+# cache_invalidation.py
+"""
+Cross-process invalidation for in-process caches over Redis pub/sub.
+
+Every gunicorn worker keeps its own in-memory tiers (e.g. the local profile
+LRU), so a write handled by one worker leaves stale copies in the others
+until they expire. Caches `register` a handler under a name; writers call
+`publish(name, *keys)` and every other process subscribed to
+CACHE_INVALIDATION_CHANNEL drops those keys (no keys = drop everything).
+Messages from the publishing process itself are ignored, since it has
+already updated its own copy.
+
+The subscriber is a daemon thread started from the app's startup event. It
+reconnects on its own; messages published while it is disconnected are
+lost, so local tiers keep their TTLs as the upper bound on staleness.
+"""
+import json
+import logging
+import os
+import socket
+import time
+from typing import Callable, Dict
+
+import redis
+
+from redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+CACHE_INVALIDATION_CHANNEL = os.getenv("CACHE_INVALIDATION_CHANNEL", "nexpath:cache-invalidation")
+
+
+class CacheInvalidator:
+    def __init__(self, redis_conn=None, channel: str = CACHE_INVALIDATION_CHANNEL):
+        self.redis = redis_conn
+        self.channel = channel
+        self._handlers: Dict[str, Callable[[list], None]] = {}
+        self._thread = None
+
+    @property
+    def origin(self) -> str:
+        # Computed per call so a forked worker never reuses its parent's identity
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    def register(self, cache: str, handler: Callable[[list], None]):
+        """`handler(keys)` runs on the subscriber thread; an empty list means clear the cache."""
+        self._handlers[cache] = handler
+
+    def publish(self, cache: str, *keys: str):
+        if self.redis is None:
+            return
+        message = json.dumps({"origin": self.origin, "cache": cache, "keys": list(keys)})
+        try:
+            self.redis.publish(self.channel, message)
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Cache invalidation for {cache} not published: {e}")
+
+    def _on_message(self, message):
+        try:
+            payload = json.loads(message["data"])
+        except (TypeError, ValueError):
+            return
+        if payload.get("origin") == self.origin:
+            return
+        handler = self._handlers.get(payload.get("cache"))
+        if handler is None:
+            return
+        try:
+            handler(payload.get("keys") or [])
+        except Exception as e:
+            logger.error(f"❌ Invalidation handler for {payload.get('cache')} failed: {e}")
+
+    def _on_error(self, error, pubsub, thread):
+        logger.warning(f"⚠️ Cache invalidation subscriber disconnected, retrying: {error}")
+        time.sleep(1)  # the next get_message reconnects and resubscribes
+
+    def start(self):
+        if self.redis is None or self._thread is not None:
+            return
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{self.channel: self._on_message})
+        self._thread = pubsub.run_in_thread(sleep_time=1.0, daemon=True, exception_handler=self._on_error)
+        logger.info(f"✅ Listening for cache invalidations on {self.channel}")
+
+    def stop(self):
+        if self._thread is not None:
+            self._thread.stop()
+            self._thread = None
+
+
+cache_invalidator = CacheInvalidator(redis_client)
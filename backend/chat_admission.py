@@ -0,0 +1,174 @@
+# chat_admission.py
+"""
+Admission control for /chat/.
+
+Every message is checked, in one Redis round trip, against sliding-window
+budgets shared by all workers:
+
+- per user (the verified token subject only; callers without a valid token
+  get just the IP budget), per client IP and global;
+- per user (or, without a token, per IP) and intent, for the intents that
+  spend an upstream quota: job search (RapidAPI), everything answered by
+  Gemini, and mentorship.
+
+A budget is "at most `limit` messages per `window` seconds", estimated from
+the current and previous fixed windows weighted by their overlap with the
+last `window` seconds. Over budget, `admit` returns the seconds until the
+message would fit, for the 429's Retry-After.
+
+Messages bound for an upstream are also counted while they run (a sorted set
+per upstream, scored by start time so entries of crashed workers age out
+after UPSTREAM_STALE_SECONDS). Once that queue holds SHED_QUEUE_DEPTH
+messages, new ones are shed with a 503 instead of piling onto a slow API.
+
+If Redis is unreachable, messages are admitted (as the Gemini governor does).
+"""
+import logging
+import os
+import uuid
+from typing import NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+OVERLOADED = "overloaded"
+
+CHAT_LIMIT_WINDOW = int(os.getenv("CHAT_LIMIT_WINDOW", "60"))
+UPSTREAM_STALE_SECONDS = int(os.getenv("CHAT_UPSTREAM_STALE_SECONDS", "120"))
+
+
+class Budget(NamedTuple):
+    limit: int
+    window: int = CHAT_LIMIT_WINDOW
+
+
+CHAT_BUDGETS = {
+    "user": Budget(int(os.getenv("CHAT_LIMIT_PER_USER", "20"))),
+    "ip": Budget(int(os.getenv("CHAT_LIMIT_PER_IP", "60"))),
+    "global": Budget(int(os.getenv("CHAT_LIMIT_GLOBAL", "1200"))),
+}
+INTENT_BUDGETS = {
+    "job_search": Budget(int(os.getenv("CHAT_LIMIT_JOB_SEARCH", "10"))),
+    "gemini": Budget(int(os.getenv("CHAT_LIMIT_GEMINI", "15"))),
+    "mentorship": Budget(int(os.getenv("CHAT_LIMIT_MENTORSHIP", "5"))),
+}
+# Messages in flight per upstream, across workers, before new ones are shed
+SHED_QUEUE_DEPTH = {
+    "job_search": int(os.getenv("CHAT_SHED_JOB_SEARCH_DEPTH", "40")),
+    "gemini": int(os.getenv("CHAT_SHED_GEMINI_DEPTH", "30")),
+}
+
+KEY_PREFIX = "chat:admission"
+
+# KEYS[1] upstream in-flight set, KEYS[2..n] budget keys.
+# ARGV[1] shed depth (0 = no upstream), ARGV[2] member, ARGV[3] stale seconds,
+# then limit, window for each budget key.
+# Returns {0} when admitted, {1, budget index, retry after} when over a budget,
+# {2, 0, retry after} when shed.
+ADMISSION_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local depth_limit = tonumber(ARGV[1])
+if depth_limit > 0 then
+  redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - tonumber(ARGV[3]))
+  if redis.call('ZCARD', KEYS[1]) >= depth_limit then
+    return {2, 0, 1}
+  end
+end
+local counters = {}
+for i = 2, #KEYS do
+  local limit = tonumber(ARGV[2 * i])
+  local window = tonumber(ARGV[2 * i + 1])
+  local index = math.floor(now / window)
+  local elapsed = now - index * window
+  local current_key = KEYS[i] .. ':' .. index
+  local previous = tonumber(redis.call('GET', KEYS[i] .. ':' .. (index - 1)) or '0')
+  local current = tonumber(redis.call('GET', current_key) or '0')
+  if previous * (window - elapsed) / window + current + 1 > limit then
+    local wait
+    if current + 1 <= limit then
+      wait = (window - elapsed) - (limit - current - 1) * window / previous
+    else
+      wait = (window - elapsed) + window * (1 - (limit - 1) / current)
+    end
+    return {1, i - 1, math.max(1, math.ceil(wait))}
+  end
+  counters[#counters + 1] = {current_key, window}
+end
+for _, counter in ipairs(counters) do
+  redis.call('INCR', counter[1])
+  redis.call('EXPIRE', counter[1], counter[2] * 2)
+end
+if depth_limit > 0 then
+  redis.call('ZADD', KEYS[1], now, ARGV[2])
+  redis.call('EXPIRE', KEYS[1], tonumber(ARGV[3]))
+end
+return {0}
+"""
+
+
+class Admission(NamedTuple):
+    allowed: bool
+    reason: Optional[str] = None  # budget name, or OVERLOADED when shed
+    retry_after: int = 0
+    ticket: Optional[tuple] = None  # (in-flight key, member) to release
+
+
+def intent_budget(intent: Optional[str]) -> Optional[str]:
+    """Budget a detected /chat/ intent spends; None for flows that call no upstream."""
+    if intent in ("job_search", "mentorship"):
+        return intent
+    if intent in (None, "interview_booking"):
+        return None
+    return "gemini"
+
+
+class ChatAdmission:
+    def __init__(self, redis_conn, is_available=None):
+        self.redis = redis_conn
+        self.is_available = is_available or (lambda: True)
+        self._admit = redis_conn.register_script(ADMISSION_LUA)
+
+    def _budgets(self, user_id: Optional[str], ip: Optional[str], intent: Optional[str]) -> list:
+        budgets = [("global", f"{KEY_PREFIX}:global", CHAT_BUDGETS["global"])]
+        if ip:
+            budgets.append(("ip", f"{KEY_PREFIX}:ip:{ip}", CHAT_BUDGETS["ip"]))
+        if user_id:
+            budgets.append(("user", f"{KEY_PREFIX}:user:{user_id}", CHAT_BUDGETS["user"]))
+        budget = intent_budget(intent)
+        caller = f"user:{user_id}" if user_id else f"ip:{ip}"
+        if budget and (user_id or ip):
+            budgets.append((budget, f"{KEY_PREFIX}:{budget}:{caller}", INTENT_BUDGETS[budget]))
+        return budgets
+
+    async def admit(self, user_id: Optional[str], ip: Optional[str], intent: Optional[str]) -> Admission:
+        if not self.is_available():
+            return Admission(True)
+        budgets = self._budgets(user_id, ip, intent)
+        budget = intent_budget(intent)
+        depth_limit = SHED_QUEUE_DEPTH.get(budget, 0)
+        in_flight_key = f"{KEY_PREFIX}:in_flight:{budget}"
+        member = uuid.uuid4().hex
+        args = [depth_limit, member, UPSTREAM_STALE_SECONDS]
+        for _, _, limit in budgets:
+            args += [limit.limit, limit.window]
+        try:
+            result = await self._admit(keys=[in_flight_key] + [key for _, key, _ in budgets], args=args)
+        except Exception as e:
+            logger.warning(f"Chat admission unavailable, allowing request: {e}")
+            return Admission(True)
+        if result[0] == 2:
+            logger.warning(f"🚦 Shedding {budget} chat message: {depth_limit} already in flight")
+            return Admission(False, OVERLOADED, int(result[2]))
+        if result[0] == 1:
+            name = budgets[int(result[1]) - 1][0]
+            logger.info(f"🚦 Chat message over the {name} budget (user={user_id}, ip={ip})")
+            return Admission(False, name, int(result[2]))
+        return Admission(True, ticket=(in_flight_key, member) if depth_limit else None)
+
+    async def release(self, admission: Admission):
+        if admission.ticket is None:
+            return
+        try:
+            await self.redis.zrem(*admission.ticket)
+        except Exception as e:
+            logger.warning(f"Could not release chat admission: {e}")
@@ -0,0 +1,141 @@
+# chat_idempotency.py
+"""
+Idempotent /chat/ submissions.
+
+Mobile clients retry /chat/ on timeouts, and each retry would otherwise
+detect the intent again, call Gemini or RapidAPI again and save two more
+Mongo documents. A client sends the same `Idempotency-Key` header (or
+`client_message_id` in the body) with every attempt of one message:
+
+- while the first attempt is still running in this worker, retries await it;
+- while it runs in another worker (holding the `:lock` key), retries poll
+  Redis for its result;
+- once it has finished, its response is replayed from Redis for
+  IDEMPOTENCY_TTL seconds, with an `Idempotent-Replayed: true` header.
+
+The answer runs as its own task, so a client that disconnects mid-request
+does not cancel it and its retry gets the result. 5xx responses and
+exceptions are not stored, so a retry after a failure runs again. Reusing a
+key for a different message is rejected with IdempotencyKeyReused.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Dict, NamedTuple, Optional, Tuple
+
+from fastapi.responses import Response
+
+from redis_client import async_redis_client
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_TTL = int(os.getenv("CHAT_IDEMPOTENCY_TTL", "600"))
+# Longest a /chat/ answer is expected to take; a lock older than this is abandoned
+IDEMPOTENCY_LOCK_TTL = int(os.getenv("CHAT_IDEMPOTENCY_LOCK_TTL", "60"))
+IDEMPOTENCY_POLL_INTERVAL = 0.1
+MAX_KEY_LENGTH = 255
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+class IdempotencyKeyReused(ValueError):
+    """The key was already used for a different request."""
+
+
+class StoredResponse(NamedTuple):
+    status_code: int
+    media_type: Optional[str]
+    body: bytes
+    replayed: bool
+
+    def to_response(self, replayed: bool) -> Response:
+        headers = {REPLAYED_HEADER: "true"} if replayed else None
+        return Response(content=self.body, status_code=self.status_code, media_type=self.media_type, headers=headers)
+
+
+def request_fingerprint(*parts: str) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class IdempotentRequests:
+    def __init__(self, cache, prefix: str = "chat:idempotency",
+                 ttl: int = IDEMPOTENCY_TTL, lock_ttl: int = IDEMPOTENCY_LOCK_TTL):
+        self.cache = cache
+        self.prefix = prefix
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+        self._in_flight: Dict[str, Tuple[str, asyncio.Future]] = {}
+
+    async def run(self, scope: str, key: str, fingerprint: str,
+                  handler: Callable[[], Awaitable[Response]]) -> Response:
+        """
+        Returns `handler()`'s response, computed once per (scope, key).
+        `fingerprint` identifies the request body; a key seen with another
+        fingerprint raises IdempotencyKeyReused.
+        """
+        cache_key = f"{self.prefix}:{scope}:{key}"
+        entry = self._in_flight.get(cache_key)
+        leader = entry is None
+        if leader:
+            # Registered before the first await, so concurrent retries in this worker find it
+            task = asyncio.ensure_future(self._resolve(cache_key, fingerprint, handler))
+            entry = self._in_flight[cache_key] = (fingerprint, task)
+            task.add_done_callback(lambda _: self._in_flight.pop(cache_key, None))
+        if entry[0] != fingerprint:
+            raise IdempotencyKeyReused("Idempotency key already used for a different message")
+        stored = await asyncio.shield(entry[1])
+        if not leader:
+            logger.info(f"🔁 Chat retry {key} joined the in-flight request")
+        return stored.to_response(replayed=stored.replayed or not leader)
+
+    async def _resolve(self, cache_key: str, fingerprint: str, handler) -> StoredResponse:
+        lock_key = f"{cache_key}:lock"
+        stored = self._decode(await self.cache.get(cache_key), fingerprint)
+        if stored is not None:
+            return stored
+        if not await self.cache.set(lock_key, fingerprint, ex=self.lock_ttl, nx=True):
+            stored = await self._wait_for_other_worker(cache_key, lock_key, fingerprint)
+            if stored is not None:
+                return stored
+            # The other attempt failed or its lock expired: answer it here instead
+            await self.cache.set(lock_key, fingerprint, ex=self.lock_ttl)
+        try:
+            response = await handler()
+            stored = StoredResponse(response.status_code, response.media_type, bytes(response.body), False)
+            if stored.status_code < 500:
+                await self.cache.setex(cache_key, self.ttl, json.dumps({
+                    "fingerprint": fingerprint,
+                    "status_code": stored.status_code,
+                    "media_type": stored.media_type,
+                    "body": stored.body.decode("utf-8"),
+                }))
+            return stored
+        finally:
+            await self.cache.delete(lock_key)
+
+    async def _wait_for_other_worker(self, cache_key: str, lock_key: str, fingerprint: str):
+        deadline = time.monotonic() + self.lock_ttl
+        while time.monotonic() < deadline:
+            await asyncio.sleep(IDEMPOTENCY_POLL_INTERVAL)
+            value, lock = await self.cache.mget([cache_key, lock_key])
+            if value is not None:
+                return self._decode(value, fingerprint)
+            if lock is None:
+                return None
+            if lock != fingerprint:
+                raise IdempotencyKeyReused("Idempotency key already used for a different message")
+        return None
+
+    @staticmethod
+    def _decode(value, fingerprint: str):
+        if value is None:
+            return None
+        data = json.loads(value)
+        if data["fingerprint"] != fingerprint:
+            raise IdempotencyKeyReused("Idempotency key already used for a different message")
+        return StoredResponse(data["status_code"], data["media_type"], data["body"].encode("utf-8"), True)
+
+
+chat_idempotency = IdempotentRequests(async_redis_client)
@@ -1,15 +1,17 @@
-import requests
+# demo.py
+"""
+Prints one raw JSearch response. Uses RAPIDAPI_KEY and JSEARCH_BASE_URL from
+the environment, so it can run against the mock_herkey_api emulator:
 
-JSEARCH_API_KEY = "46b16dd206mshb3d738361ceccadp152accjsnfe223795ee27"  # Replace with your actual key
-JSEARCH_API_URL = "https://jsearch.p.rapidapi.com/search"
+    uvicorn mock_herkey_api:app --port 8001 &
+    JSEARCH_BASE_URL=http://127.0.0.1:8001 python demo.py
+"""
+import requests
 
-querystring = {"query": "AI jobs in Bangalore", "num_pages": "1"}
+from job_cache import JSEARCH_URL, jsearch_request
 
-headers = {
-    "X-RapidAPI-Key": JSEARCH_API_KEY,
-    "X-RapidAPI-Host": "jsearch.p.rapidapi.com"
-}
+querystring, headers = jsearch_request("AI jobs", "Bangalore")
 
-response = requests.get(JSEARCH_API_URL, headers=headers, params=querystring)
+response = requests.get(JSEARCH_URL, headers=headers, params=querystring, timeout=15)
 
 print(response.json())  # Check the actual API response
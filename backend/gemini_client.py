@@ -0,0 +1,47 @@
+# gemini_client.py
+"""
+The web workers' Gemini client.
+
+One `httpx.AsyncClient` with a timeout shared by the chat handler and the
+interview engine, and every call goes through the cross-process governor
+(`gemini_governor`), so both spend tokens from the same bucket and feed the
+same circuit breaker. Timeouts and transport errors count as failed calls.
+The Celery workers use `SyncGeminiGovernor` from worker_resources instead.
+"""
+import logging
+import os
+
+import httpx
+
+from gemini_governor import AsyncGeminiGovernor, INTERACTIVE
+from metrics import stage
+from redis_client import async_redis_client
+from upstreams import GEMINI_URL
+
+logger = logging.getLogger(__name__)
+
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "20"))
+
+gemini_governor = AsyncGeminiGovernor(async_redis_client.redis, is_available=lambda: async_redis_client.available)
+http_client = httpx.AsyncClient(timeout=httpx.Timeout(GEMINI_TIMEOUT, connect=2.0))
+
+
+async def generate_content(data: dict, priority: str = INTERACTIVE, timeout: float = None) -> httpx.Response:
+    """
+    POSTs a generateContent body once the governor grants a `priority` token.
+    Raises GeminiUnavailable when the governor sheds the call and httpx errors
+    on timeouts; 429 and 5xx responses are returned but recorded as failures.
+    """
+    headers = {"Content-Type": "application/json", "X-goog-api-key": GEMINI_API_KEY}
+    async with gemini_governor.slot(priority) as outcome:
+        with stage("gemini"):
+            response = await http_client.post(GEMINI_URL, headers=headers, json=data,
+                                              timeout=timeout or httpx.USE_CLIENT_DEFAULT)
+        if response.status_code == 429 or response.status_code >= 500:
+            outcome.fail()
+    return response
+
+
+async def close():
+    await http_client.aclose()
@@ -0,0 +1,388 @@
+# gemini_governor.py
+"""
+Cross-process Gemini quota governor.
+
+All gunicorn workers and Celery processes share one Redis token bucket
+(`gemini:bucket`) refilled at `GEMINI_REQUESTS_PER_MINUTE`. Requests come in
+two priority classes:
+
+- interactive (live chat) may drain the bucket completely;
+- batch (interview feedback, future jobs) may only use tokens above a
+  reserve of `GEMINI_BATCH_RESERVE` x capacity, and yields whenever an
+  interactive request is waiting.
+
+A shared circuit breaker counts failed or slow calls in fixed windows. When
+the failure ratio crosses `GEMINI_BREAKER_FAILURE_RATIO`, it opens for
+`GEMINI_BREAKER_COOLDOWN` seconds and callers fail fast. After that a single
+probe request is let through (half-open) and its outcome closes or re-opens
+the breaker.
+
+`AsyncGeminiGovernor` serves the FastAPI handlers, `SyncGeminiGovernor` the
+Celery tasks; both run the same state machine (`_GeminiGovernorBase`). If
+Redis is unreachable both fail open. A probe whose caller gives up (or that
+never got a token) releases the probe key instead of holding it for the
+cooldown.
+"""
+import asyncio
+import logging
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Generator, Tuple
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+
+GEMINI_REQUESTS_PER_MINUTE = float(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "60"))
+GEMINI_BUCKET_CAPACITY = float(os.getenv("GEMINI_BUCKET_CAPACITY", "10"))
+GEMINI_BATCH_RESERVE = float(os.getenv("GEMINI_BATCH_RESERVE", "0.3"))
+MAX_WAIT_SECONDS = {INTERACTIVE: 3.0, BATCH: 60.0}
+
+BREAKER_WINDOW_SECONDS = 30
+BREAKER_MIN_CALLS = int(os.getenv("GEMINI_BREAKER_MIN_CALLS", "10"))
+BREAKER_FAILURE_RATIO = float(os.getenv("GEMINI_BREAKER_FAILURE_RATIO", "0.5"))
+BREAKER_SLOW_CALL_SECONDS = float(os.getenv("GEMINI_BREAKER_SLOW_CALL", "8"))
+BREAKER_COOLDOWN_SECONDS = int(os.getenv("GEMINI_BREAKER_COOLDOWN", "30"))
+
+BUCKET_KEY = "gemini:bucket"
+# Sorted set per priority: waiter id -> when it started waiting. Waiters older
+# than their longest wait (plus a grace period) belong to killed processes and
+# are ignored and pruned, so a SIGKILL mid-wait can't leave batch work yielding forever.
+WAITING_KEY = "gemini:waiters:{}"
+WAITER_GRACE_SECONDS = 5
+BREAKER_OPEN_KEY = "gemini:breaker:open"
+BREAKER_TRIPPED_KEY = "gemini:breaker:tripped"
+BREAKER_PROBE_KEY = "gemini:breaker:probe"
+BREAKER_STATS_KEY = "gemini:breaker:stats:{}"
+
+CANNED_REPLY = (
+    "I'm getting a lot of questions right now and need a moment to catch up. "
+    "Please try again in a minute."
+)
+
+# Refills the bucket from Redis server time and takes `requested` tokens if
+# at least `floor` tokens remain afterwards. Returns {allowed, tokens}.
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local floor = tonumber(ARGV[4])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if requested > 0 and tokens - requested >= floor then
+  tokens = tokens - requested
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return {allowed, tostring(tokens)}
+"""
+
+
+class GeminiUnavailable(Exception):
+    """Raised when the breaker is open or no token became available in time."""
+
+
+class CallOutcome:
+    """Yielded by `slot()`; call `fail()` for error responses that don't raise."""
+
+    def __init__(self):
+        self.ok = True
+
+    def fail(self):
+        self.ok = False
+
+
+def _rate_per_second() -> float:
+    return GEMINI_REQUESTS_PER_MINUTE / 60.0
+
+
+def _floor(priority: str) -> float:
+    return GEMINI_BUCKET_CAPACITY * GEMINI_BATCH_RESERVE if priority == BATCH else 0.0
+
+
+def _bucket_args(priority: str, requested: int = 1) -> list:
+    return [GEMINI_BUCKET_CAPACITY, _rate_per_second(), requested, _floor(priority)]
+
+
+def _stale_before(priority: str, now: float = None) -> float:
+    return (now or time.time()) - MAX_WAIT_SECONDS[priority] - WAITER_GRACE_SECONDS
+
+
+def _join_waiters(pipe, priority: str, waiter: str):
+    key = WAITING_KEY.format(priority)
+    now = time.time()
+    pipe.zremrangebyscore(key, "-inf", _stale_before(priority, now))
+    pipe.zadd(key, {waiter: now})
+    pipe.expire(key, int(MAX_WAIT_SECONDS[priority] + WAITER_GRACE_SECONDS) + 1)
+
+
+def _count_waiters(redis_conn, priority: str):
+    return redis_conn.zcount(WAITING_KEY.format(priority), _stale_before(priority), "+inf")
+
+
+def _stats_key(now: float = None) -> str:
+    return BREAKER_STATS_KEY.format(int((now or time.time()) // BREAKER_WINDOW_SECONDS))
+
+
+def _should_trip(calls: int, failures: int) -> bool:
+    return calls >= BREAKER_MIN_CALLS and failures / calls >= BREAKER_FAILURE_RATIO
+
+
+def _breaker_state(is_open, is_tripped) -> str:
+    if is_open:
+        return "open"
+    return "half_open" if is_tripped else "closed"
+
+
+class _Sleep:
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+
+class _GeminiGovernorBase:
+    """
+    The breaker and bucket state machine, written once for both Redis clients.
+
+    Each `_*_steps` method is a generator that yields Redis operations (a
+    function of the connection) or `_Sleep`s and is sent back their results.
+    `SyncGeminiGovernor` and `AsyncGeminiGovernor` only differ in how they run
+    those steps: calling versus awaiting, `time.sleep` versus `asyncio.sleep`.
+    """
+
+    def __init__(self, redis_conn, is_available=None):
+        self.redis = redis_conn
+        self.is_available = is_available or (lambda: True)
+        self._bucket = redis_conn.register_script(TOKEN_BUCKET_LUA)
+
+    def _breaker_steps(self) -> Generator[Any, Any, Tuple[bool, bool]]:
+        """Returns (allowed, is_probe): whether the breaker lets this call through and as its probe."""
+        is_open, is_tripped = yield lambda r: r.mget(BREAKER_OPEN_KEY, BREAKER_TRIPPED_KEY)
+        state = _breaker_state(is_open, is_tripped)
+        if state == "closed":
+            return True, False
+        if state == "half_open":
+            probe = bool((yield lambda r: r.set(BREAKER_PROBE_KEY, "1", nx=True, ex=BREAKER_COOLDOWN_SECONDS)))
+            return probe, probe
+        return False, False
+
+    def _acquire_steps(self, priority: str) -> Generator[Any, Any, bool]:
+        allowed, is_probe = yield from self._breaker_steps()
+        if not allowed:
+            raise GeminiUnavailable("circuit breaker open")
+
+        waiter = uuid.uuid4().hex
+        deadline = time.monotonic() + MAX_WAIT_SECONDS[priority]
+        acquired = False
+
+        def join(r):
+            pipe = r.pipeline()
+            _join_waiters(pipe, priority, waiter)
+            return pipe.execute()
+
+        def leave(r):
+            pipe = r.pipeline()
+            pipe.zrem(WAITING_KEY.format(priority), waiter)
+            if is_probe and not acquired:
+                # Don't make everyone else wait out the cooldown for a probe that never ran
+                pipe.delete(BREAKER_PROBE_KEY)
+            return pipe.execute()
+
+        yield join
+        try:
+            while True:
+                yield_to_interactive = (
+                    priority == BATCH and (yield lambda r: _count_waiters(r, INTERACTIVE)) > 0
+                )
+                if not yield_to_interactive:
+                    has_token, _ = yield lambda r: self._bucket(keys=[BUCKET_KEY], args=_bucket_args(priority))
+                    if has_token:
+                        acquired = True
+                        return is_probe
+                if time.monotonic() >= deadline:
+                    raise GeminiUnavailable(f"no {priority} token within {MAX_WAIT_SECONDS[priority]}s")
+                yield _Sleep(1.0 / _rate_per_second() / 2)
+        finally:
+            yield leave
+
+    def _record_steps(self, ok: bool, latency: float, is_probe: bool) -> Generator:
+        failed = not ok or latency > BREAKER_SLOW_CALL_SECONDS
+        if is_probe:
+            # Outcome of the half-open probe decides the breaker state
+            if failed:
+                yield from self._trip_steps()
+            else:
+                yield lambda r: r.delete(BREAKER_TRIPPED_KEY, BREAKER_PROBE_KEY)
+                logger.info("✅ Gemini circuit breaker closed")
+            return
+
+        def count(r):
+            key = _stats_key()
+            pipe = r.pipeline()
+            pipe.hincrby(key, "calls", 1)
+            pipe.hincrby(key, "failures", 1 if failed else 0)
+            pipe.expire(key, BREAKER_WINDOW_SECONDS * 2)
+            return pipe.execute()
+
+        calls, failures, _ = yield count
+        if _should_trip(calls, failures):
+            yield from self._trip_steps()
+
+    def _trip_steps(self) -> Generator:
+        def trip(r):
+            pipe = r.pipeline()
+            pipe.set(BREAKER_OPEN_KEY, "1", ex=BREAKER_COOLDOWN_SECONDS)
+            pipe.set(BREAKER_TRIPPED_KEY, "1")
+            pipe.delete(BREAKER_PROBE_KEY, _stats_key())
+            return pipe.execute()
+
+        yield trip
+        logger.error(f"❌ Gemini circuit breaker opened for {BREAKER_COOLDOWN_SECONDS}s")
+
+    def _release_probe_steps(self) -> Generator:
+        yield lambda r: r.delete(BREAKER_PROBE_KEY)
+
+    def _snapshot_steps(self) -> Generator[Any, Any, dict]:
+        _, tokens = yield lambda r: self._bucket(
+            keys=[BUCKET_KEY], args=[GEMINI_BUCKET_CAPACITY, _rate_per_second(), 0, 0])
+        interactive = yield lambda r: _count_waiters(r, INTERACTIVE)
+        batch = yield lambda r: _count_waiters(r, BATCH)
+        is_open, is_tripped = yield lambda r: r.mget(BREAKER_OPEN_KEY, BREAKER_TRIPPED_KEY)
+        stats = yield lambda r: r.hgetall(_stats_key())
+        return {
+            "tokens": round(float(tokens), 2),
+            "capacity": GEMINI_BUCKET_CAPACITY,
+            "refill_per_minute": GEMINI_REQUESTS_PER_MINUTE,
+            "queue_depth": {INTERACTIVE: int(interactive or 0), BATCH: int(batch or 0)},
+            "breaker": {
+                "state": _breaker_state(is_open, is_tripped),
+                "window_calls": int(stats.get("calls", 0)),
+                "window_failures": int(stats.get("failures", 0)),
+            },
+        }
+
+
+class AsyncGeminiGovernor(_GeminiGovernorBase):
+    async def _run(self, steps: Generator):
+        result, error = None, None
+        while True:
+            try:
+                step = steps.throw(error) if error else steps.send(result)
+            except StopIteration as done:
+                return done.value
+            try:
+                if isinstance(step, _Sleep):
+                    result, error = await asyncio.sleep(step.seconds), None
+                else:
+                    result, error = await step(self.redis), None
+            except BaseException as e:  # includes cancellation, so the steps' cleanup still runs
+                result, error = None, e
+
+    async def acquire(self, priority: str = INTERACTIVE) -> bool:
+        """Waits for a token. Returns True if this call is the half-open probe."""
+        return await self._run(self._acquire_steps(priority))
+
+    async def record(self, ok: bool, latency: float, is_probe: bool = False):
+        await self._run(self._record_steps(ok, latency, is_probe))
+
+    @asynccontextmanager
+    async def slot(self, priority: str = INTERACTIVE):
+        """
+        Waits for a token, then times the wrapped Gemini call and records its
+        outcome. Raises GeminiUnavailable instead of calling Gemini.
+        """
+        outcome = CallOutcome()
+        if not self.is_available():
+            yield outcome
+            return
+        try:
+            is_probe = await self.acquire(priority)
+        except GeminiUnavailable:
+            raise
+        except Exception as e:
+            logger.warning(f"Gemini governor unavailable, allowing request: {e}")
+            yield outcome
+            return
+
+        started = time.monotonic()
+        try:
+            yield outcome
+        except asyncio.CancelledError:
+            # The caller gave up (e.g. the interview latency budget); says nothing about
+            # Gemini, but a probe must be handed back so the next call can probe at once
+            if is_probe:
+                await asyncio.shield(self._run(self._release_probe_steps()))
+            raise
+        except BaseException:
+            outcome.fail()
+            await self._record_quietly(outcome.ok, time.monotonic() - started, is_probe)
+            raise
+        await self._record_quietly(outcome.ok, time.monotonic() - started, is_probe)
+
+    async def _record_quietly(self, ok: bool, latency: float, is_probe: bool):
+        try:
+            await self.record(ok, latency, is_probe)
+        except Exception as e:
+            logger.warning(f"Could not record Gemini outcome: {e}")
+
+    async def snapshot(self) -> dict:
+        return await self._run(self._snapshot_steps())
+
+
+class SyncGeminiGovernor(_GeminiGovernorBase):
+    def _run(self, steps: Generator):
+        result, error = None, None
+        while True:
+            try:
+                step = steps.throw(error) if error else steps.send(result)
+            except StopIteration as done:
+                return done.value
+            try:
+                if isinstance(step, _Sleep):
+                    result, error = time.sleep(step.seconds), None
+                else:
+                    result, error = step(self.redis), None
+            except BaseException as e:
+                result, error = None, e
+
+    def acquire(self, priority: str = BATCH) -> bool:
+        """Waits for a token. Returns True if this call is the half-open probe."""
+        return self._run(self._acquire_steps(priority))
+
+    def record(self, ok: bool, latency: float, is_probe: bool = False):
+        self._run(self._record_steps(ok, latency, is_probe))
+
+    @contextmanager
+    def slot(self, priority: str = BATCH):
+        outcome = CallOutcome()
+        if not self.is_available():
+            yield outcome
+            return
+        try:
+            is_probe = self.acquire(priority)
+        except GeminiUnavailable:
+            raise
+        except Exception as e:
+            logger.warning(f"Gemini governor unavailable, allowing request: {e}")
+            yield outcome
+            return
+
+        started = time.monotonic()
+        try:
+            yield outcome
+        except BaseException:
+            outcome.fail()
+            raise
+        finally:
+            try:
+                self.record(outcome.ok, time.monotonic() - started, is_probe)
+            except Exception as e:
+                logger.warning(f"Could not record Gemini outcome: {e}")
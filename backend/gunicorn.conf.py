@@ -0,0 +1,121 @@
+# gunicorn.conf.py
+"""
+Gunicorn settings for the API (render.yaml and start.sh use `-c gunicorn.conf.py`).
+
+The master imports the heavy libraries and builds the immutable reference
+data (skill taxonomy, mentor resolver, sanitizer character classes) before
+forking, then `gc.freeze()`s them so the workers share those pages
+copy-on-write instead of each building a private copy. The app itself
+(`main`) is still imported in each worker: it opens Postgres, MongoDB and
+Redis connections at import, and those must not be shared across a fork.
+
+Workers default to min(2 * CPUs + 1, what fits in the memory limit), both
+read from the cgroup when there is one. WEB_CONCURRENCY overrides the count.
+Workers are recycled after `max_requests` (+ jitter, so they don't all
+restart together), which bounds slow leaks.
+"""
+import gc
+import importlib
+import logging
+import math
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+logger = logging.getLogger("gunicorn.error")
+
+# Memory a worker needs on top of what it shares with the master, and the
+# master's own footprint after preloading (see benchmarks/worker_memory.py)
+WORKER_MEMORY_MB = int(os.getenv("GUNICORN_WORKER_MEMORY_MB", "110"))
+MASTER_MEMORY_MB = int(os.getenv("GUNICORN_MASTER_MEMORY_MB", "170"))
+
+# Imported once in the master. Only modules without network clients or
+# threads at import time belong here.
+PRELOAD_MODULES = (
+    "fastapi", "starlette.staticfiles", "pydantic", "sqlalchemy.orm", "sqlalchemy.dialects.postgresql",
+    "httpx", "requests", "redis", "redis.asyncio", "pymongo", "orjson", "numpy", "rapidfuzz.process",
+    "reportlab.pdfgen.canvas", "reportlab.platypus", "reportlab.lib.styles",
+    "celery", "twilio.twiml.voice_response", "twilio.rest",
+    "uvicorn.workers",
+    "metrics", "serialization", "upstreams", "job_ranking", "mentor_resolver", "skill_taxonomy", "utils",
+)
+
+
+def _read_first_line(path: str):
+    try:
+        with open(path) as f:
+            return f.readline().strip()
+    except OSError:
+        return None
+
+
+def available_cpus() -> int:
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    quota = _read_first_line("/sys/fs/cgroup/cpu.max")  # cgroup v2: "<quota> <period>" or "max <period>"
+    if quota and not quota.startswith("max"):
+        limit, period = quota.split()
+        cpus = min(cpus, math.ceil(int(limit) / int(period)))
+    else:  # cgroup v1, quota -1 when unlimited
+        limit = _read_first_line("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")
+        period = _read_first_line("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+        if limit and period and int(limit) > 0:
+            cpus = min(cpus, math.ceil(int(limit) / int(period)))
+    return max(cpus, 1)
+
+
+def available_memory_mb():
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        limit = _read_first_line(path)
+        if limit and limit.isdigit() and int(limit) < 1 << 60:
+            return int(limit) // 2**20
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemTotal:"):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    return None
+
+
+def default_workers() -> int:
+    workers = 2 * available_cpus() + 1
+    memory_mb = available_memory_mb()
+    if memory_mb:
+        workers = min(workers, (memory_mb - MASTER_MEMORY_MB) // WORKER_MEMORY_MB)
+    return max(workers, 1)
+
+
+wsgi_app = "main:app"
+chdir = BACKEND_DIR
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = int(os.getenv("WEB_CONCURRENCY") or default_workers())
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", str(max(max_requests // 10, 1))))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))  # Gemini and PDF requests can take several seconds
+graceful_timeout = 30
+keepalive = 5
+preload_app = False  # see module docstring: main is imported per worker
+
+
+def on_starting(server):
+    for name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            logger.warning(f"⚠️ Not preloading {name}: {e}")
+    if "utils" in sys.modules:
+        sys.modules["utils"].remove_invalid_characters("\x00")  # builds the character classes
+    # Move everything built so far out of the collector's reach: collections in
+    # the workers would otherwise write to (and un-share) every page of it
+    gc.freeze()
+    logger.info(f"🧊 Preloaded {len(PRELOAD_MODULES)} modules, froze {gc.get_freeze_count()} objects; "
+                f"starting {server.cfg.workers} workers (max_requests={server.cfg.max_requests}"
+                f"+{server.cfg.max_requests_jitter})")
@@ -0,0 +1,165 @@
+# interview_engine.py
+"""
+Next-question generation for Twilio phone interviews.
+
+Twilio waits on `/interview/continue/{id}` while the caller hears silence, so
+the webhook must answer well under a second. The engine combines three sources:
+
+1. An answer-aware Gemini follow-up, awaited for at most `INTERVIEW_LATENCY_BUDGET`.
+2. A speculative follow-up generated in the background while the caller is
+   still answering the previous question, shared across workers through Redis.
+   Drafts are keyed by the transcript length they are meant for, so a draft
+   that finishes after its turn has passed is never served on a later one.
+3. A per-role question bank loaded once at import, which never misses.
+"""
+import asyncio
+import json
+import logging
+import os
+from pathlib import Path
+
+from gemini_client import generate_content
+from gemini_governor import BATCH, INTERACTIVE
+from redis_client import async_redis_client
+
+logger = logging.getLogger(__name__)
+
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+
+INTERVIEW_LATENCY_BUDGET = float(os.getenv("INTERVIEW_LATENCY_BUDGET", "0.8"))  # seconds
+SPECULATION_TIMEOUT = float(os.getenv("INTERVIEW_SPECULATION_TIMEOUT", "10"))
+SPECULATION_TTL_SECONDS = 600
+INTERVIEW_MAX_QUESTIONS = int(os.getenv("INTERVIEW_MAX_QUESTIONS", "8"))
+HISTORY_WINDOW = 8  # turns sent to Gemini
+
+# Load question banks once per process
+question_banks_path = Path(__file__).parent / "interview_questions.json"
+with open(question_banks_path, "r") as f:
+    QUESTION_BANKS = json.load(f)
+
+OPENING_QUESTION = (
+    "Hello, this is Asha, your AI-powered career coach. Welcome to your mock interview. "
+    "Let's start with a classic question: Tell me about yourself."
+)
+CLOSING_MESSAGE = (
+    "That was the last question. Thank you for practicing with Asha. "
+    "You'll receive your feedback by email shortly. Goodbye!"
+)
+
+_background_tasks = set()
+
+
+def normalize_role(role: str) -> str:
+    role = (role or "").strip().lower()
+    return role if role in QUESTION_BANKS else "general"
+
+
+def speculation_key(interview_id, turn: int) -> str:
+    """The draft for the question asked once the transcript holds `turn` turns."""
+    return f"interview:{interview_id}:next_question:{turn}"
+
+
+def questions_asked(turns: int) -> int:
+    # Turns alternate question/answer, starting with the opening question
+    return (turns + 1) // 2
+
+
+def bank_question(role: str, recent: list, turns: int) -> str:
+    """
+    Returns the next question from the role's bank. It starts after the
+    questions already asked and skips any of the `recent` turns.
+    """
+    recent_questions = {turn["text"] for turn in recent if turn["role"] == "model"}
+    questions = QUESTION_BANKS[normalize_role(role)] + QUESTION_BANKS["general"]
+    start = questions_asked(turns) - 1  # the opening question is not from a bank
+    for offset in range(len(questions)):
+        question = questions[(start + offset) % len(questions)]
+        if question not in recent_questions:
+            return question
+    return questions[start % len(questions)]
+
+
+def _build_prompt(role: str, recent: list, speculative: bool) -> str:
+    lines = [f"{'Candidate' if t['role'] == 'user' else 'Interviewer'}: {t['text']}" for t in recent[-HISTORY_WINDOW:]]
+    if speculative:
+        instruction = (
+            "The candidate is still answering the last question. Ask the next question, which must make sense "
+            "whatever their answer is."
+        )
+    else:
+        instruction = "Ask one follow-up question based on the candidate's last answer."
+    return (
+        f"You are Asha, conducting a mock phone interview for a {role} role. {instruction} "
+        "Reply with only the question, in under 40 words, suitable for text-to-speech.\n\n"
+        "Transcript:\n" + "\n".join(lines)
+    )
+
+
+async def generate_question(role: str, recent: list, speculative: bool = False):
+    """
+    Asks Gemini for the next question through the shared governor: the live
+    follow-up as interactive, the background draft as batch so it yields to
+    live traffic. Returns None on any failure.
+    """
+    if not GEMINI_API_KEY:
+        return None
+
+    data = {"contents": [{"parts": [{"text": _build_prompt(role, recent, speculative)}]}]}
+
+    try:
+        response = await generate_content(data, BATCH if speculative else INTERACTIVE, timeout=SPECULATION_TIMEOUT)
+        if response.status_code != 200:
+            logger.warning(f"Gemini follow-up error: {response.status_code}")
+            return None
+        text = response.json()["candidates"][0]["content"]["parts"][0]["text"].strip()
+        return text or None
+    except Exception as e:
+        logger.warning(f"Gemini follow-up failed: {e}")
+        return None
+
+
+async def _speculate(interview_id, role: str, recent: list, turn: int):
+    try:
+        # Bounded so a draft stuck behind live traffic isn't stored after its turn has passed
+        question = await asyncio.wait_for(generate_question(role, recent, speculative=True), SPECULATION_TIMEOUT)
+    except asyncio.TimeoutError:
+        return
+    if question:
+        await async_redis_client.set(speculation_key(interview_id, turn), question, ex=SPECULATION_TTL_SECONDS)
+
+
+def start_speculation(interview_id, role: str, recent: list, turns: int):
+    """
+    Pre-generates the next question in the background while the caller
+    answers the last of `turns` turns (`recent` being the latest of them).
+    """
+    # The draft is for the turn after the caller's answer
+    task = asyncio.create_task(_speculate(interview_id, role, list(recent), turns + 1))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def next_question(interview_id, role: str, recent: list, turns: int) -> str:
+    """
+    Picks the next question within the latency budget. `turns` counts the
+    transcript including the caller's latest answer, `recent` holds its last
+    HISTORY_WINDOW turns.
+    """
+    role = normalize_role(role)
+    key = speculation_key(interview_id, turns)
+    speculative = await async_redis_client.get(key)
+    if speculative:
+        await async_redis_client.delete(key)
+
+    follow_up = asyncio.create_task(generate_question(role, recent))
+    try:
+        question = await asyncio.wait_for(follow_up, timeout=INTERVIEW_LATENCY_BUDGET)
+    except asyncio.TimeoutError:
+        question = None
+        logger.info(f"Interview {interview_id}: follow-up exceeded {INTERVIEW_LATENCY_BUDGET}s budget")
+
+    return question or speculative or bank_question(role, recent, turns)
+
+
+def is_finished(turns: int) -> bool:
+    return questions_asked(turns) >= INTERVIEW_MAX_QUESTIONS
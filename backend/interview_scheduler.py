@@ -0,0 +1,135 @@
+# interview_scheduler.py
+"""
+Just-in-time dispatcher for booked mock-interview calls.
+
+Booked interviews live only in Postgres (`interviews` with status
+"scheduled"), instead of as long-ETA Celery messages that the Redis broker
+keeps in worker memory and redelivers after the visibility timeout.
+`tasks.dispatch_due_interviews` runs every `DISPATCH_INTERVAL_SECONDS`, claims
+the interviews due within the next bucket with
+`UPDATE ... WHERE id IN (SELECT ... FOR UPDATE SKIP LOCKED)` so concurrent
+dispatchers never claim the same row, and enqueues each call with a countdown
+no longer than one bucket.
+
+Status flow: scheduled -> queued (claimed) -> calling (Twilio call placed,
+or failed if Twilio rejected it), or scheduled -> missed when the slot passed
+more than `MISSED_GRACE_SECONDS` ago without being dispatched. The
+queued -> calling step is a conditional UPDATE, so a call task redelivered
+after a worker crash (tasks run with acks_late) never dials twice.
+"""
+import logging
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from postgres_models import Interview
+
+logger = logging.getLogger(__name__)
+
+DISPATCH_INTERVAL_SECONDS = int(os.getenv("INTERVIEW_DISPATCH_INTERVAL", "30"))
+DISPATCH_LOOKAHEAD_SECONDS = int(os.getenv("INTERVIEW_DISPATCH_LOOKAHEAD", "60"))
+DISPATCH_BATCH_SIZE = int(os.getenv("INTERVIEW_DISPATCH_BATCH_SIZE", "500"))
+MISSED_GRACE_SECONDS = int(os.getenv("INTERVIEW_MISSED_GRACE", "900"))
+
+
+def mark_missed_interviews(db: Session, now: datetime) -> int:
+    result = db.execute(
+        update(Interview)
+        .where(Interview.status == "scheduled", Interview.scheduled_time < now - timedelta(seconds=MISSED_GRACE_SECONDS))
+        .values(status="missed")
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+
+def claim_due_interviews(db: Session, horizon: datetime, limit: int = DISPATCH_BATCH_SIZE) -> list:
+    """
+    Atomically moves up to `limit` interviews due before `horizon` from
+    "scheduled" to "queued" and returns (id, phone_number, scheduled_time, role) rows.
+    Served by the (status, scheduled_time) index.
+    """
+    due_ids = (
+        select(Interview.id)
+        .where(Interview.status == "scheduled", Interview.scheduled_time <= horizon)
+        .order_by(Interview.scheduled_time)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    rows = db.execute(
+        update(Interview)
+        .where(Interview.id.in_(due_ids))
+        .values(status="queued")
+        .returning(Interview.id, Interview.phone_number, Interview.scheduled_time, Interview.role)
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.commit()
+    return rows
+
+
+def release_interviews(db: Session, interview_ids: list):
+    db.execute(
+        update(Interview)
+        .where(Interview.id.in_(interview_ids), Interview.status == "queued")
+        .values(status="scheduled")
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def claim_call(db: Session, interview_id: int) -> bool:
+    """Moves a queued interview to "calling"; False if another delivery already did."""
+    result = db.execute(
+        update(Interview)
+        .where(Interview.id == interview_id, Interview.status == "queued")
+        .values(status="calling")
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def mark_call_failed(db: Session, interview_id: int):
+    db.execute(
+        update(Interview)
+        .where(Interview.id == interview_id, Interview.status == "calling")
+        .values(status="failed")
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def dispatch_due_interviews(db: Session, enqueue, now: datetime = None, max_batches: int = 100) -> int:
+    """
+    Claims every interview due within the lookahead bucket and calls
+    `enqueue(interview_id, phone_number, countdown_seconds, role)` for each.
+    Returns the number of interviews dispatched.
+    """
+    now = now or datetime.now()
+    horizon = now + timedelta(seconds=DISPATCH_LOOKAHEAD_SECONDS)
+
+    missed = mark_missed_interviews(db, now)
+    if missed:
+        logger.warning(f"Marked {missed} interviews as missed")
+
+    dispatched = 0
+    for _ in range(max_batches):
+        rows = claim_due_interviews(db, horizon)
+        for index, (interview_id, phone_number, scheduled_time, role) in enumerate(rows):
+            countdown = max(0.0, (scheduled_time - now).total_seconds())
+            try:
+                enqueue(interview_id, phone_number, countdown, role)
+            except Exception:
+                # Hand the rest of the batch back to the next poll
+                release_interviews(db, [row[0] for row in rows[index:]])
+                raise
+            dispatched += 1
+        if len(rows) < DISPATCH_BATCH_SIZE:
+            break
+
+    if dispatched:
+        logger.info(f"Dispatched {dispatched} interview calls due before {horizon:%H:%M:%S}")
+    return dispatched
@@ -0,0 +1,85 @@
+# interview_store.py
+"""
+Append-only storage for mock-interview transcripts.
+
+Each interview is a Redis list `interview:{id}:turns` holding one compact
+JSON record per turn, so a Twilio webhook only RPUSHes the new turns instead
+of re-serializing the whole conversation, and reads back only the last few
+(RPUSH returns the length, which counts the turns). The list gets a TTL when
+the call starts, so abandoned calls don't leak keys, and it is renewed once
+the call completes; `tasks.analyze_interview` copies it to Postgres before it
+expires.
+"""
+import json
+import logging
+import os
+import time
+
+from redis_client import async_redis_client, redis_client
+
+logger = logging.getLogger(__name__)
+
+TRANSCRIPT_TTL_SECONDS = int(os.getenv("INTERVIEW_TRANSCRIPT_TTL", "86400"))
+
+_ROLE_CODES = {"user": "u", "model": "m"}
+_CODE_ROLES = {code: role for role, code in _ROLE_CODES.items()}
+
+
+def transcript_key(interview_id) -> str:
+    return f"interview:{interview_id}:turns"
+
+
+def encode_turn(role: str, text: str) -> str:
+    """Encodes a turn as a compact record, e.g. {"r":"u","t":"...","ts":1700000000}."""
+    return json.dumps(
+        {"r": _ROLE_CODES.get(role, role), "t": text or "", "ts": int(time.time())},
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+
+
+def decode_turn(record: str) -> dict:
+    data = json.loads(record)
+    return {"role": _CODE_ROLES.get(data["r"], data["r"]), "text": data["t"], "ts": data.get("ts")}
+
+
+def to_gemini_history(turns: list) -> list:
+    """Converts decoded turns to the Gemini `contents` format."""
+    return [{"role": turn["role"], "parts": [{"text": turn["text"]}]} for turn in turns]
+
+
+# --- Async API (FastAPI webhooks) ---
+
+async def append_turns(interview_id, *turns) -> int:
+    """Appends (role, text) pairs to the transcript and returns its new length."""
+    records = [encode_turn(role, text) for role, text in turns]
+    return await async_redis_client.rpush(transcript_key(interview_id), *records)
+
+
+async def start_transcript(interview_id, opening: str) -> int:
+    """Records the opening question and starts the expiry clock for the call."""
+    length = await append_turns(interview_id, ("model", opening))
+    await async_redis_client.expire(transcript_key(interview_id), TRANSCRIPT_TTL_SECONDS)
+    return length
+
+
+async def get_recent_turns_async(interview_id, count: int) -> list:
+    """The last `count` turns, oldest first."""
+    records = await async_redis_client.lrange(transcript_key(interview_id), -count, -1)
+    return [decode_turn(record) for record in records]
+
+
+async def complete_transcript(interview_id):
+    """Starts the expiry clock once the call has ended."""
+    await async_redis_client.expire(transcript_key(interview_id), TRANSCRIPT_TTL_SECONDS)
+
+
+# --- Sync API (Celery workers) ---
+
+def get_transcript(interview_id, client=None) -> list:
+    client = client or redis_client
+    if client is None:
+        logger.warning("Redis not available, returning empty transcript")
+        return []
+    records = client.lrange(transcript_key(interview_id), 0, -1)
+    return [decode_turn(record) for record in records]
@@ -0,0 +1,87 @@
+# job_cache.py
+"""
+Shared pieces of the JSearch job cache used by both the API
+(`main.fetch_real_time_jobs`) and the Celery prewarm task.
+
+Cache entries live under `jobs:{title}:{location}` (lower-cased, trimmed) for
+`JOB_CACHE_TTL` seconds and are stored already ranked and de-duplicated by
+`job_ranking.rank_jobs`, with their text fields sanitized once here (the
+description cut to the preview length first). Every API lookup bumps an hourly hit or miss counter
+so the effect of prewarming can be read back with `hit_ratio`.
+"""
+import os
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+
+from job_ranking import rank_jobs
+from upstreams import JSEARCH_HOST, JSEARCH_URL
+from utils import sanitize_records
+
+load_dotenv()
+
+RAPIDAPI_KEY = os.getenv("RAPIDAPI_KEY")
+JOB_CACHE_TTL = 3600
+
+# Text fields shown in the chat job cards; only a preview of the description is displayed
+JOB_TEXT_FIELDS = ("job_title", "employer_name", "job_city", "job_description")
+DESCRIPTION_PREVIEW_CHARS = 300
+
+STATS_TTL_SECONDS = 2 * 24 * 3600
+
+
+def job_cache_key(job_title: str, location: str) -> str:
+    return f"jobs:{job_title.strip().lower()}:{location.strip().lower()}"
+
+
+def jsearch_request(job_title: str, location: str):
+    """Returns (params, headers) for a JSearch /search call."""
+    params = {"query": f"{job_title} in {location}", "num_pages": "1"}
+    headers = {"X-RapidAPI-Key": RAPIDAPI_KEY, "X-RapidAPI-Host": JSEARCH_HOST}
+    return params, headers
+
+
+def clean_jobs(raw_data: dict, job_title: str) -> list:
+    """Sanitizes JSearch results, drops near-duplicates and orders them by relevance to `job_title`."""
+    job_data = sanitize_records(
+        raw_data.get("data", []), JOB_TEXT_FIELDS, {"job_description": DESCRIPTION_PREVIEW_CHARS}
+    )
+    return rank_jobs(job_data, job_title)
+
+
+def fetch_jobs_sync(session, job_title: str, location: str, timeout: float = 15):
+    """Fetches and cleans jobs with a requests session; returns None on upstream errors."""
+    params, headers = jsearch_request(job_title, location)
+    response = session.get(JSEARCH_URL, headers=headers, params=params, timeout=timeout)
+    if response.status_code != 200:
+        return None
+    return clean_jobs(response.json(), job_title)
+
+
+def stats_key(kind: str, when: datetime = None) -> str:
+    return f"jobs:cache:{kind}:{(when or datetime.utcnow()):%Y%m%d%H}"
+
+
+async def record_lookup(async_redis, hit: bool):
+    key = stats_key("hits" if hit else "misses")
+    if await async_redis.incr(key) == 1:
+        await async_redis.expire(key, STATS_TTL_SECONDS)
+
+
+def hit_ratio_keys(hours: int = 1) -> list:
+    """Hit counters then miss counters for the last `hours` (current hour included)."""
+    now = datetime.utcnow()
+    hours_back = [now - timedelta(hours=h) for h in range(hours)]
+    return [stats_key("hits", t) for t in hours_back] + [stats_key("misses", t) for t in hours_back]
+
+
+def summarize_hit_ratio(values: list, hours: int = 1) -> dict:
+    """Turns the MGET result for `hit_ratio_keys(hours)` into a report."""
+    hits = sum(int(v or 0) for v in values[:hours])
+    misses = sum(int(v or 0) for v in values[hours:])
+    total = hits + misses
+    return {"hours": hours, "hits": hits, "misses": misses, "hit_ratio": round(hits / total, 3) if total else None}
+
+
+def hit_ratio(redis_conn, hours: int = 1) -> dict:
+    return summarize_hit_ratio(redis_conn.mget(hit_ratio_keys(hours)), hours)
@@ -0,0 +1,88 @@
+# job_ranking.py
+"""
+Relevance ranking and near-duplicate removal for JSearch results.
+
+All results are scored against the searched title in one
+`rapidfuzz.process.cdist` call. Near-duplicates (the same posting under a
+slightly different title or company spelling) are found with cdist over
+token-sorted "title employer" strings, and only between postings in the
+same city and country (the same role in Bangalore and Hyderabad is two jobs);
+of each duplicate group, only the most relevant posting is kept.
+"""
+import os
+
+import numpy as np
+from rapidfuzz import fuzz, process, utils
+
+DEDUP_THRESHOLD = int(os.getenv("JOB_DEDUP_THRESHOLD", "88"))
+DEDUP_MATRIX_MAX_JOBS = 500
+
+
+def _dedup_key(job: dict) -> str:
+    # Pre-sorting the tokens makes plain `fuzz.ratio` equal `token_sort_ratio`
+    # while letting cdist use rapidfuzz's SIMD implementation.
+    text = utils.default_process(f"{job.get('job_title', '')} {job.get('employer_name', '')}")
+    return " ".join(sorted(text.split()))
+
+
+def _location_ids(jobs: list) -> np.ndarray:
+    ids = {}
+    return np.array([
+        ids.setdefault((str(job.get("job_city") or "").strip().lower(), str(job.get("job_country") or "").strip().lower()), len(ids))
+        for job in jobs
+    ])
+
+
+def _similar(queries: list, keys: list, threshold: int) -> np.ndarray:
+    return process.cdist(queries, keys, scorer=fuzz.ratio, score_cutoff=threshold, dtype=np.uint8, workers=-1) >= threshold
+
+
+def relevance_scores(jobs: list, job_title: str) -> np.ndarray:
+    titles = [job.get("job_title", "") for job in jobs]
+    return process.cdist(
+        [job_title], titles, scorer=fuzz.token_set_ratio, processor=utils.default_process, workers=-1
+    )[0]
+
+
+def rank_jobs(jobs: list, job_title: str, dedup_threshold: int = DEDUP_THRESHOLD) -> list:
+    """
+    Returns `jobs` without near-duplicates, ordered by relevance to
+    `job_title`. Each kept job gets a `relevance_score` between 0 and 100.
+    """
+    # Exact duplicates of the same JSearch posting
+    seen, unique = set(), []
+    for job in jobs:
+        job_id = job.get("job_id")
+        if job_id and job_id in seen:
+            continue
+        seen.add(job_id)
+        unique.append(job)
+    if len(unique) < 2:
+        for job in unique:
+            job["relevance_score"] = 100.0
+        return unique
+
+    scores = relevance_scores(unique, job_title)
+    order = np.argsort(-scores, kind="stable")
+
+    keys = [_dedup_key(job) for job in unique]
+    locations = _location_ids(unique)
+    # Small sets: one n x n matrix. Large sets: one row per kept job, which
+    # compares n x kept pairs instead of n x n and never allocates n^2 bytes.
+    similar = None
+    if len(unique) <= DEDUP_MATRIX_MAX_JOBS:
+        similar = _similar(keys, keys, dedup_threshold) & (locations[:, None] == locations[None, :])
+
+    suppressed = np.zeros(len(unique), dtype=bool)
+    ranked = []
+    for index in order:
+        if suppressed[index]:
+            continue
+        if similar is not None:
+            suppressed |= similar[index]
+        else:
+            suppressed |= _similar([keys[index]], keys, dedup_threshold)[0] & (locations == locations[index])
+        job = unique[index]
+        job["relevance_score"] = round(float(scores[index]), 1)
+        ranked.append(job)
+    return ranked
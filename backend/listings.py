@@ -0,0 +1,111 @@
+# listings.py
+"""
+Keyset-paginated summary listings for a user's resumes and saved jobs.
+
+Pages are ordered newest first and continue from an opaque cursor (the sort
+key of the last row served) instead of an OFFSET, so page 50 costs the same
+index range scan as page 1. Only summary columns are selected: a resume's
+`personal_info` is pulled out of `resume_data` by the database with a JSON
+path expression, so the full resume blob never leaves Postgres.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from postgres_models import Resume, SavedJob
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+RESUME_SUMMARY_COLUMNS = (
+    Resume.id,
+    Resume.file_name,
+    Resume.download_url,
+    Resume.template_used,
+    Resume.created_at,
+    Resume.updated_at,
+    Resume.resume_data["personal_info"].label("personal_info"),
+)
+SAVED_JOB_COLUMNS = (SavedJob.id, SavedJob.job_title, SavedJob.company_name, SavedJob.apply_link, SavedJob.saved_at)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(*key) -> str:
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in key]
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        raise InvalidCursor("Malformed cursor")
+    if not isinstance(values, list):
+        raise InvalidCursor("Malformed cursor")
+    return values
+
+
+def paginate(rows: list, limit: int, cursor_key) -> Tuple[list, Optional[str]]:
+    # One extra row was fetched to learn whether another page exists
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(*cursor_key(rows[-1]))
+
+
+def resume_summary(row) -> dict:
+    """Response dict for a row selected with RESUME_SUMMARY_COLUMNS."""
+    return {
+        "id": row.id,
+        "file_name": row.file_name or f"Resume_{row.id}.pdf",
+        "download_url": row.download_url,
+        "template_used": row.template_used,
+        "created_at": row.created_at,
+        "updated_at": row.updated_at,
+        "personal_info": row.personal_info if isinstance(row.personal_info, dict) else {},
+    }
+
+
+def list_resume_summaries(db: Session, user_id: str, limit: int = DEFAULT_PAGE_SIZE,
+                          cursor: Optional[str] = None) -> Tuple[list, Optional[str]]:
+    """A page of a user's resumes, newest first, without `resume_data`."""
+    query = db.query(*RESUME_SUMMARY_COLUMNS).filter(Resume.user_id == user_id)
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != 1 or not isinstance(values[0], int):
+            raise InvalidCursor("Malformed cursor")
+        query = query.filter(Resume.id < values[0])
+    rows = query.order_by(Resume.id.desc()).limit(min(limit, MAX_PAGE_SIZE) + 1).all()
+    rows, next_cursor = paginate(rows, min(limit, MAX_PAGE_SIZE), lambda row: (row.id,))
+    return [resume_summary(row) for row in rows], next_cursor
+
+
+def list_saved_jobs(db: Session, user_id: str, limit: int = DEFAULT_PAGE_SIZE,
+                    cursor: Optional[str] = None) -> Tuple[list, Optional[str]]:
+    """A page of a user's saved jobs, most recently saved first."""
+    query = db.query(*SAVED_JOB_COLUMNS).filter(SavedJob.user_id == user_id)
+    if cursor:
+        values = decode_cursor(cursor)
+        try:
+            saved_at, job_id = datetime.fromisoformat(values[0]), int(values[1])
+        except (IndexError, TypeError, ValueError):
+            raise InvalidCursor("Malformed cursor")
+        # (saved_at, id) < cursor, spelled out so it also works where row comparison doesn't
+        query = query.filter(or_(
+            SavedJob.saved_at < saved_at,
+            and_(SavedJob.saved_at == saved_at, SavedJob.id < job_id),
+        ))
+    rows = (
+        query.order_by(SavedJob.saved_at.desc(), SavedJob.id.desc())
+        .limit(min(limit, MAX_PAGE_SIZE) + 1)
+        .all()
+    )
+    rows, next_cursor = paginate(rows, min(limit, MAX_PAGE_SIZE), lambda row: (row.saved_at, row.id))
+    return [dict(row._mapping) for row in rows], next_cursor
@@ -5,33 +5,48 @@ import random
 import uuid
 import json
 import re
-from pathlib import Path
+from urllib.parse import quote
 
-from tasks import analyze_interview ,initiate_interview_call
+from tasks import analyze_interview
 from fastapi import Request
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 from reportlab.lib import colors
-from fastapi import FastAPI, HTTPException, Depends, Form
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Depends, Form, Header, Query
+from pydantic import BaseModel, ConfigDict
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+from fastapi.middleware.gzip import GZipMiddleware
 from sqlalchemy.orm import Session
 import httpx
-import requests
 from dotenv import load_dotenv
 from user_routes import router as user_router
-from redis_client import redis_client
+from redis_client import async_redis_client, redis_client
+import interview_store
+import interview_engine
+import listings
+import saved_jobs_cache
+from profile_cache import profile_cache
+from cache_invalidation import cache_invalidator
+from chat_admission import OVERLOADED, ChatAdmission
+from chat_idempotency import MAX_KEY_LENGTH as MAX_IDEMPOTENCY_KEY_LENGTH, IdempotencyKeyReused, chat_idempotency, request_fingerprint
+from serialization import FastJSONResponse, GZIP_COMPRESS_LEVEL, GZIP_MINIMUM_SIZE
+import metrics
+from metrics import stage
+from mentor_resolver import mentor_resolver
+from skill_taxonomy import AUTOCOMPLETE_LIMIT, skill_taxonomy
+from job_cache import DESCRIPTION_PREVIEW_CHARS, JOB_CACHE_TTL, JSEARCH_URL, clean_jobs, hit_ratio_keys, job_cache_key, jsearch_request, record_lookup, summarize_hit_ratio
+from gemini_governor import GeminiUnavailable, CANNED_REPLY, INTERACTIVE
+import gemini_client
+from gemini_client import gemini_governor
 from mongodb_client import save_chat_to_mongodb, chat_collection
-from postgres_models import MentorshipRequest, Resume, UserProfile, SavedJob, Event, CareerTip
-from auth_routes import router as auth_router
-from utils import remove_invalid_characters
+from postgres_models import MentorshipRequest, Resume, SavedJob, Event, CareerTip
+from auth_routes import router as auth_router, oauth_client as auth_oauth_client
+from session_tokens import get_optional_user
 import logging
 from fastapi.staticfiles import StaticFiles
 from postgres_client import get_user_name_from_db, SessionLocal
 from resume_service import resume_router  # Assuming this is a module you have
-from tasks import initiate_interview_call
 from twilio.twiml.voice_response import VoiceResponse, Gather
 
 
@@ -48,10 +63,15 @@ RAPIDAPI_KEY = os.getenv("RAPIDAPI_KEY")
 
 # Gemini API configuration
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-GEMINI_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent"
+
+# Per-user, per-IP, global and per-intent /chat/ budgets, plus upstream load shedding
+chat_admission = ChatAdmission(async_redis_client.redis, is_available=lambda: async_redis_client.available)
+# Proxies in front of the app that append the address they were reached from to
+# X-Forwarded-For (1 on Render). Entries further left are whatever the client sent.
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "0"))
 
 # Initialize FastAPI app
-app = FastAPI()
+app = FastAPI(default_response_class=FastJSONResponse)
 app.include_router(resume_router)
 app.include_router(user_router)
 app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -73,12 +93,30 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# Job results and session histories compress well; small replies are sent as-is
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE, compresslevel=GZIP_COMPRESS_LEVEL)
+
+
+@app.middleware("http")
+async def record_request_timings(request: Request, call_next):
+    return await metrics.time_request(request, call_next)
+
+
+@app.on_event("startup")
+def start_cache_invalidation_listener():
+    cache_invalidator.start()
+
 
+@app.on_event("shutdown")
+async def close_shared_clients():
+    cache_invalidator.stop()
+    await auth_oauth_client.aclose()
+    await gemini_client.close()
+    await async_redis_client.close()
 
-# Load mentorship links
-mentor_links_path = Path(__file__).parent / "mentor_links.json"
-with open(mentor_links_path, "r") as f:
-    MENTOR_PLATFORM_LINKS = json.load(f)
+
+
+# Mentorship links are resolved (and hot-reloaded) by mentor_resolver
 
 
 # ------------- Models ---------------
@@ -98,8 +136,17 @@ class SavedJobResponse(SavedJobBase):
     id: int
     saved_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SavedJobKey(BaseModel):
+    title: str
+    company: str
+
+
+class SavedStatusRequest(BaseModel):
+    jobs: List[SavedJobKey] = []
+    job_ids: List[int] = []
 
 
 class DocumentResponse(BaseModel):
@@ -108,8 +155,7 @@ class DocumentResponse(BaseModel):
     download_url: str
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class EventResponse(BaseModel):
@@ -118,21 +164,20 @@ class EventResponse(BaseModel):
     event_date: datetime
     join_link: Optional[str] = None
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class CareerTipResponse(BaseModel):
     tip_text: str
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ScheduleRequest(BaseModel):
     phone_number: str
     scheduled_time: datetime
     user_id: str
+    role: str = "general"  # question bank, see interview_questions.json
 
 
 # This will be the main response model for the dashboard
@@ -147,6 +192,8 @@ class DashboardResponse(BaseModel):
 class ChatMessage(BaseModel):
     query: str
     user_id: Optional[str] = None
+    # Same id on every retry of one message; the Idempotency-Key header takes precedence
+    client_message_id: Optional[str] = None
 
 
 class JobSearchRequest(BaseModel):
@@ -185,12 +232,6 @@ async def talk_to_gemini(
         logger.error("GEMINI_API_KEY environment variable not set")
         return [{"text": "Sorry, I'm not configured correctly. Please contact support."}]
 
-    # Prepare headers
-    headers = {
-        "Content-Type": "application/json",
-        "X-goog-api-key": GEMINI_API_KEY
-    }
-
     # Create system instruction for career-focused assistant
     system_instruction = """
     You are Asha, an AI career assistant specializing in helping users with their professional growth.
@@ -283,8 +324,8 @@ async def talk_to_gemini(
         }
 
     try:
-        # Call Gemini API
-        response = requests.post(GEMINI_URL, headers=headers, json=data)
+        # Call Gemini API once the shared governor grants an interactive token (timeouts count as failures)
+        response = await gemini_client.generate_content(data, INTERACTIVE)
 
         if response.status_code != 200:
             logger.error(f"Gemini API error: {response.status_code}, {response.text}")
@@ -309,6 +350,9 @@ async def talk_to_gemini(
         else:
             return [{"text": "I couldn't generate a response. Please try rephrasing your question."}]
 
+    except GeminiUnavailable as e:
+        logger.warning(f"Gemini request shed by governor: {e}")
+        return [{"text": CANNED_REPLY}]
     except Exception as e:
         logger.error(f"Error connecting to Gemini API: {e}")
         return [{"text": "I'm having technical difficulties. Please try again later."}]
@@ -364,33 +408,26 @@ def detect_user_intent(user_query: str) -> str:
 # ------------- Job Search API ---------------
 
 async def fetch_real_time_jobs(job_title: str, location: str, page: int = 1, limit: int = 10):
-    cache_key = f"jobs:{job_title}:{location}"
-    cached_jobs = redis_client.get(cache_key)
+    cache_key = job_cache_key(job_title, location)
+    cached_jobs = await async_redis_client.get(cache_key)
+    await record_lookup(async_redis_client, hit=bool(cached_jobs))
 
     if cached_jobs:
         job_data = json.loads(cached_jobs)
     else:
-        querystring = {"query": f"{job_title} in {location}", "num_pages": "1"}
-        headers = {
-            "X-RapidAPI-Key": RAPIDAPI_KEY,
-            "X-RapidAPI-Host": "jsearch.p.rapidapi.com"
-        }
+        querystring, headers = jsearch_request(job_title, location)
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get("https://jsearch.p.rapidapi.com/search", headers=headers, params=querystring)
+        with stage("rapidapi"):
+            async with httpx.AsyncClient() as client:
+                response = await client.get(JSEARCH_URL, headers=headers, params=querystring)
 
         if response.status_code != 200:
             return []
 
-        raw_data = response.json()
-        job_data = raw_data.get("data", [])
-
-        for job in job_data:
-            job['job_title'] = remove_invalid_characters(job.get('job_title', ''))
-            job['employer_name'] = remove_invalid_characters(job.get('employer_name', ''))
-            job['job_city'] = remove_invalid_characters(job.get('job_city', ''))
+        with stage("ranking"):
+            job_data = clean_jobs(response.json(), job_title)
 
-        redis_client.setex(cache_key, 3600, json.dumps(job_data))
+        await async_redis_client.setex(cache_key, JOB_CACHE_TTL, json.dumps(job_data))
 
     start = (page - 1) * limit
     end = start + limit
@@ -417,17 +454,11 @@ async def process_mentorship(request: ConnectMentorshipRequest):
     finally:
         db.close()
 
-    field = request.interest_field.lower()
-    mentor_links = MENTOR_PLATFORM_LINKS.get(field, MENTOR_PLATFORM_LINKS["default"])
-
-    if isinstance(mentor_links, list):
-        selected_links = mentor_links[:2]
-    else:
-        selected_links = [mentor_links, MENTOR_PLATFORM_LINKS["default"][0]]
+    selected_links = mentor_resolver.links_for(request.interest_field)[:2]
 
     formatted_links = "\n".join([f"👉 {link}" for link in selected_links])
 
-    return JSONResponse(
+    return FastJSONResponse(
         content={
             "response": (
                 f"🌱 **Mentorship Opportunity in {request.interest_field}**\n\n"
@@ -444,7 +475,7 @@ async def process_mentorship(request: ConnectMentorshipRequest):
 
 @app.post("/fallback/")
 async def process_fallback(user_query: dict):
-    return JSONResponse(
+    return FastJSONResponse(
         content={
             "response": "I'm not sure what you're looking for. Try asking about jobs or mentorship!\n"
                         "You can also ask about AI, Data Science, or career tips.",
@@ -462,21 +493,16 @@ async def get_session_messages(session_id: str):
         messages_cursor = chat_collection.find({"session_id": session_id}).sort("timestamp", 1)
         messages = []
         for message in messages_cursor:
-            message["_id"] = str(message["_id"])
-            if "timestamp" in message and isinstance(message["timestamp"], datetime):
-                message["timestamp"] = message["timestamp"].isoformat()
-
-            # Add a sender field based on role
+            # ObjectIds and datetimes are converted by the response class
             message["sender"] = "bot" if message.get("role") == "bot" else "user"
-
             messages.append(message)
 
         if not messages:
             raise HTTPException(status_code=404, detail="Session not found")
 
         # Wrap in a messages property as the frontend expects
-        return JSONResponse(
-            content={"messages": jsonable_encoder(messages)},
+        return FastJSONResponse(
+            content={"messages": messages},
             headers={"Content-Type": "application/json; charset=utf-8"}
         )
     except Exception as e:
@@ -510,7 +536,66 @@ def extract_interest_field(query: str) -> str:
 
 
 @app.post("/chat/")
-async def process_chat(message: ChatMessage):
+async def process_chat(message: ChatMessage, request: Request,
+                       idempotency_key: Optional[str] = Header(None), authorization: Optional[str] = Header(None)):
+    caller = chat_caller(authorization)
+    client_ip = chat_client_ip(request)
+    key = idempotency_key or message.client_message_id
+    if not key:
+        return await admit_chat(message, caller, client_ip)
+    if len(key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"Idempotency key longer than {MAX_IDEMPOTENCY_KEY_LENGTH} characters")
+    # Keys are scoped to who verifiably sent them, never to the body's user_id
+    scope = f"user:{caller}" if caller else f"ip:{client_ip}"
+    try:
+        # Replays and retries joining an in-flight message don't spend the budgets again
+        return await chat_idempotency.run(scope, key, request_fingerprint(message.user_id or "", message.query),
+                                          lambda: admit_chat(message, caller, client_ip))
+    except IdempotencyKeyReused as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+def chat_client_ip(request: Request) -> Optional[str]:
+    """The client address per-IP budgets are keyed on, as seen by the outermost trusted proxy."""
+    if TRUSTED_PROXY_HOPS:
+        hops = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+        if len(hops) >= TRUSTED_PROXY_HOPS:
+            return hops[-TRUSTED_PROXY_HOPS]
+    return request.client.host if request.client else None
+
+
+def chat_caller(authorization: Optional[str]) -> Optional[str]:
+    """
+    The verified token subject the per-user /chat/ budgets are charged to.
+    None without a valid token: the body's user_id is never trusted, so
+    anonymous callers only spend their IP's budgets.
+    """
+    try:
+        claims = get_optional_user(authorization)
+    except HTTPException:
+        claims = None
+    return claims["sub"] if claims else None
+
+
+async def admit_chat(message: ChatMessage, caller: Optional[str], client_ip: Optional[str]):
+    intent = detect_user_intent(message.query) if message.query else None
+    with stage("admission"):
+        admission = await chat_admission.admit(caller, client_ip, intent)
+    if not admission.allowed:
+        overloaded = admission.reason == OVERLOADED
+        raise HTTPException(
+            status_code=503 if overloaded else 429,
+            detail="Too many people are chatting right now, please try again shortly." if overloaded
+            else f"Too many messages ({admission.reason} limit), please slow down.",
+            headers={"Retry-After": str(admission.retry_after)},
+        )
+    try:
+        return await answer_chat(message)
+    finally:
+        await chat_admission.release(admission)
+
+
+async def answer_chat(message: ChatMessage):
     user_query = message.query
     user_id = message.user_id or "anonymous"
     logger.info(f"Received message from user {user_id}: {user_query}")
@@ -520,7 +605,7 @@ async def process_chat(message: ChatMessage):
 
     # --- Session and User Handling (No changes here) ---
     session_id_key = f"session:{user_id}"
-    session_id = redis_client.get(session_id_key)
+    session_id = await async_redis_client.get(session_id_key)
     if isinstance(session_id, bytes):
         session_id = session_id.decode("utf-8")
 
@@ -528,14 +613,15 @@ async def process_chat(message: ChatMessage):
     if not session_id:
         session_id = str(uuid.uuid4())
         new_session = True
-        redis_client.set(session_id_key, session_id)
+        await async_redis_client.set(session_id_key, session_id)
 
         # Check if user is in interview booking flow
         booking_state_key = f"interview_booking:{user_id}"
-        is_booking = redis_client.get(booking_state_key)
+        is_booking = await async_redis_client.get(booking_state_key)
 
         # Intent Detection
-        user_intent = detect_user_intent(user_query)
+        with stage("intent"):
+            user_intent = detect_user_intent(user_query)
         logger.info(f"Detected intent: {user_intent}")
 
         # Check if this message contains scheduling info
@@ -547,13 +633,13 @@ async def process_chat(message: ChatMessage):
 
             if user_intent == "interview_booking" and not phone_number:
                 # Start the booking flow
-                redis_client.setex(booking_state_key, 300, "active")  # 5 min expiry
+                await async_redis_client.setex(booking_state_key, 300, "active")  # 5 min expiry
                 response_text = "Great! I'll help you schedule a mock interview. Please provide your phone number (10 digits) and preferred time (e.g., '15:30' or '3:30 PM')."
 
                 save_chat_to_mongodb(session_id, user_id, "user", user_query, "interview_booking")
                 save_chat_to_mongodb(session_id, user_id, "bot", response_text, "interview_booking_response")
 
-                return JSONResponse(content={
+                return FastJSONResponse(content={
                     "response": response_text,
                     "action": "collect_interview_details",
                     "session_id": session_id
@@ -565,38 +651,31 @@ async def process_chat(message: ChatMessage):
 
                 try:
                     # Clear the booking state
-                    redis_client.delete(booking_state_key)
+                    await async_redis_client.delete(booking_state_key)
 
-                    # Create interview record in database (you'll need to implement this)
+                    # The scheduler enqueues the call from this record shortly before it is due
                     db = SessionLocal()
                     try:
-                        # First, get or create the interview record
-                        # You might want to add an Interview model to your postgres_models.py
-                        interview_id = create_interview_record(db, user_id, phone_number, scheduled_time)
+                        interview_id = create_interview_record(db, user_id, f"+91{phone_number}", scheduled_time)  # Add country code
                     finally:
                         db.close()
 
-                    # Schedule the Celery task
-                    initiate_interview_call.apply_async(
-                        args=[f"+91{phone_number}", interview_id],  # Add country code
-                        eta=scheduled_time
-                    )
-
                     response_text = f"✅ Perfect! Your mock interview is scheduled for {scheduled_time.strftime('%B %d at %I:%M %p')}. You'll receive a call at {phone_number}. Please make sure you're in a quiet place and ready for the interview!"
 
                     save_chat_to_mongodb(session_id, user_id, "user", user_query, "interview_scheduled")
                     save_chat_to_mongodb(session_id, user_id, "bot", response_text, "interview_confirmation")
 
-                    return JSONResponse(content={
+                    return FastJSONResponse(content={
                         "response": response_text,
                         "action": "interview_scheduled",
+                        "interview_id": interview_id,
                         "session_id": session_id
                     })
 
                 except Exception as e:
                     logger.error(f"Error scheduling interview: {e}")
                     response_text = "Sorry, I couldn't schedule your interview. Please try again or contact support."
-                    return JSONResponse(content={
+                    return FastJSONResponse(content={
                         "response": response_text,
                         "session_id": session_id
                     })
@@ -611,7 +690,7 @@ async def process_chat(message: ChatMessage):
 
                 response_text = f"I got that! I still need your {' and '.join(missing)} to schedule the interview."
 
-                return JSONResponse(content={
+                return FastJSONResponse(content={
                     "response": response_text,
                     "action": "collect_interview_details",
                     "session_id": session_id
@@ -621,14 +700,15 @@ async def process_chat(message: ChatMessage):
                 # User is in booking flow but didn't provide required info
                 response_text = "To schedule your mock interview, please provide your 10-digit phone number and preferred time (e.g., 'phone number is 9876543210 and time 3:30 PM')."
 
-                return JSONResponse(content={
+                return FastJSONResponse(content={
                     "response": response_text,
                     "action": "collect_interview_details",
                     "session_id": session_id
                 })
 
     # --- Intent Detection ---
-    user_intent = detect_user_intent(user_query)
+    with stage("intent"):
+        user_intent = detect_user_intent(user_query)
     logger.info(f"Detected intent: {user_intent}")
 
     # --- ROUTING LOGIC ---
@@ -655,7 +735,7 @@ async def process_chat(message: ChatMessage):
             jobs = await fetch_real_time_jobs(job_title, location)
 
             if not jobs:
-                return JSONResponse(content={
+                return FastJSONResponse(content={
                     "response": f"❌ No jobs found for '{job_title}' in '{location}'.",
                     "job_results": [],
                     "session_id": session_id,
@@ -667,10 +747,11 @@ async def process_chat(message: ChatMessage):
                 if 'job_apply_link' not in job:
                     continue
                 job_summaries.append({
-                    "title": remove_invalid_characters(job.get("job_title", "")),
-                    "company": remove_invalid_characters(job.get("employer_name", "")),
-                    "city": remove_invalid_characters(job.get("job_city", "")),
-                    "description": remove_invalid_characters(job.get("job_description", ""))[:300] + "...",
+                    # Already sanitized (and the description cut) by clean_jobs
+                    "title": job.get("job_title", ""),
+                    "company": job.get("employer_name", ""),
+                    "city": job.get("job_city", ""),
+                    "description": job.get("job_description", "")[:DESCRIPTION_PREVIEW_CHARS] + "...",
                     "apply_link": job.get("job_apply_link", ""),
                     "employer_website": job.get("employer_website", ""),
                     "employer_logo": job.get("employer_logo", ""),
@@ -681,10 +762,12 @@ async def process_chat(message: ChatMessage):
             response_text = f"🌟 Here are some jobs for '{job_title}' in '{location}':"
 
             # Save chat to MongoDB
-            save_chat_to_mongodb(session_id, user_id, "user", user_query, "job_search")
+            # The extracted title/location feed the popular-search cache prewarming
+            save_chat_to_mongodb(session_id, user_id, "user", user_query, "job_search",
+                                 entities={"job_title": job_title, "location": location})
             save_chat_to_mongodb(session_id, user_id, "bot", response_text, "job_search_results")
 
-            return JSONResponse(content={
+            return FastJSONResponse(content={
                 "response": response_text,
                 "job_results": job_summaries,
                 "session_id": session_id,
@@ -692,7 +775,7 @@ async def process_chat(message: ChatMessage):
 
         except Exception as e:
             logger.error(f"Error during job fetch: {e}")
-            return JSONResponse(
+            return FastJSONResponse(
                 content={"response": f"Sorry, an error occurred while searching for jobs."},
                 status_code=500
             )
@@ -723,7 +806,7 @@ async def process_chat(message: ChatMessage):
         # or multiple API calls to collect info before scheduling.
         # Once info is collected, you would then call the scheduling logic.
 
-        return JSONResponse(content={"response": response_text, "action": "collect_interview_details"})
+        return FastJSONResponse(content={"response": response_text, "action": "collect_interview_details"})
 
 
 
@@ -747,7 +830,7 @@ async def process_chat(message: ChatMessage):
 
         except Exception as e:
             logger.error(f"Error processing mentorship request: {e}")
-            return JSONResponse(
+            return FastJSONResponse(
                 content={"response": "Sorry, I had trouble finding mentorship links."},
                 status_code=500
             )
@@ -757,8 +840,9 @@ async def process_chat(message: ChatMessage):
         logger.info(f"Routing to Gemini for general conversation.")
         # Fetch conversation history for context
         try:
-            messages_cursor = chat_collection.find({"session_id": session_id}).sort("timestamp", -1).limit(10)
-            conversation_history = [{"role": msg.get("role"), "message": msg.get("message")} for msg in messages_cursor]
+            with stage("mongodb"):
+                messages_cursor = chat_collection.find({"session_id": session_id}).sort("timestamp", -1).limit(10)
+                conversation_history = [{"role": msg.get("role"), "message": msg.get("message")} for msg in messages_cursor]
             conversation_history.reverse()
         except Exception as e:
             logger.error(f"Error fetching conversation history: {e}")
@@ -777,20 +861,59 @@ async def process_chat(message: ChatMessage):
             save_chat_to_mongodb(session_id, user_id, "user", user_query, user_intent)
             save_chat_to_mongodb(session_id, user_id, "bot", bot_reply_text, f"{user_intent}_response")
 
-            return JSONResponse(content={
+            return FastJSONResponse(content={
                 "response": bot_reply_text,
                 "action": action_trigger,
                 "session_id": session_id,
             })
         except Exception as e:
             logger.error(f"Error connecting to Gemini API: {e}")
-            return JSONResponse(
+            return FastJSONResponse(
                 content={"response": "Sorry, I'm having technical difficulties."},
                 status_code=500
             )
 
 
 
+@app.get("/gemini/governor")
+async def get_gemini_governor_state():
+    """Current Gemini tokens, waiting requests per priority and circuit breaker state."""
+    try:
+        return await gemini_governor.snapshot()
+    except Exception as e:
+        logger.error(f"Error reading Gemini governor state: {e}")
+        raise HTTPException(status_code=503, detail="Governor state unavailable")
+
+
+@app.get("/jobs/cache/stats")
+async def get_job_cache_stats(hours: int = 1):
+    """Job cache hit ratio over the last `hours` hours."""
+    hours = max(1, min(hours, 48))
+    values = await async_redis_client.mget(hit_ratio_keys(hours))
+    return summarize_hit_ratio(values, hours)
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """Per-stage and per-route latency histograms of this worker, in Prometheus text format."""
+    return Response(content=metrics.render_prometheus(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/mentorship/resolver/stats")
+async def get_mentor_resolver_stats():
+    """Share of interest phrases resolved to a specific field since startup."""
+    return mentor_resolver.snapshot()
+
+
+@app.get("/skills/autocomplete")
+async def autocomplete_skills(q: str = "", limit: int = Query(AUTOCOMPLETE_LIMIT, ge=1, le=AUTOCOMPLETE_LIMIT)):
+    """Skill suggestions for the resume form, matched on name, alias or later word."""
+    return {
+        "query": q,
+        "suggestions": [{"name": skill.name, "category": skill.category} for skill in skill_taxonomy.autocomplete(q, limit)],
+    }
+
+
 @app.get("/headings", response_model=List[Dict[str, str]])
 async def get_headings():
     # In a real application, fetch this data from a database or CMS
@@ -802,31 +925,32 @@ async def get_headings():
     return headings
 
 
+# Plain def: the profile cache does blocking Redis and Postgres I/O, so this runs in the threadpool
 @app.get("/user/profile/{user_id}")
-async def get_user_profile(user_id: str, db: Session = Depends(get_resume_db)):
+def get_user_profile(user_id: str, db: Session = Depends(get_resume_db)):
     """Get user profile data by user_id"""
     try:
-        # Query user profile from database
-        user_profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
+        # Served from the profile cache; Postgres only on a cold miss
+        user_profile = profile_cache.get_by_user_id(db, user_id)
 
         if not user_profile:
             # Return a default response if user not found in database
-            return JSONResponse(
-                content=jsonable_encoder({
+            return FastJSONResponse(
+                content={
                     "name": "User",
                     "email": "user@example.com",
                     "contact": None
-                }),
+                },
                 headers={"Content-Type": "application/json; charset=utf-8"}
             )
 
         # Return user profile data
-        return JSONResponse(
-            content=jsonable_encoder({
-                "name": user_profile.name,
-                "email": user_profile.email,
-                "contact": user_profile.contact
-            }),
+        return FastJSONResponse(
+            content={
+                "name": user_profile["name"],
+                "email": user_profile["email"],
+                "contact": user_profile["contact"]
+            },
             headers={"Content-Type": "application/json; charset=utf-8"}
         )
     except Exception as e:
@@ -836,7 +960,7 @@ async def get_user_profile(user_id: str, db: Session = Depends(get_resume_db)):
 
 @app.post("/users/{user_id}/jobs", response_model=SavedJobResponse)
 def save_job_for_user(user_id: str, job: SavedJobBase, db: Session = Depends(get_resume_db)):
-    logger.info(f"Attempting to save job for user {user_id}: {job.dict()}")
+    logger.info(f"Attempting to save job for user {user_id}: {job.model_dump()}")
 
     try:
         # Create SavedJob object
@@ -853,6 +977,8 @@ def save_job_for_user(user_id: str, job: SavedJobBase, db: Session = Depends(get
         db.commit()
         db.refresh(db_job)
 
+        saved_jobs_cache.forget_saved_jobs(redis_client, user_id)
+
         logger.info(f"Successfully saved job ID {db_job.id} for user {user_id}")
         return db_job
     except Exception as e:
@@ -861,13 +987,43 @@ def save_job_for_user(user_id: str, job: SavedJobBase, db: Session = Depends(get
         raise HTTPException(status_code=500, detail=f"Failed to save job: {str(e)}")
 
 
+@app.get("/users/{user_id}/jobs")
+def list_saved_jobs(
+        user_id: str,
+        limit: int = Query(listings.DEFAULT_PAGE_SIZE, ge=1, le=listings.MAX_PAGE_SIZE),
+        cursor: Optional[str] = None,
+        db: Session = Depends(get_resume_db)
+):
+    """Saved jobs, most recent first. Pass `next_cursor` back as `cursor` for the next page."""
+    try:
+        items, next_cursor = listings.list_saved_jobs(db, user_id, limit=limit, cursor=cursor)
+    except listings.InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@app.get("/users/{user_id}/resumes")
+def list_resumes(
+        user_id: str,
+        limit: int = Query(listings.DEFAULT_PAGE_SIZE, ge=1, le=listings.MAX_PAGE_SIZE),
+        cursor: Optional[str] = None,
+        db: Session = Depends(get_resume_db)
+):
+    """Resume summaries (no resume_data), newest first, keyset-paginated like saved jobs."""
+    try:
+        items, next_cursor = listings.list_resume_summaries(db, user_id, limit=limit, cursor=cursor)
+    except listings.InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
+
+
 # THE MAIN DASHBOARD ENDPOINT
 @app.get("/users/{user_id}/dashboard", response_model=DashboardResponse)
 def get_user_dashboard(
         user_id: str,
         db: Session = Depends(get_resume_db),
         jobs_limit: int = 5,
-        resumes_limit: int = None,  # No default limit
+        resumes_limit: int = 10,
         events_limit: int = 5
 ):
     try:
@@ -880,36 +1036,18 @@ def get_user_dashboard(
             .all()
         )
 
-        # 2. Fetch Documents (Resumes)
-        if resumes_limit is None:
-            resumes = (
-                db.query(Resume)
-                .filter(Resume.user_id == user_id)
-                .order_by(Resume.id.desc())
-                .all()
-            )
-        else:
-            resumes = (
-                db.query(Resume)
-                .filter(Resume.user_id == user_id)
-                .order_by(Resume.id.desc())
-                .limit(resumes_limit)
-                .all()
-            )
-
-        documents = []
-        for r in resumes:
-            # Ensure resume_data is a dictionary
-            resume_data = r.resume_data if isinstance(r.resume_data, dict) else {}
-
-            document = {
-                "id": r.id,
-                "file_name": r.file_name or f"Resume_{r.id}.pdf",
-                "download_url": r.download_url or generate_default_download_url(r.id),
-                "created_at": r.created_at,  # Use created_at instead of timestamp
-                "personal_info": resume_data.get('personal_info', {})
+        # 2. Fetch Documents (Resumes) - summary columns only, never the resume_data blob
+        resumes, _ = listings.list_resume_summaries(db, user_id, limit=resumes_limit)
+        documents = [
+            {
+                "id": r["id"],
+                "file_name": r["file_name"],
+                "download_url": r["download_url"] or generate_default_download_url(r["id"]),
+                "created_at": r["created_at"],
+                "personal_info": r["personal_info"],
             }
-            documents.append(document)
+            for r in resumes
+        ]
 
         # 3. Fetch Upcoming Events
         upcoming_events = (
@@ -927,7 +1065,7 @@ def get_user_dashboard(
         # Additional: Check total number of resumes
         total_resumes_count = db.query(Resume).filter(Resume.user_id == user_id).count()
 
-        return DashboardResponse(
+        dashboard = DashboardResponse(
             saved_jobs=saved_jobs,
             documents=documents,
             upcoming_events=upcoming_events,
@@ -936,6 +1074,8 @@ def get_user_dashboard(
                 "total_resumes_count": total_resumes_count
             }
         )
+        # Already validated from the ORM rows; skip FastAPI's second validation pass
+        return FastJSONResponse(content=dashboard.model_dump())
 
     except Exception as e:
         logger.error(f"Error in dashboard retrieval for user {user_id}: {str(e)}")
@@ -948,10 +1088,11 @@ def generate_default_download_url(resume_id: int) -> str:
     if not os.path.exists(default_filepath):
         from reportlab.pdfgen import canvas
         from reportlab.lib.pagesizes import letter
-        c = canvas.Canvas(default_filepath, pagesize=letter)
-        c.setFont("Helvetica", 12)
-        c.drawString(100, 750, f"Resume {resume_id} - Placeholder")
-        c.save()
+        with stage("pdf"):
+            c = canvas.Canvas(default_filepath, pagesize=letter)
+            c.setFont("Helvetica", 12)
+            c.drawString(100, 750, f"Resume {resume_id} - Placeholder")
+            c.save()
 
     return f"{BACKEND_BASE_URL}/static/resumes/resume_{resume_id}_default.pdf"
 
@@ -995,6 +1136,7 @@ def test_save_job(
         db.add(db_job)
         db.commit()
         db.refresh(db_job)
+        saved_jobs_cache.forget_saved_jobs(redis_client, user_id)
 
         # Verify by fetching
         saved_jobs = db.query(SavedJob).filter(SavedJob.user_id == user_id).all()
@@ -1036,6 +1178,7 @@ def delete_saved_job(user_id: str, job_id: int, db: Session = Depends(get_resume
         # Delete the job
         db.delete(job)
         db.commit()
+        saved_jobs_cache.forget_saved_jobs(redis_client, user_id)
 
         logger.info(f"Successfully deleted job {job_id} for user {user_id}")
         return {"success": True, "message": "Job deleted successfully"}
@@ -1054,21 +1197,45 @@ def check_saved_job(
 ):
     """Check if a job with matching title and company is already saved by this user"""
     try:
-        job = db.query(SavedJob).filter(
-            SavedJob.user_id == user_id,
-            SavedJob.job_title == title,
-            SavedJob.company_name == company
-        ).first()
-
-        if job:
-            return {"is_saved": True, "job_id": job.id}
-        else:
-            return {"is_saved": False, "job_id": None}
+        index = saved_jobs_cache.get_saved_index(redis_client, db, user_id)
+        job_id = index.get(saved_jobs_cache.job_fingerprint(title, company))
+        return {"is_saved": job_id is not None, "job_id": int(job_id) if job_id else None}
     except Exception as e:
         logger.error(f"Error checking saved job: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to check saved job: {str(e)}")
 
 
+MAX_SAVED_STATUS_ITEMS = 200
+
+
+@app.post("/users/{user_id}/saved-jobs/status")
+def check_saved_jobs_bulk(user_id: str, request: SavedStatusRequest, db: Session = Depends(get_resume_db)):
+    """Saved status for a whole page of job cards, by (title, company) pairs and/or saved job ids"""
+    if len(request.jobs) + len(request.job_ids) > MAX_SAVED_STATUS_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_SAVED_STATUS_ITEMS} jobs per request")
+    try:
+        index = saved_jobs_cache.get_saved_index(redis_client, db, user_id)
+        saved_ids = {int(job_id) for job_id in index.values()}
+
+        jobs = []
+        for job in request.jobs:
+            job_id = index.get(saved_jobs_cache.job_fingerprint(job.title, job.company))
+            jobs.append({
+                "title": job.title,
+                "company": job.company,
+                "is_saved": job_id is not None,
+                "job_id": int(job_id) if job_id else None,
+            })
+
+        return {
+            "jobs": jobs,
+            "job_ids": {str(job_id): job_id in saved_ids for job_id in request.job_ids},
+        }
+    except Exception as e:
+        logger.error(f"Error checking saved jobs for user {user_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to check saved jobs: {str(e)}")
+
+
 def extract_scheduling_info(query: str):
     """Extract phone number and time from user query"""
     # Phone number pattern (Indian format)
@@ -1110,13 +1277,15 @@ def extract_scheduling_info(query: str):
 from postgres_models import Interview
 
 
-def create_interview_record(db: Session, user_id: str, phone_number: str, scheduled_time: datetime) -> int:
+def create_interview_record(db: Session, user_id: str, phone_number: str, scheduled_time: datetime,
+                            role: str = "general") -> int:
     """Create an interview record in the database"""
     try:
         interview = Interview(
             user_id=user_id,
             phone_number=phone_number,
             scheduled_time=scheduled_time,
+            role=interview_engine.normalize_role(role),
             status="scheduled"
         )
         db.add(interview)
@@ -1134,85 +1303,84 @@ def create_interview_record(db: Session, user_id: str, phone_number: str, schedu
 
 @app.post("/schedule_interview")
 async def schedule_interview(request: ScheduleRequest):
-    # 1. Save interview details to your database (PostgreSQL)
-    #    Create a new `MockInterview` record with a status of 'SCHEDULED'.
-    #    interview_id = db_interview.id
-    interview_id = 1  # Placeholder
-
-    # 2. Schedule the Celery task
-    initiate_interview_call.apply_async(
-        args=[request.phone_number, interview_id],
-        eta=request.scheduled_time  # 'eta' schedules it for a specific time
-    )
-
-    return {"status": "success", "message": "Interview scheduled successfully!"}
-
-
+    # Scheduled times are stored as naive local time, like extract_scheduling_info produces
+    scheduled_time = request.scheduled_time
+    if scheduled_time.tzinfo is not None:
+        scheduled_time = scheduled_time.astimezone().replace(tzinfo=None)
 
+    # Save the booking; tasks.dispatch_due_interviews places the call when it is due
+    db = SessionLocal()
+    try:
+        interview_id = create_interview_record(db, request.user_id, request.phone_number, scheduled_time, request.role)
+    finally:
+        db.close()
 
+    return {"status": "success", "message": "Interview scheduled successfully!", "interview_id": interview_id}
 
-# Store conversation state in Redis
-def get_interview_state(interview_id):
-    state = redis_client.get(f"interview_state:{interview_id}")
-    return json.loads(state) if state else {"history": []}
 
 
-def set_interview_state(interview_id, state):
-    redis_client.set(f"interview_state:{interview_id}", json.dumps(state))
 
 
 @app.post("/interview/start/{interview_id}")
-async def start_interview(interview_id: int):
+async def start_interview(interview_id: int, role: str = "general"):
     """
     Twilio calls this webhook when the user answers the phone.
     """
     response = VoiceResponse()
+    role = interview_engine.normalize_role(role)
 
     # Initial greeting and first question
-    first_question = "Hello, this is Asha, your AI-powered career coach. Welcome to your mock interview. Let's start with a classic question: Tell me about yourself."
+    first_question = interview_engine.OPENING_QUESTION
+
+    # Save the first question to the transcript
+    turns = await interview_store.start_transcript(interview_id, first_question)
 
-    # Save the first question to state
-    state = {"history": [{"role": "model", "parts": [{"text": first_question}]}]}
-    set_interview_state(interview_id, state)
+    # Draft the next question while the caller introduces themselves
+    interview_engine.start_speculation(interview_id, role, [{"role": "model", "text": first_question}], turns)
 
-    gather = Gather(input='speech', action=f'/interview/continue/{interview_id}', speechTimeout='auto')
+    gather = Gather(input='speech', action=f'/interview/continue/{interview_id}?role={quote(role)}', speechTimeout='auto')
     gather.say(first_question, voice='Polly.Joanna')
     response.append(gather)
 
-    return str(response), {"Content-Type": "text/xml"}
+    return Response(content=str(response), media_type="text/xml")
 
 
 @app.post("/interview/continue/{interview_id}")
-async def continue_interview(interview_id: int, request: Request):
+async def continue_interview(interview_id: int, request: Request, role: str = "general"):
     """
     Twilio calls this after the user speaks.
     """
     twiml_response = VoiceResponse()
     form_data = await request.form()
     user_answer = form_data.get('SpeechResult', '')
+    role = interview_engine.normalize_role(role)
 
-    # Get current conversation state
-    state = get_interview_state(interview_id)
-    state["history"].append({"role": "user", "parts": [{"text": user_answer}]})
+    # Only the turn count and the prompt's window are read back, never the whole transcript
+    turns = await interview_store.append_turns(interview_id, ("user", user_answer))
 
-    # Get next question from Gemini
-    # You would pass state["history"] to Gemini to get a follow-up question
-    # next_question_text = call_gemini_for_next_question(state["history"])
-    next_question_text = "Thank you for sharing. My next question is: What is your biggest weakness?"  # Placeholder
+    if interview_engine.is_finished(turns):
+        twiml_response.say(interview_engine.CLOSING_MESSAGE, voice='Polly.Joanna')
+        twiml_response.hangup()
+        return Response(content=str(twiml_response), media_type="text/xml")
 
-    # Update and save state
-    state["history"].append({"role": "model", "parts": [{"text": next_question_text}]})
-    set_interview_state(interview_id, state)
+    # Answer-aware Gemini follow-up within the latency budget, else the
+    # speculative draft, else the role's question bank
+    recent = await interview_store.get_recent_turns_async(interview_id, interview_engine.HISTORY_WINDOW)
+    next_question_text = await interview_engine.next_question(interview_id, role, recent, turns)
+
+    turns = await interview_store.append_turns(interview_id, ("model", next_question_text))
+    recent.append({"role": "model", "text": next_question_text})
+    interview_engine.start_speculation(interview_id, role, recent, turns)
 
     # Ask the next question
-    gather = Gather(input='speech', action=f'/interview/continue/{interview_id}', speechTimeout='auto')
+    gather = Gather(input='speech', action=f'/interview/continue/{interview_id}?role={quote(role)}', speechTimeout='auto')
     gather.say(next_question_text, voice='Polly.Joanna')
     twiml_response.append(gather)
 
     # If no speech is detected, end the call
     twiml_response.say("I didn't hear a response. Thank you for your time. Goodbye.")
 
-    return str(twiml_response), {"Content-Type": "text/xml"}
+    return Response(content=str(twiml_response), media_type="text/xml")
 
 
 
@@ -1225,6 +1393,9 @@ async def interview_status(interview_id: int, request: Request):
     form_data = await request.form()
     recording_url = form_data.get('RecordingUrl')
 
+    # The call is over, so the transcript only needs to outlive the analysis
+    await interview_store.complete_transcript(interview_id)
+
     if recording_url:
         logger.info(f"Interview {interview_id} completed. Recording available at: {recording_url}")
         # Trigger the background task for analysis
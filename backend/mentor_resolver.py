@@ -0,0 +1,181 @@
+# mentor_resolver.py
+"""
+Maps free-form interest phrases ("data science and ml please", "ui/ux",
+"public speeking") to a field of `mentor_links.json`.
+
+Built once at startup: every field name and its aliases become phrases, and a
+token index maps each phrase token to the phrases containing it. A lookup
+  1. strips filler words ("mentor", "please", "i want" ...),
+  2. takes the longest phrase found verbatim in the text (n-gram lookup),
+  3. otherwise scores the phrases sharing a token with the text (or all
+     phrases when none do, for typos) with `rapidfuzz`,
+and falls back to "default". Results are cached per normalized text. The JSON
+is re-read only when its mtime changes, checked at most every
+`RELOAD_CHECK_SECONDS`.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+
+from rapidfuzz import fuzz, process, utils
+
+logger = logging.getLogger(__name__)
+
+MENTOR_LINKS_PATH = Path(__file__).parent / "mentor_links.json"
+DEFAULT_FIELD = "default"
+MATCH_SCORE_CUTOFF = int(os.getenv("MENTOR_MATCH_SCORE_CUTOFF", "80"))
+RESOLVER_CACHE_SIZE = int(os.getenv("MENTOR_RESOLVER_CACHE_SIZE", "2048"))
+RELOAD_CHECK_SECONDS = 5.0
+MAX_NGRAM = 3
+
+# Aliases for fields in mentor_links.json; aliases of fields missing from the
+# file are ignored, so the JSON stays the source of truth for what exists.
+MENTOR_ALIASES = {
+    "data science": ["data scientist", "data analytics", "data analysis", "data analyst", "analytics",
+                     "statistics", "big data", "ds"],
+    "ai": ["artificial intelligence", "machine learning", "ml", "deep learning", "genai", "gen ai",
+           "generative ai", "llm", "llms", "nlp", "computer vision"],
+    "career": ["career growth", "career guidance", "career change", "career switch", "career break",
+               "career restart", "returning to work", "job search", "job hunting", "interview preparation",
+               "interviews", "resume", "placement", "promotion", "leadership"],
+    "life coach": ["life coaching", "personal growth", "self improvement", "motivation", "work life balance",
+                   "productivity", "goal setting", "coaching"],
+    "public speaking": ["speaking", "presentation", "presentations", "communication", "communication skills",
+                        "stage fear", "confidence", "storytelling"],
+    "entrepreneurship": ["entrepreneur", "entrepreneurs", "own business", "small business", "business",
+                         "founder", "founders", "freelancing"],
+    "startup": ["startups", "start up", "start ups", "fundraising", "venture capital", "pitch deck"],
+    "design": ["ui", "ux", "ui ux", "product design", "graphic design", "web design", "designer", "figma",
+               "visual design"],
+    "finance": ["financial", "finances", "investing", "investment", "investments", "money", "personal finance",
+                "accounting", "banking", "fintech", "stock market"],
+    "mental health": ["wellbeing", "well being", "wellness", "stress", "anxiety", "burnout", "therapy",
+                      "mindfulness", "self care"],
+}
+
+FILLER_WORDS = {
+    "a", "an", "the", "and", "or", "in", "on", "for", "of", "to", "with", "about", "around", "into", "field",
+    "area", "domain", "please", "pls", "plz", "i", "im", "me", "my", "want", "wanna", "need", "would", "like",
+    "looking", "find", "get", "connect", "someone", "some", "any", "who", "can", "help", "guide", "guidance",
+    "mentor", "mentors", "mentorship", "mentoring", "expert", "experts", "advice", "support", "knows",
+}
+
+
+def normalize(text: str) -> str:
+    return utils.default_process(text or "")
+
+
+class MentorFieldResolver:
+    def __init__(self, path: Path = MENTOR_LINKS_PATH, aliases: dict = None, score_cutoff: int = MATCH_SCORE_CUTOFF,
+                 cache_size: int = RESOLVER_CACHE_SIZE):
+        self.path = Path(path)
+        self.aliases = MENTOR_ALIASES if aliases is None else aliases
+        self.score_cutoff = score_cutoff
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._mtime = None
+        self._next_check = 0.0
+        self.stats = {"lookups": 0, "matched": 0, "cache_hits": 0, "reloads": 0}
+        self._load()
+
+    def _load(self):
+        mtime = os.stat(self.path).st_mtime_ns
+        with open(self.path, "r") as f:
+            links = json.load(f)
+
+        phrase_fields = {}
+        for field in links:
+            if field == DEFAULT_FIELD:
+                continue
+            for phrase in [field, *self.aliases.get(field, [])]:
+                phrase_fields.setdefault(normalize(phrase), field)
+
+        token_index = defaultdict(set)
+        for phrase in phrase_fields:
+            for token in phrase.split():
+                token_index[token].add(phrase)
+
+        # Swap everything at once so concurrent lookups see a consistent index
+        with self._lock:
+            self.links = links
+            self.phrase_fields = phrase_fields
+            self.phrases = list(phrase_fields)
+            self.token_index = dict(token_index)
+            self._cache.clear()
+            self._mtime = mtime
+        logger.info(f"🧭 Mentor resolver loaded {len(links)} fields, {len(phrase_fields)} phrases")
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + RELOAD_CHECK_SECONDS
+        try:
+            if os.stat(self.path).st_mtime_ns != self._mtime:
+                self._load()
+                self.stats["reloads"] += 1
+        except (OSError, ValueError) as e:
+            # Keep serving the last good index while the file is being edited
+            logger.error(f"❌ Could not reload {self.path}: {e}")
+
+    def _match(self, tokens: list) -> str:
+        # Longest phrase present verbatim, e.g. "data science" in "data science and ml"
+        for size in range(min(MAX_NGRAM, len(tokens)), 0, -1):
+            for start in range(len(tokens) - size + 1):
+                field = self.phrase_fields.get(" ".join(tokens[start:start + size]))
+                if field:
+                    return field
+
+        text = " ".join(token for token in tokens if token not in FILLER_WORDS)
+        if not text:
+            return DEFAULT_FIELD
+        candidates = set()
+        for token in text.split():
+            candidates.update(self.token_index.get(token, ()))
+        best = process.extractOne(
+            text, list(candidates) or self.phrases, scorer=fuzz.token_sort_ratio, score_cutoff=self.score_cutoff
+        )
+        return self.phrase_fields[best[0]] if best else DEFAULT_FIELD
+
+    def resolve(self, interest: str) -> str:
+        """Returns the mentor_links.json field for `interest`, or "default"."""
+        self._maybe_reload()
+        self.stats["lookups"] += 1
+        key = normalize(interest)
+
+        with self._lock:
+            field = self._cache.get(key)
+            if field is not None:
+                self._cache.move_to_end(key)
+                self.stats["cache_hits"] += 1
+        if field is None:
+            field = self._match(key.split())
+            with self._lock:
+                self._cache[key] = field
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        if field != DEFAULT_FIELD:
+            self.stats["matched"] += 1
+        return field
+
+    def links_for(self, interest: str) -> list:
+        links = self.links.get(self.resolve(interest)) or self.links[DEFAULT_FIELD]
+        return links if isinstance(links, list) else [links, self.links[DEFAULT_FIELD][0]]
+
+    def snapshot(self) -> dict:
+        lookups = self.stats["lookups"]
+        return {
+            **self.stats,
+            "match_rate": round(self.stats["matched"] / lookups, 3) if lookups else None,
+            "cache_size": len(self._cache),
+            "fields": len(self.links),
+        }
+
+
+mentor_resolver = MentorFieldResolver()
@@ -0,0 +1,212 @@
+# metrics.py
+"""
+In-process latency instrumentation.
+
+Code wraps the expensive parts of a request in `stage(name)` (or decorates a
+function with `timed(name)`); Postgres queries are timed through engine events
+and Redis commands inside `ResilientRedis`. Every stage duration is added to a
+histogram and, while a request is being served, to that request's timings.
+`time_request` (installed as HTTP middleware in main.py) records the whole
+request and sends the per-stage totals back as a `Server-Timing` header, e.g.
+
+    Server-Timing: redis;dur=2.4;desc="3 calls", gemini;dur=812.0, total;dur=830.5
+
+`render_prometheus` exports the histograms (and any `Counter`, e.g. cache
+hits) in the Prometheus text format for `/metrics`. Everything is per
+process: with several gunicorn workers each scrape sees the worker that
+served it.
+"""
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_request_timings = ContextVar("request_timings", default=None)
+_registry = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_le(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: tuple, buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = (*buckets, float("inf"))
+        self._series = {}  # label values -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {key: (list(counts), total, count) for key, (counts, total, count) in self._series.items()}
+        for key, (counts, total, count) in sorted(series.items()):
+            labels = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key))
+            prefix = f"{labels}," if labels else ""
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{_format_le(bound)}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total:.6f}")
+            lines.append(f"{self.name}_count{{{labels}}} {count}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: tuple):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(str(labels.get(name, "")) for name in self.labelnames), 0)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            labels = ",".join(f'{name}="{_escape(label)}"' for name, label in zip(self.labelnames, key))
+            lines.append(f"{self.name}{{{labels}}} {value}")
+        return lines
+
+
+STAGE_DURATION = Histogram(
+    "nexpath_stage_duration_seconds", "Time spent in one stage of a request (Redis, Gemini, Postgres, ...).", ("stage",)
+)
+REQUEST_DURATION = Histogram(
+    "nexpath_http_request_duration_seconds", "Total time to produce an HTTP response.", ("method", "route", "status")
+)
+
+
+def observe_stage(name: str, seconds: float):
+    STAGE_DURATION.observe(seconds, stage=name)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((name, seconds))
+
+
+@contextmanager
+def stage(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(name, time.perf_counter() - started)
+
+
+def timed(name: str):
+    """Decorator version of `stage` for sync and async functions."""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with stage(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def instrument_engine(engine, name: str = "postgres"):
+    """
+    Times every statement executed through `engine` as stage `name`, failed
+    ones included. The start time lives on the statement's execution context,
+    so a statement that raises leaves nothing behind on the pooled connection.
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._stage_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_stage_started", None)
+        if started is not None:
+            observe_stage(name, time.perf_counter() - started)
+
+    @event.listens_for(engine, "handle_error")
+    def _failed(exception_context):
+        started = getattr(exception_context.execution_context, "_stage_started", None)
+        if started is not None:
+            observe_stage(name, time.perf_counter() - started)
+
+
+def server_timing(timings: list, total: float) -> str:
+    totals = {}
+    for name, seconds in timings:
+        spent, calls = totals.get(name, (0.0, 0))
+        totals[name] = (spent + seconds, calls + 1)
+    entries = [
+        f'{name};dur={spent * 1000:.1f}' + (f';desc="{calls} calls"' if calls > 1 else "")
+        for name, (spent, calls) in totals.items()
+    ]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+async def time_request(request, call_next):
+    """HTTP middleware body: collects this request's stages and reports them."""
+    timings = []
+    token = _request_timings.set(timings)
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        total = time.perf_counter() - started
+        _request_timings.reset(token)
+        route = request.scope.get("route")
+        REQUEST_DURATION.observe(
+            total, method=request.method, route=getattr(route, "path", "unmatched"), status=status
+        )
+    response.headers["Server-Timing"] = server_timing(timings, total)
+    return response
+
+
+def render_prometheus() -> str:
+    lines = []
+    for collector in _registry:
+        lines.extend(collector.render())
+    return "\n".join(lines) + "\n"
@@ -1,6 +1,92 @@
-from fastapi import FastAPI
-from typing import List
+# mock_herkey_api.py
+"""
+Upstream emulator for offline development, tests and benchmarks.
+
+Speaks the wire formats the backend uses:
+  GET  /search                                  JSearch (RapidAPI)
+  POST /v1beta/models/{model}:generateContent   Gemini
+(plus the original `/jobs` toy endpoint). Point the backend at it with
+GEMINI_BASE_URL / JSEARCH_BASE_URL (see upstreams.py).
+
+MOCK_MODE selects where responses come from:
+  synthetic  generated deterministically from the request (default)
+  replay     recorded fixtures from MOCK_FIXTURES_DIR; misses fall back to
+             synthetic, or 404 when MOCK_REPLAY_STRICT=1
+  record     forwarded to the real API (the caller's key headers are passed
+             through, never stored) and saved as fixtures
+
+Faults are injected per upstream, before the response is produced:
+  MOCK_{JSEARCH,GEMINI}_LATENCY       seconds, +/- MOCK_JITTER as a fraction
+  MOCK_{JSEARCH,GEMINI}_ERROR_RATE    share of requests answered with 503
+  MOCK_{JSEARCH,GEMINI}_429_RATE      share of requests answered with 429
+  MOCK_{JSEARCH,GEMINI}_QUOTA_RPS     requests per second before 429s (0 = off)
+Fault draws use a RNG seeded with MOCK_SEED, so a run is repeatable for a
+given request order. GET/POST /_emulator/config reads or changes these at
+runtime, GET /_emulator/stats counts outcomes, POST /_emulator/reset clears
+counters and re-seeds.
+
+    MOCK_MODE=replay uvicorn mock_herkey_api:app --port 8001
+"""
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+from collections import Counter
+from pathlib import Path
+from typing import List, Optional
+
+import httpx
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+MODE = os.getenv("MOCK_MODE", "synthetic")
+FIXTURES_DIR = Path(os.getenv("MOCK_FIXTURES_DIR", Path(__file__).parent / "fixtures" / "upstream"))
+REPLAY_STRICT = os.getenv("MOCK_REPLAY_STRICT", "0") == "1"
+JITTER = float(os.getenv("MOCK_JITTER", "0.2"))
+SEED = int(os.getenv("MOCK_SEED", "1"))
+JOBS_PER_PAGE = int(os.getenv("MOCK_JOBS_PER_PAGE", "10"))
+
+RECORD_TARGETS = {
+    "jsearch": os.getenv("MOCK_JSEARCH_UPSTREAM", "https://jsearch.p.rapidapi.com"),
+    "gemini": os.getenv("MOCK_GEMINI_UPSTREAM", "https://generativelanguage.googleapis.com"),
+}
+FORWARDED_HEADERS = ("x-rapidapi-key", "x-rapidapi-host", "x-goog-api-key", "content-type")
+
+
+class UpstreamFaults(BaseModel):
+    latency: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    quota_rps: float = 0.0
+
+
+def _faults_from_env(name: str, latency: float) -> UpstreamFaults:
+    prefix = f"MOCK_{name.upper()}_"
+    return UpstreamFaults(
+        latency=float(os.getenv(prefix + "LATENCY", str(latency))),
+        error_rate=float(os.getenv(prefix + "ERROR_RATE", "0")),
+        rate_limit_rate=float(os.getenv(prefix + "429_RATE", "0")),
+        quota_rps=float(os.getenv(prefix + "QUOTA_RPS", "0")),
+    )
+
+
+faults = {"jsearch": _faults_from_env("jsearch", 0.3), "gemini": _faults_from_env("gemini", 0.8)}
+stats = Counter()
+_fault_rng = random.Random(SEED)
+_quota_windows = {}  # upstream -> (second, requests in that second)
+
+ERROR_BODIES = {
+    ("jsearch", 429): {"message": "You have exceeded the rate limit per second for your plan, BASIC, by the API provider"},
+    ("jsearch", 503): {"message": "Service Unavailable"},
+    ("gemini", 429): {"error": {"code": 429, "message": "Resource has been exhausted (e.g. check quota).",
+                                "status": "RESOURCE_EXHAUSTED"}},
+    ("gemini", 503): {"error": {"code": 503, "message": "The model is overloaded. Please try again later.",
+                                "status": "UNAVAILABLE"}},
+}
 
 app = FastAPI()
 
@@ -17,6 +103,82 @@ mock_jobs = [
     {"title": "AI Intern - Mumbai", "company": "FutureAI", "location": "Mumbai"}
 ]
 
+EMPLOYERS = ["TechCorp", "AI Innovators", "FutureAI", "Nimbus Labs", "Quantify", "BlueOrbit", "Kite Systems",
+             "Lumen Health", "Paperplane", "Zenith Finance"]
+SENIORITY = ["", "Junior ", "Senior ", "Lead ", "Associate "]
+
+
+def _rng(*parts) -> random.Random:
+    return random.Random(hashlib.sha256("|".join(parts).encode()).hexdigest())
+
+
+def _fixture_path(upstream: str, request_key: dict) -> Path:
+    digest = hashlib.sha256(json.dumps(request_key, sort_keys=True).encode()).hexdigest()[:24]
+    return FIXTURES_DIR / upstream / f"{digest}.json"
+
+
+def _injected_fault(upstream: str) -> Optional[JSONResponse]:
+    config = faults[upstream]
+    status = None
+    if config.quota_rps > 0:
+        second = int(time.monotonic())
+        window, count = _quota_windows.get(upstream, (second, 0))
+        count = count + 1 if window == second else 1
+        _quota_windows[upstream] = (second, count)
+        if count > config.quota_rps:
+            status = 429
+    draw = _fault_rng.random()
+    if status is None and draw < config.rate_limit_rate:
+        status = 429
+    elif status is None and draw < config.rate_limit_rate + config.error_rate:
+        status = 503
+    if status is None:
+        return None
+    stats[f"{upstream}:{status}"] += 1
+    headers = {"Retry-After": "1"} if status == 429 else None
+    return JSONResponse(status_code=status, content=ERROR_BODIES[(upstream, status)], headers=headers)
+
+
+async def _simulate_latency(upstream: str):
+    base = faults[upstream].latency
+    if base > 0:
+        await asyncio.sleep(base * (1 + random.uniform(-JITTER, JITTER)))
+
+
+async def _record(upstream: str, request: Request, path: str, request_key: dict, **kwargs) -> JSONResponse:
+    headers = {name: value for name, value in request.headers.items() if name.lower() in FORWARDED_HEADERS}
+    async with httpx.AsyncClient(base_url=RECORD_TARGETS[upstream], timeout=60) as client:
+        response = await client.request(request.method, path, headers=headers, **kwargs)
+    body = response.json()
+    if response.status_code == 200:
+        fixture = _fixture_path(upstream, request_key)
+        fixture.parent.mkdir(parents=True, exist_ok=True)
+        fixture.write_text(json.dumps({"request": request_key, "response": body}, indent=2))
+        stats[f"{upstream}:recorded"] += 1
+    return JSONResponse(status_code=response.status_code, content=body)
+
+
+async def _respond(upstream: str, request: Request, path: str, request_key: dict, synthesize, **record_kwargs):
+    stats[f"{upstream}:requests"] += 1
+    fault = _injected_fault(upstream)
+    await _simulate_latency(upstream)
+    if fault is not None:
+        return fault
+
+    if MODE == "record":
+        return await _record(upstream, request, path, request_key, **record_kwargs)
+    if MODE == "replay":
+        fixture = _fixture_path(upstream, request_key)
+        if fixture.exists():
+            stats[f"{upstream}:replayed"] += 1
+            return json.loads(fixture.read_text())["response"]
+        stats[f"{upstream}:replay_miss"] += 1
+        if REPLAY_STRICT:
+            raise HTTPException(status_code=404, detail=f"No {upstream} fixture for {request_key}")
+    stats[f"{upstream}:synthetic"] += 1
+    return synthesize()
+
+
 @app.get("/jobs")
 def get_jobs(role: str = "", location: str = ""):
     filtered = [
@@ -24,3 +186,94 @@ def get_jobs(role: str = "", location: str = ""):
         if (role.lower() in job["title"].lower()) and (location.lower() in job["location"].lower())
     ]
     return {"jobs": filtered or mock_jobs}
+
+
+def make_jsearch_jobs(query: str, page: int) -> List[dict]:
+    title, _, location = query.partition(" in ")
+    title, location = title.strip().title() or "Developer", location.strip().title() or "India"
+    rng = _rng(query.lower(), str(page))
+    jobs = []
+    for index in range(JOBS_PER_PAGE):
+        employer = rng.choice(EMPLOYERS)
+        job_id = hashlib.md5(f"{query}|{page}|{index}".encode()).hexdigest()[:16]
+        jobs.append({
+            "job_id": job_id,
+            "employer_name": employer,
+            "employer_logo": None,
+            "employer_website": f"https://www.{employer.lower().replace(' ', '')}.com",
+            "job_employment_type": rng.choice(["FULLTIME", "PARTTIME", "CONTRACTOR", "INTERN"]),
+            "job_title": f"{rng.choice(SENIORITY)}{title}",
+            "job_apply_link": f"https://jobs.example.com/{job_id}",
+            "job_description": f"{employer} is hiring a {title} in {location}. " * 8,
+            "job_city": location,
+            "job_country": "IN",
+            "job_posted_at_datetime_utc": f"2025-01-{rng.randint(1, 28):02d}T09:00:00.000Z",
+        })
+    return jobs
+
+
+@app.get("/search")
+async def jsearch_search(request: Request, query: str, page: int = 1, num_pages: int = 1):
+    request_key = {"query": query.strip().lower(), "page": page, "num_pages": num_pages}
+
+    def synthesize():
+        return {
+            "status": "OK",
+            "request_id": hashlib.md5(query.encode()).hexdigest(),
+            "parameters": {"query": query, "page": page, "num_pages": num_pages},
+            "data": [job for p in range(page, page + num_pages) for job in make_jsearch_jobs(query, p)],
+        }
+
+    return await _respond("jsearch", request, "/search", request_key, synthesize, params=dict(request.query_params))
+
+
+@app.post("/v1beta/models/{model}:generateContent")
+async def gemini_generate_content(model: str, request: Request):
+    body = await request.json()
+    request_key = {"model": model, "contents": body.get("contents", [])}
+
+    def synthesize():
+        last_text = ""
+        for content in body.get("contents", []):
+            for part in content.get("parts", []):
+                last_text = part.get("text", last_text)
+        reply = (
+            f"Here are a few practical next steps for \"{last_text[:80]}\": update your resume with measurable "
+            "results, practice two mock interviews this week, and reach out to one mentor in your field."
+        )
+        return {
+            "candidates": [{"content": {"role": "model", "parts": [{"text": reply}]}, "finishReason": "STOP", "index": 0}],
+            "usageMetadata": {"promptTokenCount": len(str(body)) // 4, "candidatesTokenCount": len(reply) // 4},
+            "modelVersion": model,
+        }
+
+    path = f"/v1beta/models/{model}:generateContent"
+    return await _respond("gemini", request, path, request_key, synthesize, json=body)
+
+
+@app.get("/_emulator/config")
+def get_emulator_config():
+    return {"mode": MODE, "fixtures_dir": str(FIXTURES_DIR), "faults": {name: f.model_dump() for name, f in faults.items()}}
+
+
+@app.post("/_emulator/config")
+def update_emulator_config(updates: dict):
+    for upstream, values in updates.items():
+        if upstream not in faults:
+            raise HTTPException(status_code=400, detail=f"Unknown upstream {upstream!r}")
+        faults[upstream] = UpstreamFaults(**{**faults[upstream].model_dump(), **values})
+    return get_emulator_config()
+
+
+@app.get("/_emulator/stats")
+def get_emulator_stats():
+    return dict(stats)
+
+
+@app.post("/_emulator/reset")
+def reset_emulator():
+    global _fault_rng
+    stats.clear()
+    _quota_windows.clear()
+    _fault_rng = random.Random(SEED)
+    return {"success": True}
@@ -4,6 +4,8 @@ from datetime import datetime
 import os
 from dotenv import load_dotenv
 
+from metrics import timed
+
 # Load environment variables
 load_dotenv()
 
@@ -19,6 +21,7 @@ chat_collection = db["chat_sessions"]
 chat_collection.create_index([("user_id", 1), ("timestamp", -1)])
 chat_collection.create_index("timestamp", expireAfterSeconds=2592000)  # 30 days
 chat_collection.create_index("session_id")  # Index for efficient session grouping
+chat_collection.create_index([("intent", 1), ("timestamp", -1)])  # Popular job search aggregation
 
 # Store chat in MongoDB with separate session_id
 # mongodb_client.py
@@ -26,6 +29,7 @@ chat_collection.create_index("session_id")  # Index for efficient session groupi
 # ... (imports and client setup) ...
 
 # Store chat in MongoDB with a more flexible schema
+@timed("mongodb")
 def save_chat_to_mongodb(session_id: str, user_id: str, role: str, message: str, intent: str = None,
                          entities: dict = None):
     """
@@ -54,6 +58,31 @@ def save_chat_to_mongodb(session_id: str, user_id: str, role: str, message: str,
         raise Exception("MongoDB insert_one failed to return an inserted_id.")
 
 
+# Most frequent (job_title, location) pairs searched since `since`
+def get_top_job_searches(since: datetime, limit: int = 20):
+    pipeline = [
+        {"$match": {
+            "intent": "job_search",
+            "role": "user",
+            "timestamp": {"$gte": since},
+            "entities.job_title": {"$exists": True},
+        }},
+        {"$group": {
+            "_id": {
+                "job_title": {"$toLower": {"$trim": {"input": "$entities.job_title"}}},
+                "location": {"$toLower": {"$trim": {"input": "$entities.location"}}},
+            },
+            "count": {"$sum": 1},
+        }},
+        {"$sort": {"count": -1}},
+        {"$limit": limit},
+    ]
+    return [
+        {"job_title": row["_id"]["job_title"], "location": row["_id"]["location"], "count": row["count"]}
+        for row in chat_collection.aggregate(pipeline)
+    ]
+
+
 # Retrieve chat history for a user (grouped by session_id optionally)
 def get_user_chat_history(user_id: str):
     return list(chat_collection.find({"user_id": user_id}).sort("timestamp", -1))
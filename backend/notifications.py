@@ -0,0 +1,291 @@
+# notifications.py
+"""
+Batched dispatcher for interview feedback emails.
+
+`render_feedback_email` escapes the per-recipient values once and
+`FeedbackEmailDispatcher.enqueue` RPUSHes them onto a Redis list. `FeedbackEmailDispatcher.flush` drains that list in
+batches, sending each batch as a single SendGrid request with one
+personalization per recipient against a shared HTML template.
+
+A batch is moved atomically to a processing list before it is sent and only
+removed from there once every email in it was delivered, dead-lettered or
+re-queued, so a crashed flush loses nothing: the next flush puts the
+leftovers back on the queue. A request SendGrid rejects outright is split in
+halves until the offending emails are isolated, and only those go to the
+dead-letter list. On 429/5xx, auth errors or transport errors the unsent
+emails are re-queued and `FlushInterrupted` is raised; the Celery task backs
+off with `retry(countdown=...)` rather than sleeping in the worker.
+
+The sink that performs the actual send is pluggable: `SendGridSink` talks to
+the API, `LocalSink` records requests in memory for offline throughput tests.
+"""
+import html
+import json
+import logging
+import os
+import random
+import re
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+SENDER_EMAIL = os.getenv("SENDER_EMAIL")
+FEEDBACK_QUEUE_KEY = "notifications:feedback_emails"
+FEEDBACK_FAILED_KEY = "notifications:feedback_emails:failed"
+FEEDBACK_PROCESSING_KEY = "notifications:feedback_emails:processing"
+FEEDBACK_FLUSH_LOCK_KEY = "notifications:feedback_emails:flush_lock"
+FLUSH_LOCK_TTL = int(os.getenv("EMAIL_FLUSH_LOCK_TTL", "300"))
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "500"))  # SendGrid allows up to 1000 personalizations
+EMAIL_MAX_ATTEMPTS = 5
+SUBSTITUTION_LIMIT_BYTES = 10000  # SendGrid limit per personalization
+
+FEEDBACK_SUBJECT = "Your Asha AI Mock Interview Feedback is Ready!"
+
+# SendGrid replaces -feedback- and -recording_url- per personalization
+FEEDBACK_TEMPLATE = """
+<h3>Hello!</h3>
+<p>Thank you for completing your mock interview with Asha. Here is your feedback and a link to the recording.</p>
+<h4>AI-Generated Feedback:</h4>
+<div style="background-color:#f4f4f4; border-left: 5px solid #ccc; padding: 15px;">
+    <p>-feedback-</p>
+</div>
+<h4>Call Recording:</h4>
+<p>You can listen to your interview here: <a href="-recording_url-">-recording_url-</a></p>
+<br>
+<p>Keep practicing, you're on the right track!</p>
+<p>Best regards,</p>
+<p>The Asha AI Team</p>
+"""
+_TEMPLATE_TAGS = re.compile(r"-(feedback|recording_url)-")
+
+
+# KEYS[1] queue, KEYS[2] processing list; ARGV[1] batch size.
+# Moves up to ARGV[1] emails from the head of the queue and returns them.
+CLAIM_BATCH_LUA = """
+local items = redis.call('LRANGE', KEYS[1], 0, tonumber(ARGV[1]) - 1)
+if #items > 0 then
+  redis.call('LTRIM', KEYS[1], #items, -1)
+  redis.call('RPUSH', KEYS[2], unpack(items))
+end
+return items
+"""
+
+
+class DeliveryError(Exception):
+    """
+    A send failed. `retryable` is True for 429 and 5xx responses, and for
+    401/403, which a configuration fix cures for every recipient alike.
+    """
+
+    def __init__(self, status_code: int, message: str = ""):
+        super().__init__(f"{status_code} {message}".strip())
+        self.status_code = status_code
+        self.retryable = status_code in (401, 403, 429) or status_code >= 500
+
+
+class FlushInterrupted(Exception):
+    """A flush stopped early; its unsent emails are back on the queue."""
+
+
+def render_feedback_email(user_email: str, recording_url: str, feedback: str) -> dict:
+    """Escapes and formats the per-recipient values for the shared template."""
+    return {
+        "to": user_email,
+        "substitutions": {
+            "-feedback-": html.escape(feedback).replace("\n", "<br>"),
+            "-recording_url-": html.escape(recording_url, quote=True),
+        },
+    }
+
+
+def render_html(substitutions: dict) -> str:
+    return _TEMPLATE_TAGS.sub(lambda m: substitutions[m.group(0)], FEEDBACK_TEMPLATE)
+
+
+def _substitution_size(email: dict) -> int:
+    return sum(len(k) + len(v.encode("utf-8")) for k, v in email["substitutions"].items())
+
+
+def group_emails(emails: list) -> list:
+    """
+    Splits rendered emails into groups that each become one SendGrid request.
+    Emails whose substitutions exceed SendGrid's per-personalization limit
+    are sent on their own, fully rendered.
+    """
+    batched, groups = [], []
+    for email in emails:
+        if _substitution_size(email) > SUBSTITUTION_LIMIT_BYTES:
+            groups.append([email])
+        else:
+            batched.append(email)
+    groups[:0] = [batched[i:i + EMAIL_BATCH_SIZE] for i in range(0, len(batched), EMAIL_BATCH_SIZE)]
+    return groups
+
+
+def build_request(group: list, sender: str = None) -> dict:
+    """Builds a SendGrid v3 mail/send body for a group from `group_emails`."""
+    body = {"from": {"email": sender or SENDER_EMAIL}, "subject": FEEDBACK_SUBJECT}
+    if len(group) == 1 and _substitution_size(group[0]) > SUBSTITUTION_LIMIT_BYTES:
+        body["content"] = [{"type": "text/html", "value": render_html(group[0]["substitutions"])}]
+        body["personalizations"] = [{"to": [{"email": group[0]["to"]}]}]
+    else:
+        body["content"] = [{"type": "text/html", "value": FEEDBACK_TEMPLATE}]
+        body["personalizations"] = [
+            {"to": [{"email": email["to"]}], "substitutions": email["substitutions"]} for email in group
+        ]
+    return body
+
+
+class SendGridSink:
+    """Sends request bodies through one SendGrid client shared by the process."""
+
+    def __init__(self, api_key: str = None):
+        from sendgrid import SendGridAPIClient
+        self.client = SendGridAPIClient(api_key or os.getenv("SENDGRID_API_KEY"))
+
+    def send(self, body: dict) -> int:
+        from python_http_client.exceptions import HTTPError
+        try:
+            response = self.client.client.mail.send.post(request_body=body)
+        except HTTPError as e:
+            raise DeliveryError(e.status_code, str(e.reason)) from e
+        return response.status_code
+
+
+class LocalSink:
+    """
+    In-memory stand-in for SendGrid. Records every request body and can
+    simulate per-request latency and a rate of 429/503 responses.
+    """
+
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0, seed: int = None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = []
+        self._random = random.Random(seed)
+
+    def send(self, body: dict) -> int:
+        if self.latency:
+            time.sleep(self.latency)
+        if self.error_rate and self._random.random() < self.error_rate:
+            raise DeliveryError(self._random.choice([429, 503]), "simulated")
+        self.requests.append(body)
+        return 202
+
+    @property
+    def delivered(self) -> int:
+        return sum(len(body["personalizations"]) for body in self.requests)
+
+
+class FeedbackEmailDispatcher:
+    def __init__(self, sink, redis_conn=None, base_delay: float = 1.0, max_delay: float = 60.0):
+        self.sink = sink
+        self.redis = redis_conn
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def enqueue(self, email: dict) -> int:
+        """Queues a rendered email and returns the queue length."""
+        return self.redis.rpush(FEEDBACK_QUEUE_KEY, json.dumps(email))
+
+    def send_with_retry(self, body: dict) -> int:
+        # Only for direct callers (benchmarks); the Celery task uses flush()
+        for attempt in range(EMAIL_MAX_ATTEMPTS):
+            try:
+                return self.sink.send(body)
+            except DeliveryError as e:
+                if not e.retryable or attempt == EMAIL_MAX_ATTEMPTS - 1:
+                    raise
+                delay = min(self.max_delay, self.base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+                logger.warning(f"Email batch got {e.status_code}, retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    def send(self, emails: list) -> int:
+        """Sends rendered emails in batches. Returns the number delivered."""
+        delivered = 0
+        for group in group_emails(emails):
+            self.send_with_retry(build_request(group))
+            delivered += len(group)
+        return delivered
+
+    def _send_isolating_rejects(self, group: list, done: list, rejected: list):
+        """
+        Sends a group, halving it whenever SendGrid rejects the request so a
+        bad address only sinks itself. Appends every finished email to `done`
+        and the rejected ones also to `rejected`, as it goes; retryable errors
+        and transport exceptions propagate.
+        """
+        try:
+            self.sink.send(build_request(group))
+            done.extend(group)
+            return
+        except DeliveryError as e:
+            if e.retryable:
+                raise
+            if len(group) == 1:
+                logger.error(f"SendGrid rejected the feedback email to {group[0]['to']}: {e}")
+                done.extend(group)
+                rejected.extend(group)
+                return
+        middle = len(group) // 2
+        self._send_isolating_rejects(group[:middle], done, rejected)
+        self._send_isolating_rejects(group[middle:], done, rejected)
+
+    def _acknowledge(self, rejected: list = (), requeue: list = ()):
+        """Dead-letters and re-queues in one transaction with clearing the processing list."""
+        pipe = self.redis.pipeline()
+        if rejected:
+            pipe.rpush(FEEDBACK_FAILED_KEY, *[json.dumps(email) for email in rejected])
+        if requeue:
+            pipe.lpush(FEEDBACK_QUEUE_KEY, *[json.dumps(email) for email in reversed(requeue)])
+        pipe.delete(FEEDBACK_PROCESSING_KEY)
+        pipe.execute()
+
+    def _recover(self):
+        """Puts back the batch of a flush that died mid-send (at-least-once)."""
+        left = self.redis.lrange(FEEDBACK_PROCESSING_KEY, 0, -1)
+        if left:
+            logger.warning(f"Re-queueing {len(left)} feedback emails left by an interrupted flush")
+            self._acknowledge(requeue=[json.loads(item) for item in left])
+
+    def flush(self, max_batches: int = 10) -> int:
+        """
+        Drains up to `max_batches` batches from the Redis queue; one flush runs
+        at a time. Raises FlushInterrupted (unsent emails re-queued) when a
+        request fails with a retryable status or a transport error.
+        """
+        token = uuid.uuid4().hex
+        if not self.redis.set(FEEDBACK_FLUSH_LOCK_KEY, token, nx=True, ex=FLUSH_LOCK_TTL):
+            logger.info("Another feedback email flush is running")
+            return 0
+        delivered = 0
+        try:
+            self._recover()
+            claim_batch = self.redis.register_script(CLAIM_BATCH_LUA)
+            for _ in range(max_batches):
+                raw = claim_batch(keys=[FEEDBACK_QUEUE_KEY, FEEDBACK_PROCESSING_KEY], args=[EMAIL_BATCH_SIZE])
+                if not raw:
+                    break
+                batch = [json.loads(item) for item in raw]
+                done, rejected = [], []
+                try:
+                    for group in group_emails(batch):
+                        self._send_isolating_rejects(group, done, rejected)
+                except Exception as e:
+                    finished = {id(email) for email in done}
+                    pending = [email for email in batch if id(email) not in finished]
+                    self._acknowledge(rejected, requeue=pending)
+                    delivered += len(done) - len(rejected)
+                    logger.error(f"Failed to send {len(pending)} feedback emails, re-queued: {e}")
+                    raise FlushInterrupted(str(e)) from e
+                self._acknowledge(rejected)
+                if rejected:
+                    logger.error(f"Moved {len(rejected)} rejected feedback emails to {FEEDBACK_FAILED_KEY}")
+                delivered += len(batch) - len(rejected)
+        finally:
+            if delivered:
+                logger.info(f"Sent {delivered} feedback emails")
+            if self.redis.get(FEEDBACK_FLUSH_LOCK_KEY) == token:
+                self.redis.delete(FEEDBACK_FLUSH_LOCK_KEY)
+        return delivered
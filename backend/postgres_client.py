@@ -1,8 +1,11 @@
 import os
-from sqlalchemy import create_engine
+from datetime import datetime
+from sqlalchemy import create_engine, delete, insert
 from sqlalchemy.orm import sessionmaker, Session
 from dotenv import load_dotenv
-from postgres_models import Base, UserProfile, Interview
+from metrics import instrument_engine
+from postgres_models import Base, UserProfile, Interview, InterviewTurn
+from profile_cache import profile_cache
 
 load_dotenv()
 
@@ -17,9 +20,42 @@ elif url.startswith("postgresql://"):
     url = url.replace("postgresql://", "postgresql+psycopg://", 1)
 
 engine = create_engine(url, pool_pre_ping=True)
+instrument_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base.metadata.create_all(bind=engine)
+# Indexes added to existing tables are built by schema_migrations.py before a deploy
 
 def get_user_name_from_db(db: Session, user_id: str) -> str:
-    user = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
-    return user.name if user and user.name else None
\ No newline at end of file
+    user = profile_cache.get_by_user_id(db, user_id)
+    return user["name"] if user and user["name"] else None
+
+def get_user_email_for_interview(db: Session, interview_id: int) -> str:
+    row = (
+        db.query(UserProfile.email)
+        .join(Interview, Interview.user_id == UserProfile.user_id)
+        .filter(Interview.id == interview_id)
+        .first()
+    )
+    return row.email if row and row.email else None
+
+
+def save_interview_transcript(db: Session, interview_id: int, turns: list) -> int:
+    """
+    Replaces the stored transcript of an interview with `turns` in a single
+    multi-row INSERT. Safe to call again if the analysis task is retried.
+    """
+    rows = [
+        {
+            "interview_id": interview_id,
+            "seq": seq,
+            "role": turn["role"],
+            "text": turn["text"],
+            "spoken_at": datetime.utcfromtimestamp(turn["ts"]) if turn.get("ts") else None,
+        }
+        for seq, turn in enumerate(turns)
+    ]
+    db.execute(delete(InterviewTurn).where(InterviewTurn.interview_id == interview_id))
+    if rows:
+        db.execute(insert(InterviewTurn), rows)
+    db.commit()
+    return len(rows)
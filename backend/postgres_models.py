@@ -1,10 +1,11 @@
 # postgres_models.py
 
-from sqlalchemy import Column, Integer, String, Text ,JSON ,DateTime ,ForeignKey
+from sqlalchemy import Column, Integer, String, Text ,JSON ,DateTime ,ForeignKey, UniqueConstraint, Index
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import deferred, relationship
 
 Base = declarative_base()
 
@@ -30,10 +31,13 @@ class MentorshipRequest(Base):
 # 🔽 ADD THIS for Resume Builder
 class Resume(Base):
     __tablename__ = "resumes"
+    # Serves the keyset-paginated listing (WHERE user_id = ? AND id < ? ORDER BY id DESC)
+    __table_args__ = (Index("ix_resumes_user_id_id", "user_id", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(String, index=True)  # Could be chat session ID or user account ID
-    resume_data = Column(JSON)  # Stores all resume data in JSON format
+    # Stores all resume data in JSON format (JSONB on Postgres, see resume_search); only loaded when accessed
+    resume_data = deferred(Column(JSON().with_variant(JSONB(), "postgresql")))
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     download_url = Column(String, nullable=True)
@@ -51,6 +55,8 @@ class SavedJob(Base):
     apply_link = Column(String, nullable=True)
     saved_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (Index("ix_saved_jobs_user_id_saved_at", "user_id", "saved_at"),)
+
 class Event(Base):
     __tablename__ = "events"
     id = Column(Integer, primary_key=True, index=True)
@@ -66,13 +72,29 @@ class CareerTip(Base):
 
 class Interview(Base):
     __tablename__ = "interviews"
+    # Lets the dispatcher find due interviews without scanning the table
+    __table_args__ = (Index("ix_interviews_status_scheduled_time", "status", "scheduled_time"),)
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(String, index=True)  # Changed to String to match UserProfile.user_id
     phone_number = Column(String, nullable=False)  # Add this field
     scheduled_time = Column(DateTime, nullable=False)  # Add this field
-    status = Column(String, default="scheduled")  # scheduled, completed, cancelled
+    status = Column(String, default="scheduled")  # scheduled, queued, calling, failed, missed, completed, cancelled
+    role = Column(String, nullable=False, default="general", server_default="general")  # interview_engine question bank
     recording_url = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
-    # Note: Remove the relationship for now since we're using string user_id
\ No newline at end of file
+    # Note: Remove the relationship for now since we're using string user_id
+
+
+class InterviewTurn(Base):
+    """One question or answer from a completed mock interview, copied from Redis."""
+    __tablename__ = "interview_turns"
+    __table_args__ = (UniqueConstraint("interview_id", "seq", name="uq_interview_turns_interview_seq"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    interview_id = Column(Integer, ForeignKey("interviews.id", ondelete="CASCADE"), nullable=False, index=True)
+    seq = Column(Integer, nullable=False)
+    role = Column(String, nullable=False)  # user, model
+    text = Column(Text, nullable=False)
+    spoken_at = Column(DateTime, nullable=True)
@@ -0,0 +1,162 @@
+# profile_cache.py
+"""
+Read-through cache of `user_profiles` rows, keyed by both user_id and email.
+
+Lookups check a per-process LRU (`LocalTTLCache`, PROFILE_LOCAL_TTL seconds),
+then Redis (`profile:id:{user_id}` / `profile:email:{email}`, PROFILE_TTL
+seconds) and only then Postgres. Both tiers hold the profile as a JSON
+string, so callers get a fresh dict rather than an ORM object from another
+session. Unknown ids and emails are cached as a miss marker for NEGATIVE_TTL
+seconds in Redis only (never in the local tier), and `put` overwrites that marker, so a user who signs up
+right after a failed login is found by every worker. `signup_user` and
+`google_callback` write new profiles through with `put`. `put` and
+`invalidate` also tell the other workers to drop their local copies through
+cache_invalidation (cache name "profiles"); filling the cache after a
+Postgres read changes nothing, so it broadcasts nothing.
+
+Each lookup counts towards `nexpath_profile_cache_lookups_total{tier,result}`
+on /metrics.
+"""
+import json
+import logging
+import os
+import threading
+
+import redis
+from sqlalchemy.orm import Session
+
+from cache_invalidation import cache_invalidator
+from metrics import Counter
+from postgres_models import UserProfile
+from redis_client import LocalTTLCache, redis_client
+
+logger = logging.getLogger(__name__)
+
+PROFILE_TTL = int(os.getenv("PROFILE_CACHE_TTL", str(24 * 3600)))
+PROFILE_LOCAL_TTL = int(os.getenv("PROFILE_LOCAL_TTL", "300"))
+PROFILE_LOCAL_MAX_ITEMS = int(os.getenv("PROFILE_LOCAL_MAX_ITEMS", "10000"))
+NEGATIVE_TTL = int(os.getenv("PROFILE_NEGATIVE_TTL", "60"))
+MISSING = "__missing__"
+
+LOOKUPS = Counter(
+    "nexpath_profile_cache_lookups_total", "User profile lookups by the tier that answered them.", ("tier", "result")
+)
+
+
+def profile_to_dict(user: UserProfile) -> dict:
+    return {"user_id": user.user_id, "name": user.name, "email": user.email, "contact": user.contact}
+
+
+class ProfileCache:
+    def __init__(self, redis_conn=None, local: LocalTTLCache = None, invalidator=None):
+        self.redis = redis_conn
+        self.invalidator = invalidator
+        self.local = local or LocalTTLCache(maxsize=PROFILE_LOCAL_MAX_ITEMS)
+        # Sync endpoints share the local tier across threadpool threads
+        self._local_lock = threading.Lock()
+
+    @staticmethod
+    def _key(field: str, value: str) -> str:
+        return f"profile:{'id' if field == 'user_id' else 'email'}:{value}"
+
+    def _redis_get(self, key: str):
+        if self.redis is None:
+            return None
+        try:
+            return self.redis.get(key)
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Profile cache read failed for {key}: {e}")
+            return None
+
+    def _redis_set(self, mapping: dict, ttl: int):
+        if self.redis is None:
+            return
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for key, value in mapping.items():
+                pipe.setex(key, ttl, value)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Profile cache write failed: {e}")
+
+    def _store_local(self, profile: dict, payload: str):
+        with self._local_lock:
+            for field in ("user_id", "email"):
+                if profile.get(field):
+                    self.local.set(self._key(field, profile[field]), payload, ex=PROFILE_LOCAL_TTL)
+
+    def get(self, db: Session, field: str, value: str):
+        """Returns the profile dict whose `field` ("user_id" or "email") equals `value`, or None."""
+        if not value:
+            return None
+        key = self._key(field, value)
+
+        with self._local_lock:
+            cached = self.local.get(key)
+        if cached is not None:
+            LOOKUPS.inc(tier="local", result="hit")
+            return json.loads(cached)
+
+        cached = self._redis_get(key)
+        if cached == MISSING:
+            LOOKUPS.inc(tier="redis", result="negative")
+            return None
+        if cached is not None:
+            LOOKUPS.inc(tier="redis", result="hit")
+            profile = json.loads(cached)
+            self._store_local(profile, cached)
+            return profile
+
+        user = db.query(UserProfile).filter(getattr(UserProfile, field) == value).first()
+        if user is None:
+            LOOKUPS.inc(tier="postgres", result="negative")
+            self._redis_set({key: MISSING}, NEGATIVE_TTL)
+            return None
+        LOOKUPS.inc(tier="postgres", result="hit")
+        profile = profile_to_dict(user)
+        self._fill(profile)
+        return profile
+
+    def get_by_user_id(self, db: Session, user_id: str):
+        return self.get(db, "user_id", user_id)
+
+    def get_by_email(self, db: Session, email: str):
+        return self.get(db, "email", email)
+
+    def _publish(self, keys: list):
+        if self.invalidator is not None and keys:
+            self.invalidator.publish("profiles", *keys)
+
+    def drop_local(self, keys: list):
+        """Invalidation handler: forgets `keys` (everything when empty) in this process only."""
+        with self._local_lock:
+            if keys:
+                self.local.delete(*keys)
+            else:
+                self.local = LocalTTLCache(maxsize=self.local.maxsize)
+
+    def _fill(self, profile: dict) -> list:
+        """Caches a profile in both tiers, replacing miss markers; returns the keys written."""
+        payload = json.dumps(profile)
+        mapping = {self._key(field, profile[field]): payload for field in ("user_id", "email") if profile.get(field)}
+        self._store_local(profile, payload)
+        self._redis_set(mapping, PROFILE_TTL)
+        return list(mapping)
+
+    def put(self, profile: dict):
+        """Write-through after a profile is created or changed."""
+        self._publish(self._fill(profile))
+
+    def invalidate(self, profile: dict):
+        keys = [self._key(field, profile[field]) for field in ("user_id", "email") if profile.get(field)]
+        self.drop_local(keys)
+        if self.redis is not None and keys:
+            try:
+                self.redis.delete(*keys)
+            except redis.RedisError as e:
+                logger.warning(f"⚠️ Profile cache invalidation failed: {e}")
+        self._publish(keys)
+
+
+profile_cache = ProfileCache(redis_client, invalidator=cache_invalidator)
+cache_invalidator.register("profiles", profile_cache.drop_local)
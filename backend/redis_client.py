@@ -1,8 +1,13 @@
 import redis
+import redis.asyncio as aioredis
 import os
+import time
+from collections import OrderedDict
 from dotenv import load_dotenv
 import logging
 
+from metrics import stage
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
@@ -43,6 +48,207 @@ except Exception as e:
     redis_client = None
 
 
+# --- Async client used by the FastAPI handlers ---
+
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "30"))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "2"))
+LOCAL_CACHE_MAX_ITEMS = int(os.getenv("LOCAL_CACHE_MAX_ITEMS", "2048"))
+
+
+class LocalTTLCache:
+    """
+    Bounded in-process stand-in for the few Redis commands the API uses.
+    Entries expire like Redis keys and the least recently used key is evicted
+    once `maxsize` is reached.
+    """
+
+    def __init__(self, maxsize: int = LOCAL_CACHE_MAX_ITEMS):
+        self.maxsize = maxsize
+        self._data = OrderedDict()  # key -> (expires_at or None, value)
+
+    def _entry(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return entry
+
+    def _store(self, key, value, ex=None):
+        expires_at = time.monotonic() + ex if ex else None
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def get(self, key):
+        entry = self._entry(key)
+        if entry is None or not isinstance(entry[1], str):
+            return None
+        return entry[1]
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and self._entry(key) is not None:
+            return None
+        self._store(key, str(value), ex)
+        return True
+
+    def setex(self, key, seconds, value):
+        return self.set(key, value, ex=seconds)
+
+    def delete(self, *keys):
+        removed = 0
+        for key in keys:
+            if self._data.pop(key, None) is not None:
+                removed += 1
+        return removed
+
+    def expire(self, key, seconds):
+        entry = self._entry(key)
+        if entry is None:
+            return False
+        self._data[key] = (time.monotonic() + seconds, entry[1])
+        return True
+
+    def rpush(self, key, *values):
+        entry = self._entry(key)
+        if entry is not None and isinstance(entry[1], list):
+            entry[1].extend(str(v) for v in values)
+            return len(entry[1])
+        self._store(key, [str(v) for v in values])
+        return len(values)
+
+    def incr(self, key, amount=1):
+        entry = self._entry(key)
+        value = int(entry[1]) + amount if entry is not None else amount
+        self._data[key] = (entry[0] if entry is not None else None, str(value))
+        self._data.move_to_end(key)
+        return value
+
+    def mget(self, keys):
+        return [self.get(key) for key in keys]
+
+    def lrange(self, key, start, end):
+        entry = self._entry(key)
+        if entry is None or not isinstance(entry[1], list):
+            return []
+        items = entry[1]
+        end = len(items) if end == -1 else end + 1
+        return items[start:end]
+
+    def __len__(self):
+        return len(self._data)
+
+
+class ResilientRedis:
+    """
+    `redis.asyncio` client with a bounded connection pool that degrades to a
+    LocalTTLCache while Redis is unreachable and reconnects on its own.
+
+    Every command goes through `_run`: on a connection error the client marks
+    Redis as down for a backoff window (doubling up to `max_backoff`) and
+    serves the command from the local cache. The first command after the
+    window retries Redis; a success restores normal operation.
+    """
+
+    def __init__(self, url: str, max_backoff: float = 30.0):
+        pool_kwargs = {
+            "decode_responses": True,
+            "max_connections": REDIS_MAX_CONNECTIONS,
+            "health_check_interval": REDIS_HEALTH_CHECK_INTERVAL,
+            "socket_connect_timeout": 5,
+            "socket_timeout": REDIS_SOCKET_TIMEOUT,
+            "socket_keepalive": True,
+            "retry_on_timeout": False,
+        }
+        if url.startswith("rediss://"):
+            pool_kwargs["ssl_cert_reqs"] = None  # Required for Render Redis
+
+        self.pool = aioredis.ConnectionPool.from_url(url, **pool_kwargs)
+        self.redis = aioredis.Redis(connection_pool=self.pool)
+        self.local = LocalTTLCache()
+        self.max_backoff = max_backoff
+        self._backoff = 1.0
+        self._down_until = 0.0
+        self.degraded = False
+
+    @property
+    def available(self) -> bool:
+        return not self.degraded
+
+    def _mark_down(self, error):
+        if not self.degraded:
+            logger.error(f"❌ Redis unavailable, serving from in-process cache: {error}")
+        else:
+            self._backoff = min(self._backoff * 2, self.max_backoff)
+        self.degraded = True
+        self._down_until = time.monotonic() + self._backoff
+
+    def _mark_up(self):
+        if self.degraded:
+            logger.info("✅ Reconnected to Redis!")
+        self.degraded = False
+        self._backoff = 1.0
+
+    async def _run(self, command: str, *args, **kwargs):
+        if self.degraded and time.monotonic() < self._down_until:
+            return getattr(self.local, command)(*args, **kwargs)
+        try:
+            with stage("redis"):
+                result = await getattr(self.redis, command)(*args, **kwargs)
+        except (redis.ConnectionError, redis.TimeoutError, OSError) as e:
+            self._mark_down(e)
+            return getattr(self.local, command)(*args, **kwargs)
+        self._mark_up()
+        return result
+
+    async def ping(self) -> bool:
+        try:
+            await self.redis.ping()
+        except (redis.ConnectionError, redis.TimeoutError, OSError) as e:
+            self._mark_down(e)
+            return False
+        self._mark_up()
+        return True
+
+    async def get(self, key):
+        return await self._run("get", key)
+
+    async def set(self, key, value, ex=None, nx=False):
+        return await self._run("set", key, value, ex=ex, nx=nx)
+
+    async def setex(self, key, seconds, value):
+        return await self._run("setex", key, seconds, value)
+
+    async def delete(self, *keys):
+        return await self._run("delete", *keys)
+
+    async def expire(self, key, seconds):
+        return await self._run("expire", key, seconds)
+
+    async def rpush(self, key, *values):
+        return await self._run("rpush", key, *values)
+
+    async def lrange(self, key, start, end):
+        return await self._run("lrange", key, start, end)
+
+    async def incr(self, key, amount=1):
+        return await self._run("incr", key, amount)
+
+    async def mget(self, keys):
+        return await self._run("mget", keys)
+
+    async def close(self):
+        await self.pool.disconnect()
+
+
+async_redis_client = ResilientRedis(REDIS_URL)
+
+
 # Store user conversation
 def store_user_conversation(sender_id, message):
     """
@@ -0,0 +1,200 @@
+# resume_search.py
+"""
+Indexed search over resumes by skill, location and graduation year.
+
+On Postgres `resumes.resume_data` is JSONB and the table carries two stored
+generated columns derived from it:
+
+  skills_normalized  text[]  resume_data->'skills', lower-cased, trimmed,
+                             whitespace collapsed, de-duplicated
+  location_terms     text[]  the comma-separated parts of the address and of
+                             every work_experience / education location
+
+Both arrays and `resume_data` itself (jsonb_path_ops, for @> containment)
+have GIN indexes, so a search is a bitmap AND of index scans instead of
+loading every resume into Python.
+
+`migrate_search_schema` creates all of this and is run by
+schema_migrations.py before a deploy, never at import: converting the
+column and adding the stored columns rewrite the table. Indexes are built
+CONCURRENTLY, and rows whose stored columns are out of date (after a change
+to the SQL functions) are rewritten in small batches. Until the migration
+has run, search raises SearchUnavailable. Search is Postgres-only; other
+databases (the SQLite used by the load test) keep working for everything else.
+
+Results carry no personal_info, download links or user ids, only what was
+matched on.
+"""
+import logging
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Text, literal_column, text, type_coerce
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.orm import Session
+
+from listings import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor, decode_cursor, paginate
+from postgres_models import Resume
+from schema_migrations import create_index_concurrently
+
+logger = logging.getLogger(__name__)
+
+SKILLS = literal_column("resumes.skills_normalized", ARRAY(Text))
+LOCATION_TERMS = literal_column("resumes.location_terms", ARRAY(Text))
+SEARCH_RESULT_COLUMNS = (
+    Resume.id, Resume.template_used, Resume.created_at, Resume.updated_at,
+    SKILLS.label("skills"), LOCATION_TERMS.label("locations"),
+)
+
+_LOCATION_SEPARATORS = re.compile(r"[,/|]")
+_WHITESPACE = re.compile(r"\s+")
+
+# Keep these in step with normalize_term / location_terms below
+SEARCH_SCHEMA_DDL = [
+    r"""
+    CREATE OR REPLACE FUNCTION resume_skills(data jsonb) RETURNS text[]
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+        SELECT coalesce(array_agg(DISTINCT skill ORDER BY skill), '{}')
+        FROM (
+            SELECT btrim(regexp_replace(lower(value), '\s+', ' ', 'g')) AS skill
+            FROM jsonb_array_elements_text(
+                CASE WHEN jsonb_typeof(data->'skills') = 'array' THEN data->'skills' ELSE '[]'::jsonb END
+            )
+        ) skills
+        WHERE skill <> ''
+    $$
+    """,
+    r"""
+    CREATE OR REPLACE FUNCTION resume_location_terms(data jsonb) RETURNS text[]
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+        SELECT coalesce(array_agg(DISTINCT term ORDER BY term), '{}')
+        FROM (
+            SELECT btrim(regexp_replace(lower(part), '\s+', ' ', 'g')) AS term
+            FROM (
+                SELECT data->'personal_info'->>'address' AS location
+                UNION ALL
+                SELECT jsonb_path_query(data, 'lax $.work_experience[*].location') #>> '{}'
+                UNION ALL
+                SELECT jsonb_path_query(data, 'lax $.education[*].location') #>> '{}'
+            ) locations,
+            regexp_split_to_table(location, '[,/|]') AS part
+            WHERE location IS NOT NULL
+        ) terms
+        WHERE term <> ''
+    $$
+    """,
+    """
+    ALTER TABLE resumes ADD COLUMN IF NOT EXISTS skills_normalized text[]
+        GENERATED ALWAYS AS (resume_skills(resume_data)) STORED
+    """,
+    """
+    ALTER TABLE resumes ADD COLUMN IF NOT EXISTS location_terms text[]
+        GENERATED ALWAYS AS (resume_location_terms(resume_data)) STORED
+    """,
+]
+SEARCH_INDEXES = {
+    "ix_resumes_resume_data_gin": "resumes USING gin (resume_data jsonb_path_ops)",
+    "ix_resumes_skills_normalized_gin": "resumes USING gin (skills_normalized)",
+    "ix_resumes_location_terms_gin": "resumes USING gin (location_terms)",
+}
+STALE_ROWS_FILTER = (
+    "skills_normalized IS DISTINCT FROM resume_skills(resume_data) "
+    "OR location_terms IS DISTINCT FROM resume_location_terms(resume_data)"
+)
+REFRESH_BATCH_SIZE = 1000
+
+
+class SearchUnavailable(Exception):
+    pass
+
+
+def migrate_search_schema(engine, batch_size: int = REFRESH_BATCH_SIZE):
+    """Migrates resumes.resume_data to JSONB and adds the search columns and indexes (Postgres only)."""
+    if engine.dialect.name != "postgresql":
+        logger.info("Resume search needs PostgreSQL; nothing to migrate")
+        return
+    # Autocommit: CREATE INDEX CONCURRENTLY can't run in a transaction, and
+    # each refresh batch should hold its row locks only briefly
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("SELECT pg_advisory_lock(hashtext('resume_search_schema'))"))
+        try:
+            data_type = conn.execute(text(
+                "SELECT data_type FROM information_schema.columns "
+                "WHERE table_schema = current_schema() AND table_name = 'resumes' AND column_name = 'resume_data'"
+            )).scalar()
+            if data_type == "json":
+                logger.info("🔧 Converting resumes.resume_data from json to jsonb (rewrites the table)")
+                conn.execute(text("ALTER TABLE resumes ALTER COLUMN resume_data TYPE jsonb USING resume_data::jsonb"))
+            for statement in SEARCH_SCHEMA_DDL:
+                conn.execute(text(statement))
+
+            refreshed, last_id = 0, 0
+            while True:
+                # Rewriting resume_data recomputes the generated columns
+                ids = conn.execute(text(
+                    f"SELECT id FROM resumes WHERE id > :last_id AND ({STALE_ROWS_FILTER}) ORDER BY id LIMIT :limit"
+                ), {"last_id": last_id, "limit": batch_size}).scalars().all()
+                if not ids:
+                    break
+                conn.execute(text("UPDATE resumes SET resume_data = resume_data WHERE id = ANY(:ids)"), {"ids": ids})
+                refreshed, last_id = refreshed + len(ids), ids[-1]
+            if refreshed:
+                logger.info(f"🔧 Recomputed search columns for {refreshed} resumes")
+
+            for name, definition in SEARCH_INDEXES.items():
+                create_index_concurrently(conn, name, definition)
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(hashtext('resume_search_schema'))"))
+
+
+_schema_ready = False
+
+
+def search_schema_ready(db: Session) -> bool:
+    global _schema_ready
+    if not _schema_ready:
+        _schema_ready = db.execute(text(
+            "SELECT count(*) = 2 FROM information_schema.columns WHERE table_schema = current_schema() "
+            "AND table_name = 'resumes' AND column_name IN ('skills_normalized', 'location_terms')"
+        )).scalar()
+    return _schema_ready
+
+
+def normalize_term(value: str) -> str:
+    # Same order as the SQL: collapse whitespace, then trim the single spaces left at the ends
+    return _WHITESPACE.sub(" ", value.lower()).strip(" ")
+
+
+def location_terms(location: str) -> List[str]:
+    return [term for term in (normalize_term(part) for part in _LOCATION_SEPARATORS.split(location)) if term]
+
+
+def search_resumes(db: Session, skills: List[str] = (), location: Optional[str] = None,
+                   graduation_year: Optional[int] = None, match_all: bool = True,
+                   limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> Tuple[list, Optional[str]]:
+    """A page of matching resumes, newest first, without personal details."""
+    if db.get_bind().dialect.name != "postgresql":
+        raise SearchUnavailable("Resume search requires PostgreSQL")
+    if not search_schema_ready(db):
+        raise SearchUnavailable("Resume search is not set up yet; run schema_migrations.py")
+
+    query = db.query(*SEARCH_RESULT_COLUMNS)
+    skills = sorted({normalize_term(skill) for skill in skills if skill.strip()})
+    if skills:
+        query = query.filter(SKILLS.contains(skills) if match_all else SKILLS.overlap(skills))
+    if location and location_terms(location):
+        query = query.filter(LOCATION_TERMS.contains(location_terms(location)))
+    if graduation_year is not None:
+        # ResumeData stores graduation_year as a string
+        education = {"education": [{"graduation_year": str(graduation_year)}]}
+        query = query.filter(type_coerce(Resume.resume_data, JSONB).contains(education))
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != 1 or not isinstance(values[0], int):
+            raise InvalidCursor("Malformed cursor")
+        query = query.filter(Resume.id < values[0])
+
+    limit = min(limit, MAX_PAGE_SIZE)
+    rows = query.order_by(Resume.id.desc()).limit(limit + 1).all()
+    rows, next_cursor = paginate(rows, limit, lambda row: (row.id,))
+    return [dict(row._mapping) for row in rows], next_cursor
@@ -1,9 +1,10 @@
 from fastapi import APIRouter, HTTPException, Depends, Form, Query
 from pydantic import BaseModel
 from typing import List, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
 from postgres_models import Resume
 from postgres_client import SessionLocal
+from session_tokens import get_current_user
 from datetime import datetime
 import os
 from reportlab.lib.pagesizes import letter, A4
@@ -15,9 +16,19 @@ from reportlab.lib.units import inch
 from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT, TA_JUSTIFY
 import logging
 
+import resume_search
+from listings import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor
+from metrics import stage
+from skill_taxonomy import skill_taxonomy
+
 logger = logging.getLogger(__name__)
 resume_router = APIRouter(prefix="/resumes", tags=["Resumes"])
 
+# Signed-in accounts allowed to search other users' resumes (comma-separated emails)
+RESUME_SEARCH_EMAILS = {
+    email.strip().lower() for email in os.getenv("RESUME_SEARCH_EMAILS", "").split(",") if email.strip()
+}
+
 
 # Enhanced Data Models
 class PersonalInfo(BaseModel):
@@ -204,28 +215,8 @@ def generate_professional_template(resume_id: int, data: ResumeData) -> str:
     if data.skills:
         story.append(Paragraph("SKILLS SUMMARY", section_heading_style))
 
-        # Categorize skills similar to the sample resume
-        skill_categories = {
-            "Languages": [],
-            "Frameworks": [],
-            "Tools": [],
-            "Platforms": [],
-            "Other": []
-        }
-
-        # Simple categorization logic - could be improved with AI or better mapping
-        for skill in data.skills:
-            skill_lower = skill.lower()
-            if skill_lower in ['python', 'java', 'javascript', 'c++', 'c#', 'sql', 'r', 'ruby', 'php', 'go']:
-                skill_categories["Languages"].append(skill)
-            elif skill_lower in ['react', 'angular', 'vue', 'django', 'flask', 'spring', 'node.js', 'express', '.net']:
-                skill_categories["Frameworks"].append(skill)
-            elif skill_lower in ['git', 'docker', 'kubernetes', 'jenkins', 'jira', 'postman', 'vscode']:
-                skill_categories["Tools"].append(skill)
-            elif skill_lower in ['aws', 'azure', 'gcp', 'linux', 'windows', 'macos', 'ios', 'android']:
-                skill_categories["Platforms"].append(skill)
-            else:
-                skill_categories["Other"].append(skill)
+        # Categorize skills similar to the sample resume (aliases like "ReactJS" are merged)
+        skill_categories = skill_taxonomy.categorize(data.skills)
 
         # Format skills by category
         for category, skills in skill_categories.items():
@@ -410,7 +401,7 @@ def create_resume(resume_data: ResumeData, db: Session = Depends(get_resume_db))
         # Store in database with proper column names
         db_resume = Resume(
             user_id=resume_data.user_id,
-            resume_data=resume_data.dict(),
+            resume_data=resume_data.model_dump(),
             file_name=f"{resume_data.personal_info.name.replace(' ', '_')}_Resume_{resume_data.template}.pdf",
             created_at=datetime.utcnow(),  # Use created_at instead of timestamp
             template_used=resume_data.template
@@ -420,12 +411,11 @@ def create_resume(resume_data: ResumeData, db: Session = Depends(get_resume_db))
         db.refresh(db_resume)
 
         # Generate resume based on template
-        if resume_data.template == "professional":
-            download_url = generate_professional_template(db_resume.id, resume_data)
-        elif resume_data.template == "modern":
-            download_url = generate_modern_template(db_resume.id, resume_data)
-        else:
-            download_url = generate_professional_template(db_resume.id, resume_data)
+        with stage("pdf"):
+            if resume_data.template == "modern":
+                download_url = generate_modern_template(db_resume.id, resume_data)
+            else:
+                download_url = generate_professional_template(db_resume.id, resume_data)
 
         # Update with download URL
         db_resume.download_url = download_url
@@ -447,12 +437,53 @@ def create_resume(resume_data: ResumeData, db: Session = Depends(get_resume_db))
 
 # Keep your existing endpoints (delete, rename, etc.)
 
+# Registered before /{resume_id} so "search" is not parsed as an id
+@resume_router.get("/search")
+def search_resumes(
+        skills: List[str] = Query([]),
+        location: Optional[str] = None,
+        graduation_year: Optional[int] = None,
+        match: str = Query("all", pattern="^(all|any)$"),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = None,
+        claims: dict = Depends(get_current_user),
+        db: Session = Depends(get_resume_db)
+):
+    """
+    Resumes having all (or any) of `skills`, optionally in `location` and graduating in `graduation_year`.
+    Restricted to the RESUME_SEARCH_EMAILS accounts; results carry no personal details.
+    """
+    if (claims.get("email") or "").lower() not in RESUME_SEARCH_EMAILS:
+        raise HTTPException(status_code=403, detail="Not allowed to search resumes")
+    # Accept both ?skills=python&skills=aws and ?skills=python,aws
+    skills = [skill for value in skills for skill in value.split(",")]
+    try:
+        items, next_cursor = resume_search.search_resumes(
+            db, skills, location=location, graduation_year=graduation_year, match_all=match == "all",
+            limit=limit, cursor=cursor,
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except resume_search.SearchUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
+
+
 @resume_router.get("/{resume_id}")
 def get_resume(resume_id: int, db: Session = Depends(get_resume_db)):
-    resume = db.query(Resume).filter(Resume.id == resume_id).first()
+    resume = db.query(Resume).options(undefer(Resume.resume_data)).filter(Resume.id == resume_id).first()
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
-    return resume
+    return {
+        "id": resume.id,
+        "user_id": resume.user_id,
+        "file_name": resume.file_name,
+        "download_url": resume.download_url,
+        "template_used": resume.template_used,
+        "created_at": resume.created_at,
+        "updated_at": resume.updated_at,
+        "resume_data": resume.resume_data,
+    }
 
 @resume_router.post("/start_resume_builder/")
 async def start_resume_builder(user_id: str):
@@ -0,0 +1,99 @@
+# saved_jobs_cache.py
+"""
+Per-user index of saved jobs for the bookmark icons on job cards.
+
+Each user's saved jobs are kept in a Redis hash `saved_jobs:{user_id}` mapping
+a normalized "title|company" fingerprint to the saved job id, plus a
+`__loaded__` marker. The hash is filled from Postgres with one query on the
+first lookup and dropped whenever the user saves or deletes a job.
+
+A lookup can race a write: it reads Postgres, the write commits and drops the
+hash, then the lookup stores what it read. So every write also bumps
+`saved_jobs:{user_id}:version`, and a lookup only stores its rows if the
+version is still the one it saw before querying Postgres (checked under
+WATCH). Without Redis every lookup reads Postgres once.
+"""
+import logging
+
+import redis
+from sqlalchemy.orm import Session
+
+from postgres_models import SavedJob
+
+logger = logging.getLogger(__name__)
+
+SAVED_JOBS_TTL = 3600
+LOADED_FIELD = "__loaded__"
+
+
+def saved_jobs_key(user_id: str) -> str:
+    return f"saved_jobs:{user_id}"
+
+
+def version_key(user_id: str) -> str:
+    return f"saved_jobs:{user_id}:version"
+
+
+def job_fingerprint(title: str, company: str) -> str:
+    return f"{(title or '').strip().lower()}|{(company or '').strip().lower()}"
+
+
+def load_saved_jobs(db: Session, user_id: str) -> dict:
+    rows = (
+        db.query(SavedJob.id, SavedJob.job_title, SavedJob.company_name)
+        .filter(SavedJob.user_id == user_id)
+        .order_by(SavedJob.id)
+        .all()
+    )
+    return {job_fingerprint(title, company): str(job_id) for job_id, title, company in rows}
+
+
+def get_saved_index(redis_conn, db: Session, user_id: str) -> dict:
+    """Returns {fingerprint: saved job id} for every job the user has saved."""
+    key, version = saved_jobs_key(user_id), version_key(user_id)
+    if redis_conn is not None:
+        try:
+            pipe = redis_conn.pipeline(transaction=False)
+            pipe.hgetall(key)
+            pipe.get(version)
+            cached, seen_version = pipe.execute()
+            if cached.pop(LOADED_FIELD, None) is not None:
+                return cached
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Saved jobs cache read failed for {user_id}: {e}")
+            redis_conn = None
+
+    index = load_saved_jobs(db, user_id)
+    if redis_conn is not None:
+        try:
+            with redis_conn.pipeline(transaction=True) as pipe:
+                pipe.watch(version)
+                if pipe.get(version) == seen_version:
+                    pipe.multi()
+                    pipe.delete(key)
+                    pipe.hset(key, mapping={**index, LOADED_FIELD: "1"})
+                    pipe.expire(key, SAVED_JOBS_TTL)
+                    pipe.execute()
+        except redis.WatchError:
+            pass  # a save or delete landed meanwhile; the next lookup loads again
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Saved jobs cache write failed for {user_id}: {e}")
+    return index
+
+
+def forget_saved_jobs(redis_conn, user_id: str):
+    """
+    Call after a save or delete commits in Postgres. The index is dropped
+    rather than extended, because extending it can't be ordered against a
+    concurrent load.
+    """
+    if redis_conn is None:
+        return
+    try:
+        pipe = redis_conn.pipeline(transaction=True)
+        pipe.incr(version_key(user_id))
+        pipe.expire(version_key(user_id), SAVED_JOBS_TTL)
+        pipe.delete(saved_jobs_key(user_id))
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"⚠️ Saved jobs cache invalidation failed for {user_id}: {e}")
@@ -0,0 +1,94 @@
+# schema_migrations.py
+"""
+Pre-deploy schema migration (render.yaml's preDeployCommand):
+
+    python schema_migrations.py
+
+Runs once per deploy, before the new code starts. Web workers and Celery
+processes never run DDL at import: a plain CREATE INDEX blocks writes to a
+live table, and processes booting together would race on "already exists".
+
+- columns added to existing tables (`create_all` only creates missing
+  tables), each with a constant default so Postgres adds it without a rewrite;
+- indexes declared on the models that `create_all` skips for tables that
+  already exist are built with CREATE INDEX CONCURRENTLY;
+- the resume search columns and indexes (resume_search.migrate_search_schema).
+
+Safe to re-run; a session advisory lock keeps two deploys from overlapping.
+On databases other than Postgres (the SQLite used by the load test) the
+model indexes are created the plain way.
+"""
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.schema import CreateIndex
+
+from postgres_models import Interview, Resume, SavedJob
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_LOCK = "hashtext('schema_migrations')"
+INDEXED_TABLES = (Interview.__table__, SavedJob.__table__, Resume.__table__)
+ADDED_COLUMNS_DDL = [
+    "ALTER TABLE interviews ADD COLUMN IF NOT EXISTS role varchar NOT NULL DEFAULT 'general'",
+]
+
+
+def create_index_concurrently(conn, name: str, definition: str, unique: bool = False):
+    """
+    Builds `CREATE INDEX name ON definition` without blocking writes, unless a
+    valid index of that name exists. `conn` must be in autocommit mode.
+    """
+    valid = conn.execute(text(
+        "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = :name AND c.relnamespace = current_schema()::regnamespace"
+    ), {"name": name}).scalar()
+    if valid:
+        return
+    if valid is False:  # left behind by an interrupted concurrent build
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    logger.info(f"🔧 Building {name}")
+    conn.execute(text(f"CREATE {'UNIQUE ' if unique else ''}INDEX CONCURRENTLY {name} ON {definition}"))
+
+
+def migrate_added_columns(engine):
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for statement in ADDED_COLUMNS_DDL:
+            conn.execute(text(statement))
+
+
+def migrate_model_indexes(engine):
+    indexes = [index for table in INDEXED_TABLES for index in table.indexes]
+    if engine.dialect.name != "postgresql":
+        for index in indexes:
+            index.create(bind=engine, checkfirst=True)
+        return
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for index in indexes:
+            ddl = str(CreateIndex(index).compile(dialect=engine.dialect))
+            create_index_concurrently(conn, index.name, ddl.split(" ON ", 1)[1], unique=index.unique)
+
+
+def migrate(engine):
+    from resume_search import migrate_search_schema
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as lock:
+        if engine.dialect.name == "postgresql":
+            lock.execute(text(f"SELECT pg_advisory_lock({MIGRATION_LOCK})"))
+        try:
+            migrate_added_columns(engine)
+            migrate_model_indexes(engine)
+            migrate_search_schema(engine)
+        finally:
+            if engine.dialect.name == "postgresql":
+                lock.execute(text(f"SELECT pg_advisory_unlock({MIGRATION_LOCK})"))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    from postgres_client import engine  # reuse the existing engine
+
+    migrate(engine)
+    print("✅ schema is up to date")
@@ -0,0 +1,43 @@
+# serialization.py
+"""
+JSON responses for the API.
+
+`FastJSONResponse` renders with orjson, which handles datetimes, UUIDs and
+numpy scalars natively; Pydantic models, Mongo ObjectIds, Decimals and sets go
+through `_default`. It is the app's default response class and replaces
+`JSONResponse(content=jsonable_encoder(...))` in handlers. Compression is done
+by GZipMiddleware in main.py for bodies of at least `GZIP_MINIMUM_SIZE` bytes.
+"""
+import os
+from decimal import Decimal
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+GZIP_MINIMUM_SIZE = int(os.getenv("GZIP_MINIMUM_SIZE", "1024"))
+GZIP_COMPRESS_LEVEL = int(os.getenv("GZIP_COMPRESS_LEVEL", "5"))
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(value):
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content) -> bytes:
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -0,0 +1,113 @@
+# session_tokens.py
+"""
+Stateless session tokens issued by the auth routes.
+
+A token is `base64url(claims).base64url(HMAC-SHA256(claims))` with claims
+{"sub": user_id, "name", "email", "iat", "exp"}. Verifying one is a single
+HMAC over a few hundred bytes, so endpoints can identify the caller without
+touching Postgres. Tokens are signed with SESSION_SECRET; tokens signed with
+SESSION_SECRET_PREVIOUS are still accepted, which allows rotating the secret
+without logging everyone out. SESSION_SECRET is required unless
+APP_ENV=development.
+
+Tokens are only issued after a real credential check (currently the Google
+OAuth callback), never for a bare email address.
+
+Endpoints use `get_current_user` (401 without a valid
+`Authorization: Bearer <token>`) or `get_optional_user`.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import time
+from typing import Optional
+
+from dotenv import load_dotenv
+from fastapi import Header, HTTPException
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", str(7 * 24 * 3600)))
+
+SESSION_SECRET = os.getenv("SESSION_SECRET")
+if not SESSION_SECRET:
+    # Every worker imports this module on its own, so a random secret would make
+    # tokens from one worker fail on the others and all of them die on deploy
+    if os.getenv("APP_ENV") != "development":
+        raise RuntimeError("SESSION_SECRET must be set (or APP_ENV=development for a throwaway secret)")
+    SESSION_SECRET = secrets.token_urlsafe(32)
+    logger.warning("⚠️ SESSION_SECRET is not set; using a throwaway secret (APP_ENV=development)")
+
+_signing_key = SESSION_SECRET.encode()
+_verification_keys = [_signing_key]
+if os.getenv("SESSION_SECRET_PREVIOUS"):
+    _verification_keys.append(os.getenv("SESSION_SECRET_PREVIOUS").encode())
+
+
+class InvalidToken(Exception):
+    pass
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _sign(payload: str, key: bytes) -> str:
+    return _b64encode(hmac.new(key, payload.encode(), hashlib.sha256).digest())
+
+
+def issue_token(profile: dict, ttl: int = SESSION_TTL_SECONDS) -> dict:
+    """Returns {"access_token", "token_type", "expires_at"} for a profile dict."""
+    now = int(time.time())
+    claims = {"sub": profile["user_id"], "name": profile.get("name"), "email": profile.get("email"),
+              "iat": now, "exp": now + ttl}
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    return {"access_token": f"{payload}.{_sign(payload, _signing_key)}", "token_type": "bearer", "expires_at": now + ttl}
+
+
+def verify_token(token: str) -> dict:
+    """Returns the claims of a valid, unexpired token; raises InvalidToken otherwise."""
+    payload, _, signature = token.partition(".")
+    if not payload or not signature:
+        raise InvalidToken("Malformed token")
+    if not any(hmac.compare_digest(signature, _sign(payload, key)) for key in _verification_keys):
+        raise InvalidToken("Bad signature")
+    try:
+        claims = json.loads(_b64decode(payload))
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidToken("Malformed claims")
+    if claims.get("exp", 0) < time.time():
+        raise InvalidToken("Token expired")
+    return claims
+
+
+def _bearer_claims(authorization: Optional[str]) -> dict:
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise InvalidToken("Missing bearer token")
+    return verify_token(token.strip())
+
+
+def get_current_user(authorization: Optional[str] = Header(None)) -> dict:
+    """FastAPI dependency: the verified token claims, or 401."""
+    try:
+        return _bearer_claims(authorization)
+    except InvalidToken as e:
+        raise HTTPException(status_code=401, detail=str(e), headers={"WWW-Authenticate": "Bearer"})
+
+
+def get_optional_user(authorization: Optional[str] = Header(None)) -> Optional[dict]:
+    """FastAPI dependency for endpoints that also serve anonymous callers."""
+    if not authorization:
+        return None
+    return get_current_user(authorization)
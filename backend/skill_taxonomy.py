@@ -0,0 +1,154 @@
+# skill_taxonomy.py
+"""
+Canonical skills, their categories and aliases, from `skill_taxonomy.json`.
+
+Loaded once at import into
+  * an alias map: normalized key -> canonical skill, where the key ignores
+    case, spaces, dots, hyphens and underscores, so "ReactJS", "react.js" and
+    "React JS" are all React, and
+  * a prefix trie over the same keys whose nodes keep their best
+    `AUTOCOMPLETE_LIMIT` skills precomputed, so autocomplete costs one step
+    per typed character regardless of the taxonomy size. The trie stops at
+    depth `TRIE_DEPTH`; those nodes keep every key below them instead (a
+    handful), which longer prefixes filter. Most keys are unique well before
+    their end, so this avoids a long single-child chain per key.
+
+Whole names and aliases are inserted first, then every later word of a
+multi-word name ("learning" -> Machine Learning), so completions of what
+the user actually started typing rank first. Within each pass skills with a
+higher "popularity" (optional in the JSON) come first, then file order, so
+the JSON lists the most common skills of each category first.
+"""
+import json
+import logging
+import re
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+SKILL_TAXONOMY_PATH = Path(__file__).parent / "skill_taxonomy.json"
+OTHER_CATEGORY = "Other"
+AUTOCOMPLETE_LIMIT = 10
+TRIE_DEPTH = 8
+
+_IGNORED = re.compile(r"[\s.\-_]+")
+_WORD_BREAK = re.compile(r"[\s/\-]+")
+
+
+class Skill(NamedTuple):
+    name: str
+    category: str
+    popularity: int = 0
+
+
+def skill_key(text: str) -> str:
+    return _IGNORED.sub("", (text or "").lower())
+
+
+class SkillTaxonomy:
+    def __init__(self, taxonomy: Dict[str, list], autocomplete_limit: int = AUTOCOMPLETE_LIMIT,
+                 trie_depth: int = TRIE_DEPTH):
+        self.autocomplete_limit = autocomplete_limit
+        self.trie_depth = trie_depth
+        self.categories = list(taxonomy)
+        self.skills = []
+        self._by_key = {}
+        # node = [children by character, best skills under this prefix]; at trie_depth
+        # the second item is instead every (key, skill) below, best first
+        self._trie = [{}, []]
+
+        entries = []  # (key, skill, is_whole_name, position in the file)
+        for category, items in taxonomy.items():
+            for item in items:
+                if isinstance(item, str):
+                    item = {"name": item}
+                skill = Skill(item["name"], category, item.get("popularity", 0))
+                self.skills.append(skill)
+                for text in [skill.name, *item.get("aliases", [])]:
+                    key = skill_key(text)
+                    if not key:
+                        continue
+                    if key in self._by_key and self._by_key[key] != skill:
+                        logger.debug(f"Skill key {key!r} of {skill.name!r} already maps to {self._by_key[key].name!r}")
+                        continue
+                    self._by_key[key] = skill
+                    entries.append((key, skill, True, len(self.skills)))
+                words = _WORD_BREAK.split(skill.name)
+                for start in range(1, len(words)):
+                    entries.append((skill_key("".join(words[start:])), skill, False, len(self.skills)))
+
+        def rank(entry):
+            key, skill, is_whole_name, position = entry
+            return (not is_whole_name, -skill.popularity, position)
+
+        for key, skill, _, _ in sorted(entries, key=rank):
+            self._insert(key, skill)
+
+    @classmethod
+    def load(cls, path: Path = SKILL_TAXONOMY_PATH, **kwargs) -> "SkillTaxonomy":
+        with open(path, "r", encoding="utf-8") as f:
+            taxonomy = cls(json.load(f), **kwargs)
+        logger.info(f"🧩 Loaded {len(taxonomy.skills)} skills ({len(taxonomy._by_key)} keys) from {path}")
+        return taxonomy
+
+    def _insert(self, key: str, skill: Skill):
+        # Entries arrive best-first, so each node keeps the first distinct skills it sees
+        node = self._trie
+        for char in key[:self.trie_depth - 1]:
+            node = node[0].setdefault(char, [{}, []])
+            best = node[1]
+            if len(best) < self.autocomplete_limit and skill not in best:
+                best.append(skill)
+        if len(key) >= self.trie_depth:
+            node[0].setdefault(key[self.trie_depth - 1], [{}, []])[1].append((key, skill))
+
+    def canonical(self, text: str) -> Optional[Skill]:
+        """The taxonomy skill `text` names (by name or alias), or None."""
+        key = skill_key(text)
+        skill = self._by_key.get(key)
+        if skill is None and key.endswith("js") and len(key) > 2:
+            skill = self._by_key.get(key[:-2])  # "vuejs", "expressjs" ...
+        return skill
+
+    def autocomplete(self, prefix: str, limit: int = AUTOCOMPLETE_LIMIT) -> List[Skill]:
+        prefix = skill_key(prefix)
+        node = self._trie
+        for char in prefix[:self.trie_depth]:
+            node = node[0].get(char)
+            if node is None:
+                return []
+        if len(prefix) < self.trie_depth:
+            return node[1][:limit] if prefix else []
+        matches = []
+        for key, skill in node[1]:
+            if key.startswith(prefix) and skill not in matches:
+                matches.append(skill)
+                if len(matches) == limit:
+                    break
+        return matches
+
+    def categorize(self, skills: Iterable[str]) -> "OrderedDict[str, List[str]]":
+        """
+        Groups skills by category in taxonomy order, with unknown skills last
+        under "Other". Known skills are shown by their canonical name and
+        duplicates ("ReactJS", "react.js") are listed once.
+        """
+        grouped = OrderedDict((category, []) for category in [*self.categories, OTHER_CATEGORY])
+        seen = set()
+        for text in skills:
+            text = (text or "").strip()
+            skill = self.canonical(text)
+            marker = skill if skill else skill_key(text)
+            if not text or marker in seen:
+                continue
+            seen.add(marker)
+            if skill:
+                grouped[skill.category].append(skill.name)
+            else:
+                grouped[OTHER_CATEGORY].append(text)
+        return OrderedDict((category, names) for category, names in grouped.items() if names)
+
+
+skill_taxonomy = SkillTaxonomy.load()
@@ -7,11 +7,12 @@ python3.11 -m pip install --upgrade pip
 # Install dependencies
 pip install -r requirements.txt
 
-# Start FastAPI app using gunicorn + uvicorn worker
-gunicorn -k uvicorn.workers.UvicornWorker main:app --bind 0.0.0.0:$PORT
-
-
-
-
-
-
+# SESSION_SECRET must be set (or APP_ENV=development for a throwaway one),
+# otherwise importing main fails
+# Start FastAPI app using gunicorn + uvicorn workers (settings in gunicorn.conf.py)
+gunicorn -c gunicorn.conf.py
+
+# Booked interview calls, feedback emails and cache prewarming also need a
+# Celery worker and exactly one beat process (render.yaml runs both):
+#   celery -A tasks worker -Q celery,interview_transcripts,interview_feedback,interview_lookup,notifications
+#   celery -A tasks beat
@@ -1,50 +1,115 @@
 # tasks.py
 
-from celery import Celery
+from celery import Celery, chain
+from celery.signals import worker_process_init, worker_process_shutdown
+from celery.utils.time import get_exponential_backoff_interval
 import os
 import json
+import logging
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
 import requests
-from twilio.rest import Client
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
+from redis import RedisError
+from sqlalchemy.exc import OperationalError
 from dotenv import load_dotenv
+from gemini_governor import BATCH, GeminiUnavailable
+from interview_scheduler import (
+    DISPATCH_INTERVAL_SECONDS, claim_call, dispatch_due_interviews as dispatch_interviews, mark_call_failed,
+)
+from interview_store import get_transcript, to_gemini_history
+from job_cache import JOB_CACHE_TTL, fetch_jobs_sync, hit_ratio, job_cache_key
+from mongodb_client import get_top_job_searches
+from postgres_client import get_user_email_for_interview, save_interview_transcript
+from notifications import EMAIL_BATCH_SIZE, FlushInterrupted, render_feedback_email
+from upstreams import GEMINI_URL
+from worker_resources import dispose_resources, get_resources, init_resources
 
 # Load environment variables from .env file
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # --- Celery Configuration ---
 celery_app = Celery('tasks', broker=os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
 
+# Each step of the interview analysis pipeline has its own queue so a burst
+# of finished interviews drains at the rate limit of its slowest dependency.
+# Run workers with e.g.:
+#   celery -A tasks worker -Q celery,interview_transcripts,interview_feedback,interview_lookup,notifications
+celery_app.conf.update(
+    task_routes={
+        'tasks.fetch_interview_transcript': {'queue': 'interview_transcripts'},
+        'tasks.generate_interview_feedback': {'queue': 'interview_feedback'},
+        'tasks.lookup_interview_email': {'queue': 'interview_lookup'},
+        'tasks.notify_interview_feedback': {'queue': 'notifications'},
+        'tasks.flush_feedback_emails': {'queue': 'notifications'},
+    },
+    beat_schedule={
+        'flush-feedback-emails': {'task': 'tasks.flush_feedback_emails', 'schedule': 30.0},
+        'prewarm-job-cache': {
+            'task': 'tasks.prewarm_job_cache',
+            'schedule': float(os.getenv("JOB_PREWARM_INTERVAL", "600")),
+        },
+        'dispatch-due-interviews': {
+            'task': 'tasks.dispatch_due_interviews',
+            'schedule': float(DISPATCH_INTERVAL_SECONDS),
+            'options': {'expires': DISPATCH_INTERVAL_SECONDS},
+        },
+    },
+    task_acks_late=True,
+    worker_prefetch_multiplier=1,
+)
+
+RETRY_OPTIONS = {
+    'retry_backoff': True,
+    'retry_backoff_max': 600,
+    'retry_jitter': True,
+    'max_retries': 5,
+}
+
 # --- Service Clients ---
-# Twilio Client
-twilio_account_sid = os.getenv("TWILIO_ACCOUNT_SID")
-twilio_auth_token = os.getenv("TWILIO_AUTH_TOKEN")
+# Redis, SQLAlchemy, HTTP, Twilio and SendGrid clients are created once per
+# worker process (see worker_resources.py), never in processes that only
+# enqueue tasks.
+worker_process_init.connect(init_resources)
+worker_process_shutdown.connect(dispose_resources)
+
+# Twilio Configuration
 twilio_phone_number = os.getenv("TWILIO_PHONE_NUMBER")
-twilio_client = Client(twilio_account_sid, twilio_auth_token)
 
 # Gemini API configuration
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-GEMINI_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent"
+GEMINI_FEEDBACK_RATE_LIMIT = os.getenv("GEMINI_FEEDBACK_RATE_LIMIT", "30/m")
+GEMINI_TIMEOUT = (5, 60)  # connect, read
+
+# Per-worker limits for the Redis/Postgres steps of the interview pipeline
+TRANSCRIPT_FETCH_RATE_LIMIT = os.getenv("TRANSCRIPT_FETCH_RATE_LIMIT", "120/m")
+EMAIL_LOOKUP_RATE_LIMIT = os.getenv("EMAIL_LOOKUP_RATE_LIMIT", "300/m")
 
 # SendGrid Configuration
 SENDGRID_API_KEY = os.getenv("SENDGRID_API_KEY")
 SENDER_EMAIL = os.getenv("SENDER_EMAIL")
+NOTIFICATION_RATE_LIMIT = os.getenv("NOTIFICATION_RATE_LIMIT", "100/m")
 
+# Job cache prewarming
+JOB_PREWARM_TOP_N = int(os.getenv("JOB_PREWARM_TOP_N", "20"))
+JOB_PREWARM_LOOKBACK_HOURS = int(os.getenv("JOB_PREWARM_LOOKBACK_HOURS", "24"))
+JOB_PREWARM_UPSTREAM_BUDGET = int(os.getenv("JOB_PREWARM_UPSTREAM_BUDGET", "10"))  # RapidAPI calls per run
+JOB_PREWARM_REFRESH_BEFORE = int(os.getenv("JOB_PREWARM_REFRESH_BEFORE", "900"))  # seconds before expiry
 
-# --- Helper Functions ---
 
-def get_interview_state(interview_id: int):
-    """Fetches interview state from Redis."""
-    # This function needs access to your redis_client.
-    # For simplicity, we assume a redis_client is available here.
-    # In a larger app, you might import it from a shared redis_client.py
-    from redis_client import redis_client
-    state = redis_client.get(f"interview_state:{interview_id}")
-    return json.loads(state) if state else {"history": []}
+class TransientUpstreamError(Exception):
+    """Raised for upstream responses worth retrying (429 and 5xx)."""
 
 
+# --- Helper Functions ---
+
 def call_gemini_for_feedback(transcript: list) -> str:
-    """Calls Gemini API to get feedback on the interview transcript."""
+    """
+    Calls Gemini API to get feedback on the interview transcript.
+    Raises TransientUpstreamError, GeminiUnavailable or requests.RequestException
+    when the call should be retried.
+    """
     if not GEMINI_API_KEY:
         return "Feedback could not be generated due to a configuration error."
 
@@ -63,99 +128,201 @@ def call_gemini_for_feedback(transcript: list) -> str:
     headers = {"Content-Type": "application/json", "X-goog-api-key": GEMINI_API_KEY}
     data = {"contents": [{"parts": [{"text": analysis_prompt}]}]}
 
+    # Feedback is batch work: it yields the shared Gemini quota to live chat
+    resources = get_resources()
+    with resources.gemini_governor.slot(BATCH):
+        response = resources.http_session.post(GEMINI_URL, headers=headers, json=data, timeout=GEMINI_TIMEOUT)
+        if response.status_code == 429 or response.status_code >= 500:
+            raise TransientUpstreamError(f"Gemini returned {response.status_code}")
+
     try:
-        response = requests.post(GEMINI_URL, headers=headers, json=data)
         response_json = response.json()
         if 'candidates' in response_json:
             return response_json['candidates'][0]['content']['parts'][0]['text']
         else:
             return "Could not parse feedback from AI service."
-    except Exception as e:
+    except (ValueError, KeyError, IndexError) as e:
         return f"An error occurred while generating feedback: {e}"
 
 
-def send_feedback_email(user_email: str, recording_url: str, feedback: str):
-    """Sends the feedback email using SendGrid."""
-    if not SENDGRID_API_KEY or not SENDER_EMAIL:
-        print("SendGrid API Key or Sender Email not configured. Cannot send email.")
-        return
-
-    # Fix the f-string issue here
-    safe_feedback = feedback.replace("\n", "<br>")
-
-    message = Mail(
-        from_email=SENDER_EMAIL,
-        to_emails=user_email,
-        subject='Your Asha AI Mock Interview Feedback is Ready!',
-        html_content=f"""
-        <h3>Hello!</h3>
-        <p>Thank you for completing your mock interview with Asha. Here is your feedback and a link to the recording.</p>
-        <h4>AI-Generated Feedback:</h4>
-        <div style="background-color:#f4f4f4; border-left: 5px solid #ccc; padding: 15px;">
-            <p>{safe_feedback}</p>
-        </div>
-        <h4>Call Recording:</h4>
-        <p>You can listen to your interview here: <a href="{recording_url}">{recording_url}</a></p>
-        <br>
-        <p>Keep practicing, you're on the right track!</p>
-        <p>Best regards,</p>
-        <p>The Asha AI Team</p>
-        """
-    )
+# --- Celery Tasks ---
+
+@celery_app.task
+def initiate_interview_call(user_phone_number: str, interview_id: int, role: str = "general"):
+    resources = get_resources()
+    db = resources.SessionLocal()
     try:
-        sg = SendGridAPIClient(SENDGRID_API_KEY)
-        response = sg.send(message)
-        print(f"Feedback email sent to {user_email}, Status Code: {response.status_code}")
-    except Exception as e:
-        print(f"Error sending email with SendGrid: {e}")
+        # A redelivered or duplicate task finds the interview already "calling"
+        if not claim_call(db, interview_id):
+            logger.warning(f"Interview {interview_id} is no longer queued; not calling again")
+            return
+        try:
+            # Replace with your actual ngrok or public URL
+            PUBLIC_URL = os.getenv("PUBLIC_URL", "http://your-public-url.ngrok.io")
 
+            call = resources.twilio.calls.create(
+                to=user_phone_number,
+                from_=twilio_phone_number,
+                url=f"{PUBLIC_URL}/interview/start/{interview_id}?{urlencode({'role': role})}",
+                record=True,
+                status_callback=f"{PUBLIC_URL}/interview/status/{interview_id}",
+                status_callback_event=['completed']
+            )
+            print(f"Call initiated for interview {interview_id} with SID: {call.sid}")
+        except Exception as e:
+            print(f"Error initiating call: {e}")
+            mark_call_failed(db, interview_id)
+    finally:
+        db.close()
 
-# --- Celery Tasks ---
 
-@celery_app.task
-def initiate_interview_call(user_phone_number: str, interview_id: int):
+@celery_app.task(autoretry_for=(OperationalError,), **RETRY_OPTIONS)
+def dispatch_due_interviews():
+    """
+    Enqueues calls for interviews due within the next bucket. Bookings are
+    only rows in Postgres until then, so no long ETAs sit in the broker.
+    """
+    def enqueue(interview_id, phone_number, countdown, role):
+        initiate_interview_call.apply_async(args=[phone_number, interview_id, role], countdown=countdown)
+
+    db = get_resources().SessionLocal()
     try:
-        # Replace with your actual ngrok or public URL
-        PUBLIC_URL = os.getenv("PUBLIC_URL", "http://your-public-url.ngrok.io")
-
-        call = twilio_client.calls.create(
-            to=user_phone_number,
-            from_=twilio_phone_number,
-            url=f"{PUBLIC_URL}/interview/start/{interview_id}",
-            record=True,
-            status_callback=f"{PUBLIC_URL}/interview/status/{interview_id}",
-            status_callback_event=['completed']
-        )
-        print(f"Call initiated for interview {interview_id} with SID: {call.sid}")
-    except Exception as e:
-        print(f"Error initiating call: {e}")
+        return dispatch_interviews(db, enqueue)
+    finally:
+        db.close()
+
+
+@celery_app.task
+def prewarm_job_cache():
+    """
+    Refreshes the cached results of the most popular recent job searches
+    before they expire, spending at most JOB_PREWARM_UPSTREAM_BUDGET RapidAPI
+    calls per run. Returns a summary including the current cache hit ratio.
+    """
+    resources = get_resources()
+    popular = get_top_job_searches(datetime.utcnow() - timedelta(hours=JOB_PREWARM_LOOKBACK_HOURS), JOB_PREWARM_TOP_N)
+    keys = [job_cache_key(search["job_title"], search["location"]) for search in popular]
+
+    pipe = resources.redis.pipeline()
+    for key in keys:
+        pipe.ttl(key)
+    ttls = pipe.execute()
+
+    upstream_calls = refreshed = 0
+    for search, key, ttl in zip(popular, keys, ttls):
+        # -2: missing, -1: no expiry; otherwise only refresh entries about to expire
+        if ttl == -1 or ttl > JOB_PREWARM_REFRESH_BEFORE:
+            continue
+        if upstream_calls >= JOB_PREWARM_UPSTREAM_BUDGET:
+            break
+        upstream_calls += 1
+        try:
+            jobs = fetch_jobs_sync(resources.http_session, search["job_title"], search["location"])
+        except requests.RequestException as e:
+            logger.warning(f"Prewarm fetch failed for {key}: {e}")
+            continue
+        if jobs is None:
+            continue
+        resources.redis.setex(key, JOB_CACHE_TTL, json.dumps(jobs))
+        refreshed += 1
+
+    summary = {
+        "popular_searches": len(popular),
+        "upstream_calls": upstream_calls,
+        "refreshed": refreshed,
+        **hit_ratio(resources.redis, hours=1),
+    }
+    logger.info(f"Job cache prewarm: {summary}")
+    return summary
 
 
 @celery_app.task
 def analyze_interview(interview_id: int, recording_url: str):
     """
-    Fetches the transcript, sends it to Gemini for feedback, and emails the user.
+    Starts the feedback pipeline for a finished interview:
+    fetch transcript -> Gemini feedback -> user email lookup -> notify.
     """
-    from postgres_client import get_user_email_for_interview  # You need to create this function
+    return chain(
+        fetch_interview_transcript.s(interview_id),
+        generate_interview_feedback.s(),
+        lookup_interview_email.s(),
+        notify_interview_feedback.s(recording_url),
+    ).apply_async()
+
 
-    # 1. Fetch transcript from Redis state
-    state = get_interview_state(interview_id)
-    transcript = state.get("history", [])
+# Each step receives the previous step's payload dict, or None once the
+# pipeline has nothing left to do for this interview.
 
-    if not transcript:
+@celery_app.task(autoretry_for=(RedisError, OperationalError), rate_limit=TRANSCRIPT_FETCH_RATE_LIMIT, **RETRY_OPTIONS)
+def fetch_interview_transcript(interview_id: int):
+    resources = get_resources()
+    turns = get_transcript(interview_id, client=resources.redis)
+    if not turns:
         print(f"No transcript found for interview {interview_id}. Aborting analysis.")
-        return
+        return None
+
+    # Persist the final transcript in one bulk write before the Redis list expires
+    db = resources.SessionLocal()
+    try:
+        save_interview_transcript(db, interview_id, turns)
+    finally:
+        db.close()
+
+    return {"interview_id": interview_id, "transcript": to_gemini_history(turns)}
 
-    # 2. Get feedback from Gemini
-    feedback = call_gemini_for_feedback(transcript)
 
-    # 3. Get user email from your PostgreSQL database
-    #    You need to implement this function in `postgres_client.py`
-    user_email = get_user_email_for_interview(interview_id)  # e.g., "user@example.com"
+@celery_app.task(
+    autoretry_for=(TransientUpstreamError, GeminiUnavailable, requests.RequestException),
+    rate_limit=GEMINI_FEEDBACK_RATE_LIMIT,
+    **RETRY_OPTIONS,
+)
+def generate_interview_feedback(payload):
+    if payload is None:
+        return None
+    return {"interview_id": payload["interview_id"], "feedback": call_gemini_for_feedback(payload["transcript"])}
+
+
+@celery_app.task(autoretry_for=(OperationalError,), rate_limit=EMAIL_LOOKUP_RATE_LIMIT, **RETRY_OPTIONS)
+def lookup_interview_email(payload):
+    if payload is None:
+        return None
+
+    db = get_resources().SessionLocal()
+    try:
+        user_email = get_user_email_for_interview(db, payload["interview_id"])
+    finally:
+        db.close()
 
     if not user_email:
-        print(f"No user email found for interview {interview_id}. Cannot send feedback.")
-        return
+        print(f"No user email found for interview {payload['interview_id']}. Cannot send feedback.")
+        return None
+    return {**payload, "user_email": user_email}
+
+
+@celery_app.task(autoretry_for=(RedisError,), rate_limit=NOTIFICATION_RATE_LIMIT, **RETRY_OPTIONS)
+def notify_interview_feedback(payload, recording_url: str):
+    if payload is None:
+        return None
+    email = render_feedback_email(payload["user_email"], recording_url, payload["feedback"])
+    queued = get_resources().email_dispatcher.enqueue(email)
 
-    # 4. Send email with SendGrid
-    send_feedback_email(user_email, recording_url, feedback)
\ No newline at end of file
+    # Don't wait for the next scheduled flush once a full batch is ready
+    if queued >= EMAIL_BATCH_SIZE:
+        flush_feedback_emails.delay()
+    return payload["interview_id"]
+
+
+@celery_app.task(bind=True, autoretry_for=(RedisError,), **RETRY_OPTIONS)
+def flush_feedback_emails(self):
+    """Sends queued feedback emails in batches of up to EMAIL_BATCH_SIZE recipients."""
+    if not SENDGRID_API_KEY or not SENDER_EMAIL:
+        logger.error("SendGrid API Key or Sender Email not configured. Cannot send email.")
+        return 0
+    try:
+        return get_resources().email_dispatcher.flush()
+    except FlushInterrupted as e:
+        # The unsent emails are back on the queue; back off through the broker instead of sleeping here
+        countdown = get_exponential_backoff_interval(
+            factor=2, retries=self.request.retries, maximum=RETRY_OPTIONS['retry_backoff_max'], full_jitter=True,
+        )
+        raise self.retry(exc=e, countdown=countdown)
@@ -0,0 +1,22 @@
+# upstreams.py
+"""
+Base URLs of the third-party APIs the backend and the Celery workers call.
+
+Set GEMINI_BASE_URL / JSEARCH_BASE_URL to point everything at another
+implementation of the same wire format, e.g. the mock_herkey_api emulator:
+
+    GEMINI_BASE_URL=http://127.0.0.1:8001 JSEARCH_BASE_URL=http://127.0.0.1:8001
+"""
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com").rstrip("/")
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
+GEMINI_URL = os.getenv("GEMINI_URL") or f"{GEMINI_BASE_URL}/v1beta/models/{GEMINI_MODEL}:generateContent"
+
+JSEARCH_BASE_URL = os.getenv("JSEARCH_BASE_URL", "https://jsearch.p.rapidapi.com").rstrip("/")
+JSEARCH_URL = os.getenv("JSEARCH_URL") or f"{JSEARCH_BASE_URL}/search"
+JSEARCH_HOST = "jsearch.p.rapidapi.com"  # RapidAPI routes on this header, wherever the request is sent
@@ -1,7 +1,67 @@
 # utils.py (create this file if you don’t have one yet)
+import re
+import sys
 import unicodedata
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
 
-def remove_invalid_characters(text: str) -> str:
+
+_ASTRAL = re.compile("[\U00010000-\U0010FFFF]")
+
+
+def _category_c_class(first: int, last: int) -> re.Pattern:
+    ranges = []
+    start = None
+    for codepoint in range(first, last + 2):
+        invalid = codepoint <= last and unicodedata.category(chr(codepoint))[0] == "C"
+        if invalid and start is None:
+            start = codepoint
+        elif not invalid and start is not None:
+            ranges.append(f"{re.escape(chr(start))}-{re.escape(chr(codepoint - 1))}")
+            start = None
+    return re.compile(f"[{''.join(ranges)}]+")
+
+
+@lru_cache(maxsize=1)
+def _invalid_characters():
+    # Every codepoint in a "C" category (control, format, surrogate, private
+    # use, unassigned), built on first use (~0.2s). The BMP class compiles to
+    # a bitmap; the astral one is a range list, so it only runs when needed.
+    return _category_c_class(0, 0xFFFF), _category_c_class(0x10000, sys.maxunicode)
+
+
+def remove_invalid_characters(text: str, max_length: Optional[int] = None) -> str:
+    """Drops control and other unprintable characters, after cutting `text` to `max_length`."""
     if not isinstance(text, str):
         return ""
-    return ''.join(c for c in text if unicodedata.category(c)[0] != 'C')  # Remove control chars, unprintables
+    if max_length is not None:
+        text = text[:max_length]
+    # isprintable() is False for every "C" character (and for spaces other than " "),
+    # so most text is accepted by a single C-level scan
+    if text.isprintable():
+        return text
+    bmp, astral = _invalid_characters()
+    text = bmp.sub("", text)
+    return astral.sub("", text) if _ASTRAL.search(text) else text
+
+
+def sanitize_records(records: Iterable[dict], fields: Iterable[str],
+                     max_lengths: Optional[Dict[str, int]] = None) -> List[dict]:
+    """
+    Applies remove_invalid_characters to `fields` of every record in place,
+    truncating first where `max_lengths` says so. A batch whose text is all
+    printable is checked with one isprintable() call.
+    """
+    records = list(records)
+    fields = list(fields)
+    max_lengths = max_lengths or {}
+    values = [
+        [record[field][:max_lengths.get(field)] if isinstance(record.get(field), str) else ""
+         for field in fields]
+        for record in records
+    ]
+    clean = " ".join(value for row in values for value in row).isprintable()
+    for record, row in zip(records, values):
+        for field, value in zip(fields, row):
+            record[field] = value if clean else remove_invalid_characters(value)
+    return records
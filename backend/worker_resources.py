@@ -0,0 +1,98 @@
+# worker_resources.py
+"""
+Clients shared by every task in a Celery worker process.
+
+`tasks.py` connects `init_resources` to `worker_process_init` and
+`dispose_resources` to `worker_process_shutdown`, so each forked worker builds
+its Redis pool, SQLAlchemy engine, HTTP session, Twilio client, email
+dispatcher and Gemini governor exactly once. Web processes that only enqueue
+tasks never build them. Task bodies call `get_resources()`, which also
+initializes lazily when no prefork signal fires (e.g. `--pool=solo` or eager
+mode).
+"""
+import logging
+import os
+
+import redis
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+
+class WorkerResources:
+    def __init__(self):
+        self.initialized = False
+        self.redis = None
+        self.engine = None
+        self.SessionLocal = None
+        self.http_session = None
+        self.email_dispatcher = None
+        self.gemini_governor = None
+        self._twilio = None
+
+    def init(self):
+        if self.initialized:
+            return self
+
+        redis_kwargs = {"decode_responses": True, "health_check_interval": 30, "socket_keepalive": True}
+        if REDIS_URL.startswith("rediss://"):
+            redis_kwargs["ssl_cert_reqs"] = None  # Required for Render Redis
+        self.redis = redis.Redis(connection_pool=redis.ConnectionPool.from_url(REDIS_URL, **redis_kwargs))
+
+        # The engine may have been created before the fork; drop inherited
+        # connections without closing them under the parent's feet.
+        from postgres_client import SessionLocal, engine
+        engine.dispose(close=False)
+        self.engine = engine
+        self.SessionLocal = SessionLocal
+
+        self.http_session = requests.Session()
+        self.http_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+        from notifications import FeedbackEmailDispatcher, SendGridSink
+        self.email_dispatcher = FeedbackEmailDispatcher(SendGridSink(os.getenv("SENDGRID_API_KEY")), self.redis)
+
+        from gemini_governor import SyncGeminiGovernor
+        self.gemini_governor = SyncGeminiGovernor(self.redis)
+
+        self.initialized = True
+        logger.info(f"Worker resources initialized in process {os.getpid()}")
+        return self
+
+    @property
+    def twilio(self):
+        # Only call-placing workers need Twilio, so build it on first use
+        if self._twilio is None:
+            from twilio.rest import Client
+            self._twilio = Client(os.getenv("TWILIO_ACCOUNT_SID"), os.getenv("TWILIO_AUTH_TOKEN"))
+        return self._twilio
+
+    def dispose(self):
+        if not self.initialized:
+            return
+        try:
+            self.http_session.close()
+            self.redis.connection_pool.disconnect()
+            self.engine.dispose()
+        except Exception as e:
+            logger.error(f"Error disposing worker resources: {e}")
+        self.__init__()
+        logger.info(f"Worker resources disposed in process {os.getpid()}")
+
+
+resources = WorkerResources()
+
+
+def get_resources() -> WorkerResources:
+    return resources.init()
+
+
+def init_resources(**kwargs):
+    resources.init()
+
+
+def dispose_resources(**kwargs):
+    resources.dispose()